@@ -0,0 +1,81 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PREFIX = "import time:"
+
+HEAVY_MODULES = ("aiohttp", "aiosmtplib", "pydantic")
+
+SCENARIOS = {
+    "baseline": "pass",
+    "package": "import galactic_messenger",
+    "telegram": "from galactic_messenger import setup_telegram",
+    "whatsapp": "from galactic_messenger import setup_whatsapp",
+    "email": "from galactic_messenger import setup_email",
+    "messenger": "from galactic_messenger import Messenger",
+}
+
+
+def _import_time(statement):
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0
+    modules = set()
+    for line in completed.stderr.splitlines():
+        if not line.startswith(PREFIX) or "[us]" in line:
+            continue
+        self_time, _, module = line.partition(":")[2].split("|")
+        total += int(self_time)
+        modules.add(module.strip().split(".")[0])
+    return total, sorted(modules.intersection(HEAVY_MODULES))
+
+
+def _measure(statement, repeat):
+    runs = [_import_time(statement) for _ in range(repeat)]
+    return statistics.median(total for total, _ in runs), runs[0][1]
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(
+        description="Package import cost from python -X importtime."
+    )
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        default=[name for name in SCENARIOS if name != "baseline"],
+        choices=[name for name in SCENARIOS if name != "baseline"],
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true")
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+    baseline, _ = _measure(SCENARIOS["baseline"], args.repeat)
+    if not args.json:
+        print(f"{'scenario':<11}{'import ms':>11}  heavy modules")
+    for name in args.scenarios:
+        total, heavy = _measure(SCENARIOS[name], args.repeat)
+        result = {
+            "scenario": name,
+            "import_ms": max(total - baseline, 0) / 1000,
+            "heavy_modules": heavy,
+        }
+        if args.json:
+            print(json.dumps(result))
+        else:
+            print(
+                f"{name:<11}{result['import_ms']:>11.1f}"
+                f"  {', '.join(heavy) or '-'}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import threading
+import time
+
+from benchmarks.stubs import start_smtp_stub
+from benchmarks.throughput import (
+    _create_sender,
+    _make_items,
+    _percentile,
+    _start_http_stub_thread,
+)
+from galactic_messenger.src.messenger import Messenger
+
+CHANNELS = ["telegram", "whatsapp", "email"]
+
+
+def _serve_stubs(endpoints):
+    smtp = start_smtp_stub()
+    endpoints.put(
+        {
+            "http": _start_http_stub_thread({}),
+            "smtp_host": smtp.hostname,
+            "smtp_port": smtp.port,
+        }
+    )
+    threading.Event().wait()
+
+
+async def _monitor_lag(interval, lags, stopped):
+    loop = asyncio.get_running_loop()
+    while not stopped.is_set():
+        started = loop.time()
+        await asyncio.sleep(interval)
+        lags.append(loop.time() - started - interval)
+
+
+def _make_alerts(count, media):
+    return [
+        {
+            "text": f"Alert {index}",
+            "media": media,
+            "recipients": {
+                "email": [f"supervisor{index}@example.com"],
+                "telegram": [str(index)],
+                "whatsapp": [str(index)],
+            },
+        }
+        for index in range(count)
+    ]
+
+
+def _create_messenger(endpoints, concurrency):
+    return Messenger(
+        _create_sender("email", endpoints, concurrency),
+        _create_sender("telegram", endpoints, concurrency),
+        _create_sender("whatsapp", endpoints, concurrency),
+    )
+
+
+async def _measure(channel, media_size, count, endpoints, interval):
+    media = os.urandom(media_size)
+    lags = []
+    stopped = asyncio.Event()
+    if channel == "messenger":
+        items = _make_alerts(count, media)
+        sender = _create_messenger(endpoints, count)
+    else:
+        items = _make_items(channel, count, media)
+        sender = _create_sender(channel, endpoints, count)
+    async with sender:
+        monitor = asyncio.ensure_future(_monitor_lag(interval, lags, stopped))
+        started = time.perf_counter()
+        if channel == "messenger":
+            await asyncio.gather(*map(sender.send, items))
+        else:
+            await sender.send(items)
+        elapsed = time.perf_counter() - started
+        stopped.set()
+        await monitor
+    return {
+        "channel": channel,
+        "media_size": media_size,
+        "messages": count,
+        "seconds": elapsed,
+        "p99_lag_ms": _percentile(lags, 0.99) * 1000,
+        "max_lag_ms": max(lags) * 1000,
+    }
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(
+        description="Event-loop lag while sending large media."
+    )
+    parser.add_argument(
+        "--channels",
+        nargs="+",
+        default=CHANNELS + ["messenger"],
+        choices=CHANNELS + ["messenger"],
+    )
+    parser.add_argument(
+        "--media-sizes",
+        nargs="+",
+        type=int,
+        default=[1_000_000, 10_000_000, 50_000_000],
+    )
+    parser.add_argument("--messages", type=int, default=2)
+    parser.add_argument("--interval", type=float, default=0.001)
+    parser.add_argument("--json", action="store_true")
+    return parser.parse_args()
+
+
+async def _run(args):
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    stubs = context.Process(target=_serve_stubs, args=(queue,), daemon=True)
+    stubs.start()
+    endpoints = queue.get()
+    if not args.json:
+        print(
+            f"{'channel':<10}{'media':>11}{'seconds':>9}"
+            f"{'p99 lag ms':>12}{'max lag ms':>12}"
+        )
+    try:
+        for channel in args.channels:
+            for media_size in args.media_sizes:
+                result = await _measure(
+                    channel,
+                    media_size,
+                    args.messages,
+                    endpoints,
+                    args.interval,
+                )
+                if args.json:
+                    print(json.dumps(result))
+                else:
+                    print(
+                        f"{channel:<10}{media_size:>11}"
+                        f"{result['seconds']:>9.2f}"
+                        f"{result['p99_lag_ms']:>12.1f}"
+                        f"{result['max_lag_ms']:>12.1f}"
+                    )
+    finally:
+        stubs.terminate()
+
+
+def main():
+    asyncio.run(_run(_parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import timeit
+
+from galactic_messenger.src.telegram import (
+    TelegramImageInput,
+    TelegramMessageInput,
+    TelegramVideoInput,
+    _input_dispatcher,
+)
+from galactic_messenger.src.utils import _get_schema_model, is_schema
+
+ITEMS = [
+    {"chatId": "1", "text": "Hello"},
+    {"chatId": "1", "text": "Hello", "imageBytes": b"\x00" * 1024},
+    {"chatId": "1", "text": "Hello", "videoBytes": b"\x00" * 1024},
+]
+SCHEMAS = [
+    ("IMAGE", TelegramImageInput),
+    ("VIDEO", TelegramVideoInput),
+    ("MESSAGE", TelegramMessageInput),
+]
+
+
+def _uncached_is_schema(data, typedData):
+    try:
+        _get_schema_model.__wrapped__(typedData)(**data)
+        return True
+    except ValueError:
+        return False
+
+
+def _classify_with(check):
+    def classify(data):
+        for tag, typedData in SCHEMAS:
+            if check(data, typedData):
+                return tag
+
+    return classify
+
+
+def _bench(name, classify, number):
+    seconds = min(
+        timeit.repeat(
+            lambda: [classify(item) for item in ITEMS], number=number, repeat=5
+        )
+    )
+    per_item = seconds / (number * len(ITEMS)) * 1e6
+    print(f"{name:<32}{per_item:>12.2f} us/item")
+    return per_item
+
+
+def main():
+    baseline = _bench(
+        "uncached pydantic models", _classify_with(_uncached_is_schema), 50
+    )
+    cached = _bench("cached pydantic models", _classify_with(is_schema), 2000)
+    dispatch = _bench("signature dispatch", _input_dispatcher.classify, 200000)
+    validated = _bench(
+        "signature dispatch + validation",
+        lambda item: _input_dispatcher.classify(item, validate=True),
+        2000,
+    )
+    print(f"speedup (dispatch vs uncached): {baseline / dispatch:.0f}x")
+    print(f"speedup (validated vs uncached): {baseline / validated:.0f}x")
+    print(f"speedup (cached vs uncached): {baseline / cached:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
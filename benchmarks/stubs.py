@@ -0,0 +1,101 @@
+import asyncio
+import itertools
+import logging
+import socket
+import uuid
+
+from aiohttp import web
+
+
+def _telegram_result(method):
+    message = {"message_id": 1, "chat": {"id": 1}}
+    file_id = uuid.uuid4().hex
+    if method == "sendPhoto":
+        return {**message, "photo": [{"file_id": file_id}]}
+    if method == "sendVideo":
+        return {**message, "video": {"file_id": file_id}}
+    return message
+
+
+def create_http_stub(latency=0.0, throttle_every=0, retry_after=0.05):
+    requests = itertools.count(1)
+
+    def throttled():
+        return throttle_every and next(requests) % throttle_every == 0
+
+    async def telegram(request):
+        await request.read()
+        await asyncio.sleep(latency)
+        if throttled():
+            return web.json_response(
+                {
+                    "ok": False,
+                    "error_code": 429,
+                    "description": "Too Many Requests",
+                    "parameters": {"retry_after": retry_after},
+                },
+                status=429,
+            )
+        return web.json_response(
+            {
+                "ok": True,
+                "result": _telegram_result(request.match_info["method"]),
+            }
+        )
+
+    async def whatsapp(request):
+        await request.read()
+        await asyncio.sleep(latency)
+        if throttled():
+            return web.json_response(
+                {"ok": False},
+                status=429,
+                headers={"Retry-After": str(retry_after)},
+            )
+        return web.json_response({"ok": True})
+
+    app = web.Application(client_max_size=1024**3)
+    app.router.add_post("/bot{token}/{method}", telegram)
+    app.router.add_post("/sendWhatsapp/{type}", whatsapp)
+    return app
+
+
+async def start_http_stub(**options):
+    runner = web.AppRunner(create_http_stub(**options), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    return runner, f"http://{host}:{port}"
+
+
+class _SMTPHandler:
+    def __init__(self, latency):
+        self.latency = latency
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.latency)
+        return "250 Message accepted"
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_smtp_stub(latency=0.0):
+    logging.getLogger("mail.log").setLevel(logging.ERROR)
+    from aiosmtpd.controller import Controller
+    from aiosmtpd.smtp import AuthResult
+
+    controller = Controller(
+        _SMTPHandler(latency),
+        hostname="127.0.0.1",
+        port=_free_port(),
+        auth_require_tls=False,
+        authenticator=lambda *args: AuthResult(success=True),
+        data_size_limit=None,
+    )
+    controller.start()
+    return controller
@@ -0,0 +1,189 @@
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import resource
+import threading
+import time
+
+from benchmarks.stubs import start_http_stub, start_smtp_stub
+from galactic_messenger.src.mail import EmailSender
+from galactic_messenger.src.telegram import TelegramSender
+from galactic_messenger.src.whatsapp import WhatsappSender
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+def _make_items(channel, count, media):
+    if channel == "email":
+        return [
+            {
+                "to": f"supervisor{index}@example.com",
+                "subject": "Incident",
+                "message": f"Alert {index}",
+                **(
+                    {"attachment_name": "snapshot.jpg", "attachment": media}
+                    if media
+                    else {}
+                ),
+            }
+            for index in range(count)
+        ]
+    return [
+        {
+            "chatId": str(index),
+            "text": f"Alert {index}",
+            **({"imageBytes": media} if media else {}),
+        }
+        for index in range(count)
+    ]
+
+
+def _create_sender(channel, endpoints, concurrency):
+    if channel == "telegram":
+        return TelegramSender(
+            "1:token",
+            concurrency,
+            concurrency,
+            rate_limit=False,
+            cache_media=False,
+            group_media=False,
+            api_url=endpoints["http"],
+        )
+    if channel == "whatsapp":
+        return WhatsappSender(endpoints["http"], concurrency, concurrency)
+    return EmailSender(
+        "bench@example.com",
+        "password",
+        pool_size=concurrency,
+        host=endpoints["smtp_host"],
+        port=endpoints["smtp_port"],
+    )
+
+
+async def _measure(scenario, endpoints):
+    media = os.urandom(scenario["media_size"])
+    items = _make_items(scenario["channel"], scenario["batch_size"], media)
+
+    async with _create_sender(
+        scenario["channel"], endpoints, scenario["concurrency"]
+    ) as sender:
+        await sender.send(items[:1])
+        started = time.perf_counter()
+        reports = await sender.send(items)
+        elapsed = time.perf_counter() - started
+
+    latencies = [report.latency for report in reports]
+    return {
+        **scenario,
+        "failed": sum(not report.ok for report in reports),
+        "messages_per_second": len(items) / elapsed,
+        "p50_ms": _percentile(latencies, 0.5) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+    }
+
+
+def _run_scenario(scenario, endpoints, results):
+    result = asyncio.run(_measure(scenario, endpoints))
+    result["peak_rss_mb"] = (
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    )
+    results.put(result)
+
+
+def _start_http_stub_thread(options):
+    ready = threading.Event()
+    endpoint = {}
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        runner, endpoint["url"] = loop.run_until_complete(
+            start_http_stub(**options)
+        )
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    ready.wait()
+    return endpoint["url"]
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(
+        description="Send throughput against local stand-in servers."
+    )
+    parser.add_argument(
+        "--channels",
+        nargs="+",
+        default=["telegram", "whatsapp", "email"],
+        choices=["telegram", "whatsapp", "email"],
+    )
+    parser.add_argument(
+        "--batch-sizes", nargs="+", type=int, default=[10, 100, 1000]
+    )
+    parser.add_argument(
+        "--media-sizes", nargs="+", type=int, default=[0, 100_000, 1_000_000]
+    )
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--throttle-every", type=int, default=0)
+    parser.add_argument("--retry-after", type=float, default=0.05)
+    parser.add_argument("--json", action="store_true")
+    return parser.parse_args()
+
+
+def main():
+    args = _parse_args()
+    endpoints = {
+        "http": _start_http_stub_thread(
+            {
+                "latency": args.latency,
+                "throttle_every": args.throttle_every,
+                "retry_after": args.retry_after,
+            }
+        )
+    }
+    if "email" in args.channels:
+        smtp = start_smtp_stub(args.latency)
+        endpoints.update(smtp_host=smtp.hostname, smtp_port=smtp.port)
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    if not args.json:
+        print(
+            f"{'channel':<10}{'batch':>7}{'media':>10}{'msg/s':>10}"
+            f"{'p50 ms':>10}{'p99 ms':>10}{'rss MB':>9}"
+        )
+    for channel in args.channels:
+        for media_size in args.media_sizes:
+            for batch_size in args.batch_sizes:
+                scenario = {
+                    "channel": channel,
+                    "batch_size": batch_size,
+                    "media_size": media_size,
+                    "concurrency": args.concurrency,
+                }
+                process = context.Process(
+                    target=_run_scenario, args=(scenario, endpoints, results)
+                )
+                process.start()
+                result = results.get()
+                process.join()
+                if args.json:
+                    print(json.dumps(result))
+                else:
+                    print(
+                        f"{channel:<10}{batch_size:>7}{media_size:>10}"
+                        f"{result['messages_per_second']:>10.0f}"
+                        f"{result['p50_ms']:>10.1f}"
+                        f"{result['p99_ms']:>10.1f}"
+                        f"{result['peak_rss_mb']:>9.1f}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
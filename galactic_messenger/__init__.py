@@ -1,3 +1,29 @@
-from .src.mail import setup_email
-from .src.telegram import setup_telegram
-from .src.whatsapp import setup_whatsapp
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .src.mail import setup_email
+    from .src.messenger import Messenger
+    from .src.telegram import setup_telegram
+    from .src.whatsapp import setup_whatsapp
+
+_EXPORTS = {
+    "setup_email": ".src.mail",
+    "setup_telegram": ".src.telegram",
+    "setup_whatsapp": ".src.whatsapp",
+    "Messenger": ".src.messenger",
+}
+
+__all__ = ["setup_email", "setup_telegram", "setup_whatsapp", "Messenger"]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -1,12 +1,65 @@
-from typing import NamedTuple
-
-Config = NamedTuple(
-    "Config",
-    [
-        ("SMTP_SERVER", str),
-        ("SINGLE_CONNECT_TIMEOUT", int),
-        ("BATCH_CONNECT_TIMEOUT", int),
-        ("SINGLE_TOTAL_TIMEOUT", int),
-        ("BATCH_TOTAL_TIMEOUT", int),
-    ],
-)("ZOHO", 5, 5, 10, 60)
+import os
+from typing import Any, Mapping, NamedTuple, Optional
+
+
+class Settings(NamedTuple):
+    SMTP_SERVER: str = "ZOHO"
+    SINGLE_CONNECT_TIMEOUT: float = 5
+    BATCH_CONNECT_TIMEOUT: float = 5
+    SINGLE_TOTAL_TIMEOUT: float = 10
+    BATCH_TOTAL_TIMEOUT: float = 60
+    TIMEOUT_PER_MEGABYTE: float = 2
+    BATCH_CONCURRENCY_LIMIT: int = 10
+    PER_HOST_CONNECTION_LIMIT: int = 10
+    KEEPALIVE_TIMEOUT: int = 30
+    DNS_CACHE_TTL: int = 300
+    SMTP_POOL_SIZE: int = 3
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
+    SMTP_HEALTH_CHECK_INTERVAL: float = 30
+    SMTP_TIMEOUT: float = 60
+    SMTP_MAX_RECIPIENTS: int = 100
+    TELEGRAM_GLOBAL_RATE_LIMIT: float = 30
+    TELEGRAM_CHAT_RATE_LIMIT: float = 1
+    TELEGRAM_GROUP_RATE_LIMIT: float = 20
+    RETRY_ATTEMPTS: int = 3
+    RETRY_BASE_DELAY: float = 0.5
+    RETRY_MAX_DELAY: float = 10
+    RETRY_DEADLINE: float = 60
+    TELEGRAM_FILE_ID_CACHE_SIZE: int = 1024
+    OUTBOX_WORKERS: int = 2
+    OUTBOX_BATCH_SIZE: int = 20
+    OUTBOX_MAX_ATTEMPTS: int = 5
+    OUTBOX_POLL_INTERVAL: float = 1
+    TELEGRAM_API_URL: str = "https://api.telegram.org"
+    DEDUP_WINDOW: float = 10
+    DEDUP_MAX_ENTRIES: int = 10000
+    COALESCE_WINDOW: float = 2
+
+
+_aliases = {"SMTP_SERVER": "EMAIL_SERVICE"}
+
+
+def _parse_setting(name: str, value: str) -> Any:
+    kind = Settings.__annotations__[name]
+    try:
+        return kind(value)
+    except ValueError:
+        raise ValueError(f"Invalid value for {name}: {value!r}") from None
+
+
+def load_settings(
+    environ: Optional[Mapping[str, str]] = None, **overrides: Any
+) -> Settings:
+    environ = os.environ if environ is None else environ
+    unknown = set(overrides) - set(Settings._fields)
+    if unknown:
+        raise ValueError(f"Unknown settings: {', '.join(sorted(unknown))}")
+    values = {}
+    for name in Settings._fields:
+        value = environ.get(name, environ.get(_aliases.get(name, name)))
+        if value is not None:
+            values[name] = _parse_setting(name, value)
+    return Settings(**{**values, **overrides})
+
+
+Config = load_settings()
@@ -0,0 +1,265 @@
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from functools import partial
+from types import TracebackType
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+
+from ..config import Config
+from ..src.media import MEDIA_CHUNK_SIZE, as_buffer, is_buffer, is_large_media
+from ..src.report import is_delivered, report_send
+
+Alert = Mapping[str, Any]
+
+Send = Callable[[Any], Awaitable[Any]]
+
+MAX_DIGEST_LENGTH = 4096
+
+_media_fields = ("imageBytes", "videoBytes", "documentBytes")
+
+_BurstItem = Tuple[str, "asyncio.Future[Any]"]
+
+
+def _hash_file(digest: Any, path: Union[str, os.PathLike]) -> None:
+    with open(path, "rb") as file:
+        for chunk in iter(partial(file.read, MEDIA_CHUNK_SIZE), b""):
+            digest.update(chunk)
+
+
+async def get_dedup_key(alert: Alert) -> Optional[Tuple[str, str]]:
+    chat_id = alert.get("chatId")
+    if not isinstance(chat_id, str):
+        return None
+    loop = asyncio.get_running_loop()
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(str(alert.get("text", "")).encode("utf-8"))
+    for field in _media_fields:
+        media = alert.get(field)
+        if media is None:
+            continue
+        digest.update(b"\0" + field.encode("ascii") + b"\0")
+        if is_buffer(media) and is_large_media(media):
+            await loop.run_in_executor(None, digest.update, as_buffer(media))
+        elif is_buffer(media):
+            digest.update(as_buffer(media))
+        elif isinstance(media, os.PathLike):
+            try:
+                await loop.run_in_executor(None, _hash_file, digest, media)
+            except OSError:
+                return None
+        elif isinstance(media, str):
+            digest.update(media.encode("utf-8"))
+        else:
+            return None
+    return chat_id, digest.hexdigest()
+
+
+def _is_text_alert(alert: Alert) -> bool:
+    return set(alert) == {"chatId", "text"}
+
+
+def _split_digests(
+    items: List[_BurstItem], max_length: int
+) -> List[List[_BurstItem]]:
+    digests: List[List[_BurstItem]] = []
+    length = 0
+    for item in items:
+        if digests and length + 1 + len(item[0]) <= max_length:
+            digests[-1].append(item)
+            length += 1 + len(item[0])
+        else:
+            digests.append([item])
+            length = len(item[0])
+    return digests
+
+
+class AlertDeduplicator:
+    def __init__(
+        self,
+        send: Send,
+        window: float = Config.DEDUP_WINDOW,
+        max_entries: int = Config.DEDUP_MAX_ENTRIES,
+        coalesce: bool = False,
+        coalesce_window: float = Config.COALESCE_WINDOW,
+        max_digest_length: int = MAX_DIGEST_LENGTH,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("Dedup cache size must be at least 1")
+        self._send = send
+        self.window = window
+        self.max_entries = max_entries
+        self.coalesce = coalesce
+        self.coalesce_window = coalesce_window
+        self.max_digest_length = max_digest_length
+        self.dropped = 0
+        self.coalesced = 0
+        self._seen: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._pending: Set[Tuple[str, str]] = set()
+        self._bursts: Dict[str, List[_BurstItem]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Future] = set()
+
+    def _expire(self, now: float) -> None:
+        while self._seen and next(iter(self._seen.values())) <= now:
+            self._seen.popitem(last=False)
+
+    def _is_seen(self, key: Optional[Tuple[str, str]]) -> bool:
+        if key is None:
+            return False
+        self._expire(time.monotonic())
+        return key in self._seen or key in self._pending
+
+    def _remember(self, key: Tuple[str, str]) -> None:
+        self._seen[key] = time.monotonic() + self.window
+        while len(self._seen) > self.max_entries:
+            self._seen.popitem(last=False)
+
+    async def is_duplicate(self, alert: Alert) -> bool:
+        return self._is_seen(await get_dedup_key(alert))
+
+    async def _send_digest(self, chat_id: str, items: List[_BurstItem]):
+        for digest in _split_digests(items, self.max_digest_length):
+            try:
+                result = await self._send(
+                    {
+                        "chatId": chat_id,
+                        "text": "\n".join(text for text, _ in digest),
+                    }
+                )
+            except Exception as error:
+                for _, waiter in digest:
+                    if not waiter.done():
+                        waiter.set_exception(error)
+            else:
+                for _, waiter in digest:
+                    if not waiter.done():
+                        waiter.set_result(result)
+
+    def _flush(self, chat_id: str) -> None:
+        self._timers.pop(chat_id, None)
+        items = self._bursts.pop(chat_id, [])
+        if not items:
+            return
+        self.coalesced += len(items) - len(
+            _split_digests(items, self.max_digest_length)
+        )
+        task = asyncio.ensure_future(self._send_digest(chat_id, items))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _add_to_burst(self, alert: Alert) -> Any:
+        loop = asyncio.get_running_loop()
+        chat_id = alert["chatId"]
+        waiter = loop.create_future()
+        self._bursts.setdefault(chat_id, []).append((alert["text"], waiter))
+        if chat_id not in self._timers:
+            self._timers[chat_id] = loop.call_later(
+                self.coalesce_window, self._flush, chat_id
+            )
+        return await asyncio.shield(waiter)
+
+    async def _deliver(self, alert: Alert) -> Any:
+        if self.coalesce and _is_text_alert(alert):
+            return await self._add_to_burst(alert)
+        return await self._send(alert)
+
+    async def _send_many(self, alerts: List[Alert]) -> List[Any]:
+        if not alerts:
+            return []
+        results = await self._send(alerts)
+        return [None] * len(alerts) if results is None else list(results)
+
+    async def _send_batch(self, alerts: List[Alert]) -> List[Any]:
+        keys: Dict[int, Optional[Tuple[str, str]]] = {}
+        for index, alert in enumerate(alerts):
+            key = await get_dedup_key(alert)
+            if self._is_seen(key):
+                self.dropped += 1
+                continue
+            keys[index] = key
+            if key is not None:
+                self._pending.add(key)
+        held: List[int] = []
+        batch: List[int] = []
+        for index in keys:
+            if self.coalesce and _is_text_alert(alerts[index]):
+                held.append(index)
+            else:
+                batch.append(index)
+        try:
+            held_results, batch_results = await asyncio.gather(
+                asyncio.gather(
+                    *(
+                        report_send(self._add_to_burst(alerts[index]))
+                        for index in held
+                    )
+                ),
+                self._send_many([alerts[index] for index in batch]),
+            )
+        finally:
+            self._pending.difference_update(
+                key for key in keys.values() if key is not None
+            )
+        results: List[Any] = [None] * len(alerts)
+        for index, result in zip(
+            held + batch, list(held_results) + batch_results
+        ):
+            results[index] = result
+            key = keys[index]
+            if key is not None and is_delivered(result):
+                self._remember(key)
+        return results
+
+    async def send(self, alert: Union[Alert, List[Alert]]) -> Any:
+        if isinstance(alert, list):
+            return await self._send_batch(alert)
+        key = await get_dedup_key(alert)
+        if self._is_seen(key):
+            self.dropped += 1
+            return None
+        if key is None:
+            return await self._deliver(alert)
+        self._pending.add(key)
+        try:
+            result = await self._deliver(alert)
+        finally:
+            self._pending.discard(key)
+        if is_delivered(result):
+            self._remember(key)
+        return result
+
+    __call__ = send
+
+    async def flush(self) -> None:
+        for chat_id, timer in list(self._timers.items()):
+            timer.cancel()
+            self._flush(chat_id)
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def aclose(self) -> None:
+        await self.flush()
+
+    async def __aenter__(self) -> "AlertDeduplicator":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        await self.aclose()
@@ -1,12 +1,60 @@
+import asyncio
+import re
+import uuid
 from email import encoders
+from email.message import Message
 from email.mime.base import MIMEBase
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from typing import TypedDict, Union, cast
+from functools import partial
+from types import TracebackType
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+    TypedDict,
+    Union,
+    cast,
+)
 
 import aiosmtplib
 
-from ..config import Config
+from ..config import Config, Settings
+from ..src.media import (
+    Media,
+    MediaSource,
+    close_media,
+    encode_mime_base64,
+    is_large_media,
+    iter_mime_base64,
+    make_replayable,
+    to_media,
+)
+from ..src.metrics import instrument_send, track_pool
+from ..src.report import SendReport, report_send
+from ..src.retry import (
+    RetryHook,
+    RetryPolicy,
+    call_with_retry,
+    get_retry_policy,
+)
+from ..src.smtp_pool import PooledSMTPConnection, SMTPPool
+from ..src.utils import (
+    is_async_iterable,
+    or_default,
+    map_with_concurrency,
+    stream_with_concurrency,
+)
 
 
 class SMTPUrl(TypedDict):
@@ -23,65 +71,153 @@ smtp_url: SMTPUrl = {"zoho": "smtp.zoho.com", "gmail": "smtp.gmail.com"}
 smtp_port: SMTPPort = {"zoho": 587, "gmail": 587}
 
 
-class PlainEmailContent(TypedDict):
-    to: str
+Addresses = Union[str, List[str]]
+
+
+class _CopyRecipients(TypedDict, total=False):
+    cc: Addresses
+    bcc: Addresses
+
+
+class PlainEmailContent(_CopyRecipients):
+    to: Addresses
     subject: str
     message: str
 
 
-class WithAttachmentEmailContent(TypedDict):
-    to: str
+class SharedAttachment(NamedTuple):
+    head: bytes
+    chunks: List[bytes]
+
+
+class WithAttachmentEmailContent(_CopyRecipients):
+    to: Addresses
     subject: str
     message: str
     attachment_name: str
-    attachment: bytes
+    attachment: Union[MediaSource, SharedAttachment]
 
 
 EmailContent = Union[PlainEmailContent, WithAttachmentEmailContent]
 
+BatchEmailContent = Union[List[EmailContent], AsyncIterable[EmailContent]]
+
+EmailInput = Union[EmailContent, BatchEmailContent]
+
+StreamEmailContent = Union[Iterable[EmailContent], AsyncIterable[EmailContent]]
+
+_ATTACHMENT_PLACEHOLDER = "GALACTIC-MESSENGER-ATTACHMENT"
+
+_LEADING_PERIOD = re.compile(rb"(?m)^\.")
+
+
+class EmailTemplate(TypedDict):
+    subject: str
+    message: str
+
+
+EmailRecipients = Union[
+    Iterable[Mapping[str, Any]], AsyncIterable[Mapping[str, Any]]
+]
+
+
+class EncodedAttachment(str):
+    pass
+
+
+class EmailResult(NamedTuple):
+    accepted: List[str]
+    refused: Dict[str, aiosmtplib.SMTPResponse]
+    failed: Dict[str, Exception]
+
+    def __bool__(self) -> bool:
+        return bool(self.accepted)
+
+
+SMTPTransactionResult = Tuple[Dict[str, aiosmtplib.SMTPResponse], str]
+
 
 async def _create_server_connection(
-    url: str, port: int, mail: str, password: str
+    url: str,
+    port: int,
+    mail: str,
+    password: str,
+    timeout: Optional[float] = Config.SMTP_TIMEOUT,
 ) -> aiosmtplib.SMTP:
-    server = aiosmtplib.SMTP(url, port)
+    server = aiosmtplib.SMTP(url, port, timeout=timeout)
     await server.connect()
     await server.login(mail, password)
     return server
 
 
+def _format_addresses(addresses: Addresses) -> str:
+    return addresses if isinstance(addresses, str) else ", ".join(addresses)
+
+
+def _get_recipients(email_content: EmailContent) -> List[str]:
+    recipients: List[str] = []
+    for field in ("to", "cc", "bcc"):
+        addresses = email_content.get(field) or []
+        recipients.extend(
+            [addresses] if isinstance(addresses, str) else addresses
+        )
+    return list(dict.fromkeys(recipients))
+
+
 def _create_email_plain_body(
-    send_from: str, send_to: str, subject: str, message: str
+    send_from: str,
+    send_to: Addresses,
+    subject: str,
+    message: str,
+    cc: Optional[Addresses] = None,
 ) -> MIMEMultipart:
     email_body = MIMEMultipart()
     email_body["From"] = send_from
-    email_body["To"] = send_to
+    email_body["To"] = _format_addresses(send_to)
+    if cc:
+        email_body["Cc"] = _format_addresses(cc)
     email_body["Subject"] = subject
     email_body.attach(MIMEText(message, "plain"))
     return email_body
 
 
+def _create_attachment_part(
+    attachment_name: str, attachment: Union[bytes, EncodedAttachment]
+) -> MIMEBase:
+    part = MIMEBase("application", "octet-stream")
+    part.set_payload(attachment)
+    if isinstance(attachment, EncodedAttachment):
+        part["Content-Transfer-Encoding"] = "base64"
+    else:
+        encoders.encode_base64(part)
+    part.add_header(
+        "Content-Disposition", f"attachment; filename={attachment_name}"
+    )
+    return part
+
+
 def _create_email_with_attachment_body(
     send_from: str,
-    send_to: str,
+    send_to: Addresses,
     subject: str,
     message: str,
     attachment_name: str,
-    attachment: bytes,
+    attachment: Union[bytes, EncodedAttachment],
+    cc: Optional[Addresses] = None,
 ) -> MIMEMultipart:
-    email_body = _create_email_plain_body(send_from, send_to, subject, message)
-    part = MIMEBase("application", "octet-stream")
-    part.set_payload(attachment)
-    encoders.encode_base64(part)
-    part.add_header(
-        "Content-Disposition", f"attachment; filename={attachment_name}"
+    email_body = _create_email_plain_body(
+        send_from, send_to, subject, message, cc
     )
-    email_body.attach(part)
+    email_body.attach(_create_attachment_part(attachment_name, attachment))
     return email_body
 
 
-async def _send(server: aiosmtplib.SMTP, body: MIMEMultipart) -> bool:
-    async with server:
-        return True if await server.send_message(body) else False
+async def _send(
+    server: Union[aiosmtplib.SMTP, PooledSMTPConnection],
+    body: MIMEMultipart,
+    recipients: Optional[List[str]] = None,
+) -> SMTPTransactionResult:
+    return await server.send_message(body, recipients=recipients)
 
 
 def _create_email_body(
@@ -96,6 +232,7 @@ def _create_email_body(
             email_content_typed["message"],
             email_content_typed["attachment_name"],
             email_content_typed["attachment"],
+            email_content_typed.get("cc"),
         )
     else:
         email_content_typed = cast(PlainEmailContent, email_content)
@@ -104,20 +241,529 @@ def _create_email_body(
             email_content_typed["to"],
             email_content_typed["subject"],
             email_content_typed["message"],
+            email_content_typed.get("cc"),
+        )
+
+
+async def _classify_retry(
+    result: Optional[bool], error: Optional[BaseException]
+) -> Optional[float]:
+    if error is None:
+        return None
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return (
+            0.0 if all(400 <= r.code < 500 for r in error.recipients) else None
+        )
+    if isinstance(error, aiosmtplib.SMTPResponseException):
+        return 0.0 if 400 <= error.code < 500 else None
+    if isinstance(
+        error, (ConnectionError, TimeoutError, asyncio.TimeoutError)
+    ):
+        return 0.0
+    return None
+
+
+async def _send_pooled(
+    pool: SMTPPool, body: MIMEMultipart, recipients: List[str]
+) -> SMTPTransactionResult:
+    async with pool.acquire() as server:
+        return await _send(server, body, recipients)
+
+
+async def _send_to_recipients(
+    transaction: Callable[[List[str]], Awaitable[SMTPTransactionResult]],
+    recipients: List[str],
+    max_recipients: int,
+    retry_policy: RetryPolicy,
+    on_retry: Optional[RetryHook] = None,
+) -> EmailResult:
+    accepted: List[str] = []
+    refused: Dict[str, aiosmtplib.SMTPResponse] = {}
+    failed: Dict[str, Exception] = {}
+    errors: List[aiosmtplib.SMTPRecipientRefused] = []
+    for start in range(0, len(recipients), max_recipients):
+        end = start + max_recipients
+        chunk = recipients[start:end]
+        try:
+            chunk_refused, _ = await call_with_retry(
+                retry_policy,
+                partial(transaction, chunk),
+                _classify_retry,
+                on_retry,
+            )
+        except aiosmtplib.SMTPRecipientsRefused as error:
+            errors.extend(error.recipients)
+            chunk_refused = {
+                refusal.recipient: aiosmtplib.SMTPResponse(
+                    refusal.code, refusal.message
+                )
+                for refusal in error.recipients
+            }
+        except Exception as error:
+            failed.update(dict.fromkeys(chunk, error))
+            continue
+        refused.update(chunk_refused)
+        accepted.extend(r for r in chunk if r not in chunk_refused)
+    if not accepted and failed:
+        raise next(iter(failed.values()))
+    if not accepted and errors:
+        raise aiosmtplib.SMTPRecipientsRefused(errors)
+    return EmailResult(accepted, refused, failed)
+
+
+def _serialize(message: Message) -> bytes:
+    data = message.as_bytes(policy=message.policy.clone(linesep="\r\n"))
+    return _LEADING_PERIOD.sub(b"..", data)
+
+
+def _serialize_around_attachment(
+    mail: str, email_content: WithAttachmentEmailContent
+) -> Tuple[bytes, bytes]:
+    body = _create_email_with_attachment_body(
+        mail,
+        email_content["to"],
+        email_content["subject"],
+        email_content["message"],
+        email_content["attachment_name"],
+        EncodedAttachment(_ATTACHMENT_PLACEHOLDER),
+        email_content.get("cc"),
+    )
+    head, _, tail = _serialize(body).rpartition(
+        _ATTACHMENT_PLACEHOLDER.encode("ascii")
+    )
+    return head, tail
+
+
+async def _iter_email_chunks(
+    head: bytes, attachment: Media, tail: bytes
+) -> AsyncIterator[bytes]:
+    yield head
+    async for chunk in iter_mime_base64(attachment, linesep=b"\r\n"):
+        yield chunk
+    yield tail
+
+
+async def _send_chunked_pooled(
+    pool: SMTPPool,
+    mail: str,
+    email_content: WithAttachmentEmailContent,
+    attachment: Media,
+    recipients: List[str],
+) -> SMTPTransactionResult:
+    head, tail = _serialize_around_attachment(mail, email_content)
+    async with pool.acquire() as server:
+        return await server.send_chunks(
+            mail, recipients, _iter_email_chunks(head, attachment, tail)
+        )
+
+
+def _get_large_attachment(email_content: EmailContent) -> Optional[Media]:
+    attachment = email_content.get("attachment")
+    if attachment is None or isinstance(
+        attachment, (EncodedAttachment, SharedAttachment)
+    ):
+        return None
+    media = to_media(attachment)
+    return media if is_large_media(media) else None
+
+
+async def _encode_shared_attachment(
+    attachment_name: str, attachment: MediaSource
+) -> SharedAttachment:
+    part = _create_attachment_part(
+        attachment_name, EncodedAttachment(_ATTACHMENT_PLACEHOLDER)
+    )
+    head, _, _ = _serialize(part).rpartition(
+        _ATTACHMENT_PLACEHOLDER.encode("ascii")
+    )
+    chunks = [
+        chunk
+        async for chunk in iter_mime_base64(
+            to_media(attachment), linesep=b"\r\n"
         )
+    ]
+    return SharedAttachment(head, chunks)
+
+
+async def encode_shared_attachments(
+    attachments: Mapping[str, MediaSource],
+) -> List[SharedAttachment]:
+    return [
+        await _encode_shared_attachment(name, attachment)
+        for name, attachment in attachments.items()
+    ]
+
+
+def render_email(
+    template: EmailTemplate, variables: Mapping[str, Any]
+) -> PlainEmailContent:
+    email_content: PlainEmailContent = {
+        "to": variables["to"],
+        "subject": template["subject"].format_map(variables),
+        "message": template["message"].format_map(variables),
+    }
+    for field in ("cc", "bcc"):
+        if field in variables:
+            email_content[field] = variables[field]  # type: ignore
+    return email_content
+
+
+async def _iter_bulk_chunks(
+    mail: str,
+    email_content: PlainEmailContent,
+    attachments: List[SharedAttachment],
+) -> AsyncIterator[bytes]:
+    body = _create_email_plain_body(
+        mail,
+        email_content["to"],
+        email_content["subject"],
+        email_content["message"],
+        email_content.get("cc"),
+    )
+    boundary = f"==============={uuid.uuid4().hex}=="
+    body.set_boundary(boundary)
+    delimiter = f"\r\n--{boundary}".encode("ascii")
+    head, _, tail = _serialize(body).rpartition(delimiter + b"--")
+    yield head
+    for attachment in attachments:
+        yield delimiter + b"\r\n" + attachment.head
+        for chunk in attachment.chunks:
+            await asyncio.sleep(0)
+            yield chunk
+    yield delimiter + b"--" + tail
+
+
+async def _send_rendered(
+    pool: SMTPPool,
+    mail: str,
+    email_content: PlainEmailContent,
+    attachments: List[SharedAttachment],
+    recipients: List[str],
+) -> SMTPTransactionResult:
+    async with pool.acquire() as server:
+        return await server.send_chunks(
+            mail,
+            recipients,
+            _iter_bulk_chunks(mail, email_content, attachments),
+        )
+
+
+async def _report_bulk_item(
+    pool: SMTPPool,
+    mail: str,
+    template: EmailTemplate,
+    attachments: List[SharedAttachment],
+    retry_policy: RetryPolicy,
+    max_recipients: int,
+    variables: Mapping[str, Any],
+) -> SendReport:
+    async def send() -> EmailResult:
+        email_content = render_email(template, variables)
+        return await instrument_send(
+            "email",
+            "ATTACHMENT" if attachments else "MESSAGE",
+            email_content,
+            partial(
+                _send_to_recipients,
+                partial(
+                    _send_rendered, pool, mail, email_content, attachments
+                ),
+                _get_recipients(email_content),
+                max_recipients,
+                retry_policy,
+            ),
+            get_failure_reason=_get_failure_reason,
+        )
+
+    return await report_send(send())
 
 
-def setup_email(mail: str, password: str):
-    async def send_email(email_content: EmailContent) -> bool:
-        server = await _create_server_connection(
-            smtp_url[Config.SMTP_SERVER.lower()],
-            smtp_port[Config.SMTP_SERVER.lower()],
+async def encode_attachment(attachment: MediaSource) -> EncodedAttachment:
+    return EncodedAttachment(await encode_mime_base64(to_media(attachment)))
+
+
+async def _encode_attachment(email_content: EmailContent) -> EmailContent:
+    attachment = email_content.get("attachment")
+    if attachment is None or isinstance(
+        attachment, (bytes, EncodedAttachment)
+    ):
+        return email_content
+    return cast(
+        EmailContent,
+        {**email_content, "attachment": await encode_attachment(attachment)},
+    )
+
+
+def _get_failure_reason(result: EmailResult) -> Optional[str]:
+    return None if result else "rejected"
+
+
+async def _send_single(
+    pool: SMTPPool,
+    mail: str,
+    email_content: EmailContent,
+    retry_policy: RetryPolicy = RetryPolicy(),
+    max_recipients: int = Config.SMTP_MAX_RECIPIENTS,
+) -> EmailResult:
+    shared = email_content.get("attachment")
+    attachment = _get_large_attachment(email_content)
+    if isinstance(shared, SharedAttachment):
+        transaction = partial(
+            _send_rendered,
+            pool,
+            mail,
+            cast(PlainEmailContent, email_content),
+            [shared],
+        )
+    elif attachment is not None:
+        attachment = await make_replayable(attachment)
+        transaction = partial(
+            _send_chunked_pooled,
+            pool,
             mail,
-            password,
+            cast(WithAttachmentEmailContent, email_content),
+            attachment,
         )
-        email_body = _create_email_body(mail, email_content)
+    else:
+        email_content = await _encode_attachment(email_content)
+        transaction = partial(
+            _send_pooled, pool, _create_email_body(mail, email_content)
+        )
+    try:
+        return await instrument_send(
+            "email",
+            "ATTACHMENT" if "attachment" in email_content else "MESSAGE",
+            email_content,
+            partial(
+                _send_to_recipients,
+                transaction,
+                _get_recipients(email_content),
+                max_recipients,
+                retry_policy,
+            ),
+            get_failure_reason=_get_failure_reason,
+        )
+    finally:
+        close_media(attachment)
+
+
+async def _report_single(
+    pool: SMTPPool,
+    mail: str,
+    email_content: EmailContent,
+    retry_policy: RetryPolicy = RetryPolicy(),
+    max_recipients: int = Config.SMTP_MAX_RECIPIENTS,
+) -> SendReport:
+    return await report_send(
+        _send_single(pool, mail, email_content, retry_policy, max_recipients)
+    )
+
+
+async def _send_multiple(
+    pool: SMTPPool,
+    mail: str,
+    email_contents: BatchEmailContent,
+    retry_policy: RetryPolicy = RetryPolicy(),
+    max_recipients: int = Config.SMTP_MAX_RECIPIENTS,
+) -> List[SendReport]:
+    return await map_with_concurrency(
+        pool.max_size,
+        partial(
+            _report_single,
+            pool,
+            mail,
+            retry_policy=retry_policy,
+            max_recipients=max_recipients,
+        ),
+        email_contents,
+    )
+
+
+async def _send_bulk(
+    pool: SMTPPool,
+    mail: str,
+    template: EmailTemplate,
+    recipients: EmailRecipients,
+    attachments: Optional[Mapping[str, MediaSource]] = None,
+    retry_policy: RetryPolicy = RetryPolicy(),
+    concurrency: int = 1,
+    max_recipients: int = Config.SMTP_MAX_RECIPIENTS,
+) -> List[SendReport]:
+    shared = await encode_shared_attachments(attachments or {})
+    return await map_with_concurrency(
+        concurrency,
+        partial(
+            _report_bulk_item,
+            pool,
+            mail,
+            template,
+            shared,
+            retry_policy,
+            max_recipients,
+        ),
+        recipients,
+    )
+
+
+def _is_batch(email_input: EmailInput) -> bool:
+    return isinstance(email_input, List) or is_async_iterable(email_input)
+
+
+async def _handle_send(
+    pool: SMTPPool,
+    mail: str,
+    email_input: EmailInput,
+    retry_policy: RetryPolicy = RetryPolicy(),
+    max_recipients: int = Config.SMTP_MAX_RECIPIENTS,
+) -> Union[EmailResult, List[SendReport]]:
+    return (
+        await _send_multiple(
+            pool,
+            mail,
+            cast(BatchEmailContent, email_input),
+            retry_policy,
+            max_recipients,
+        )
+        if _is_batch(email_input)
+        else await _send_single(
+            pool,
+            mail,
+            cast(EmailContent, email_input),
+            retry_policy,
+            max_recipients,
+        )
+    )
+
+
+class EmailSender:
+    def __init__(
+        self,
+        mail: str,
+        password: str,
+        pool_size: Optional[int] = None,
+        max_messages_per_connection: Optional[int] = None,
+        health_check_interval: Optional[float] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_recipients: Optional[int] = None,
+        settings: Settings = Config,
+    ) -> None:
+        self.mail = mail
+        self.settings = settings
+        self.max_recipients = or_default(
+            max_recipients, settings.SMTP_MAX_RECIPIENTS
+        )
+        self.retry_policy = or_default(
+            retry_policy, get_retry_policy(settings)
+        )
+        self.pool = SMTPPool(
+            partial(
+                _create_server_connection,
+                host or smtp_url[settings.SMTP_SERVER.lower()],
+                port or smtp_port[settings.SMTP_SERVER.lower()],
+                mail,
+                password,
+                or_default(timeout, settings.SMTP_TIMEOUT),
+            ),
+            or_default(pool_size, settings.SMTP_POOL_SIZE),
+            or_default(
+                max_messages_per_connection,
+                settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+            ),
+            or_default(
+                health_check_interval, settings.SMTP_HEALTH_CHECK_INTERVAL
+            ),
+        )
+        track_pool(self.pool, f"smtp:{mail}")
+
+    async def send(
+        self, email_input: EmailInput
+    ) -> Union[EmailResult, List[SendReport]]:
+        return await _handle_send(
+            self.pool,
+            self.mail,
+            email_input,
+            self.retry_policy,
+            self.max_recipients,
+        )
+
+    def stream(
+        self, email_contents: StreamEmailContent
+    ) -> AsyncIterator[Tuple[int, SendReport]]:
+        return stream_with_concurrency(
+            self.pool.max_size,
+            partial(
+                _report_single,
+                self.pool,
+                self.mail,
+                retry_policy=self.retry_policy,
+                max_recipients=self.max_recipients,
+            ),
+            email_contents,
+        )
+
+    async def send_bulk(
+        self,
+        template: EmailTemplate,
+        recipients: EmailRecipients,
+        attachments: Optional[Mapping[str, MediaSource]] = None,
+        concurrency: int = 1,
+    ) -> List[SendReport]:
+        return await _send_bulk(
+            self.pool,
+            self.mail,
+            template,
+            recipients,
+            attachments,
+            self.retry_policy,
+            concurrency,
+            self.max_recipients,
+        )
+
+    __call__ = send
+
+    async def aclose(self) -> None:
+        await self.pool.aclose()
+
+    async def __aenter__(self) -> "EmailSender":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        await self.aclose()
+
+
+def setup_email(
+    mail: str,
+    password: str,
+    pool_size: Optional[int] = None,
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    timeout: Optional[float] = None,
+    settings: Settings = Config,
+):
+    sender = EmailSender(
+        mail,
+        password,
+        pool_size,
+        host=host,
+        port=port,
+        timeout=timeout,
+        settings=settings,
+    )
 
-        success = await _send(server, email_body)
-        return success
+    async def send_email(
+        email_input: EmailInput,
+    ) -> Union[EmailResult, List[SendReport]]:
+        return await sender.send(email_input)
 
+    send_email.stream = sender.stream  # type: ignore
+    send_email.send_bulk = sender.send_bulk  # type: ignore
+    send_email.aclose = sender.aclose  # type: ignore
     return send_email
@@ -0,0 +1,248 @@
+import asyncio
+import base64
+import io
+import mmap
+import os
+import tempfile
+from collections import abc
+from typing import AsyncIterable, AsyncIterator, List, Optional, Union
+
+from aiohttp.abc import AbstractStreamWriter
+from aiohttp.payload import Payload
+
+MEDIA_CHUNK_SIZE = 2**16
+MIME_LINE_BYTES = 57
+LARGE_MEDIA_SIZE = 2**18
+
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+MediaSource = Union[
+    bytes,
+    bytearray,
+    memoryview,
+    mmap.mmap,
+    os.PathLike,
+    io.IOBase,
+    AsyncIterable[bytes],
+]
+
+
+def is_buffer(media: object) -> bool:
+    return isinstance(media, (bytes, bytearray, memoryview, mmap.mmap))
+
+
+def as_buffer(media: Buffer) -> Union[bytes, bytearray, memoryview]:
+    return memoryview(media) if isinstance(media, mmap.mmap) else media
+
+
+def _is_seekable(source: object) -> bool:
+    return isinstance(source, io.IOBase) and source.seekable()
+
+
+class MediaStream:
+    __slots__ = ("source", "_offset", "_consumed", "_owned")
+
+    def __init__(
+        self,
+        source: Union[os.PathLike, io.IOBase, AsyncIterable[bytes]],
+        owned: bool = False,
+    ) -> None:
+        if not isinstance(source, (os.PathLike, io.IOBase, abc.AsyncIterable)):
+            raise TypeError(
+                f"Unsupported media source: {type(source).__name__}"
+            )
+        self.source = source
+        self._offset = source.tell() if _is_seekable(source) else None
+        self._consumed = False
+        self._owned = owned
+
+    @property
+    def size(self) -> Optional[int]:
+        if isinstance(self.source, os.PathLike):
+            return os.stat(self.source).st_size
+        if self._offset is not None:
+            source = self.source
+            position = source.tell()
+            end = source.seek(0, io.SEEK_END)
+            source.seek(position)
+            return end - self._offset
+        return None
+
+    @property
+    def name(self) -> Optional[str]:
+        path = (
+            self.source
+            if isinstance(self.source, os.PathLike)
+            else getattr(self.source, "name", None)
+        )
+        if not isinstance(path, (str, os.PathLike)):
+            return None
+        return os.path.basename(os.fspath(path))
+
+    @property
+    def replayable(self) -> bool:
+        return isinstance(self.source, os.PathLike) or self._offset is not None
+
+    def close(self) -> None:
+        if self._owned and isinstance(self.source, io.IOBase):
+            self.source.close()
+
+    def _claim(self) -> None:
+        if self._consumed and not self.replayable:
+            raise RuntimeError("Media stream can only be read once")
+        self._consumed = True
+
+    async def chunks(
+        self, chunk_size: int = MEDIA_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        loop = asyncio.get_running_loop()
+        if isinstance(self.source, os.PathLike):
+            file = await loop.run_in_executor(None, open, self.source, "rb")
+            try:
+                async for chunk in _read_file(file, chunk_size):
+                    yield chunk
+            finally:
+                await loop.run_in_executor(None, file.close)
+            return
+        self._claim()
+        if isinstance(self.source, io.IOBase):
+            if self._offset is not None:
+                self.source.seek(self._offset)
+            async for chunk in _read_file(self.source, chunk_size):
+                yield chunk
+            return
+        async for chunk in self.source:
+            yield chunk
+
+
+async def _read_file(file: io.IOBase, chunk_size: int) -> AsyncIterator[bytes]:
+    loop = asyncio.get_running_loop()
+    while True:
+        chunk = await loop.run_in_executor(None, file.read, chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+Media = Union[Buffer, MediaStream]
+
+
+def to_media(source: MediaSource) -> Media:
+    if is_buffer(source) or isinstance(source, MediaStream):
+        return source
+    return MediaStream(source)
+
+
+async def read_media(media: Media) -> Buffer:
+    if not isinstance(media, MediaStream):
+        return media
+    return b"".join([chunk async for chunk in media.chunks()])
+
+
+async def _spool(chunks: AsyncIterator[bytes]) -> Media:
+    loop = asyncio.get_running_loop()
+    head: List[bytes] = []
+    size = 0
+    async for chunk in chunks:
+        head.append(bytes(chunk))
+        size += len(chunk)
+        if size > LARGE_MEDIA_SIZE:
+            break
+    else:
+        return b"".join(head)
+    file = await loop.run_in_executor(None, tempfile.TemporaryFile)
+    try:
+        await loop.run_in_executor(None, file.writelines, head)
+        async for chunk in chunks:
+            await loop.run_in_executor(None, file.write, chunk)
+        await loop.run_in_executor(None, file.seek, 0)
+    except BaseException:
+        file.close()
+        raise
+    return MediaStream(file, owned=True)
+
+
+async def make_replayable(media: Media) -> Media:
+    if isinstance(media, MediaStream) and not media.replayable:
+        return await _spool(media.chunks())
+    return media
+
+
+def close_media(media: object) -> None:
+    if isinstance(media, MediaStream):
+        media.close()
+
+
+def get_media_size(media: Media) -> Optional[int]:
+    if isinstance(media, MediaStream):
+        return media.size
+    return memoryview(media).nbytes
+
+
+def is_large_media(media: Media) -> bool:
+    size = get_media_size(media)
+    return size is None or size > LARGE_MEDIA_SIZE
+
+
+async def iter_media(
+    media: Media, chunk_size: int = MEDIA_CHUNK_SIZE
+) -> AsyncIterator[Union[bytes, memoryview]]:
+    if isinstance(media, MediaStream):
+        async for chunk in media.chunks(chunk_size):
+            yield chunk
+        return
+    view = memoryview(media).cast("B")
+    for start in range(0, len(view), chunk_size):
+        if start:
+            await asyncio.sleep(0)
+        end = start + chunk_size
+        yield view[start:end]
+
+
+async def iter_aligned(
+    media: Media, chunk_size: int, alignment: int
+) -> AsyncIterator[Union[bytes, memoryview]]:
+    if chunk_size % alignment:
+        raise ValueError(f"Chunk size must be a multiple of {alignment}")
+    pending = b""
+    async for chunk in iter_media(media, chunk_size):
+        if pending:
+            chunk = pending + bytes(chunk)
+        cut = len(chunk) - len(chunk) % alignment
+        pending = bytes(chunk[cut:])
+        if cut:
+            yield memoryview(chunk)[:cut]
+    if pending:
+        yield pending
+
+
+async def iter_mime_base64(
+    media: Media,
+    chunk_size: int = 1024 * MIME_LINE_BYTES,
+    linesep: bytes = b"\n",
+) -> AsyncIterator[bytes]:
+    async for chunk in iter_aligned(media, chunk_size, MIME_LINE_BYTES):
+        encoded = base64.encodebytes(chunk)
+        yield encoded if linesep == b"\n" else encoded.replace(b"\n", linesep)
+
+
+async def encode_mime_base64(
+    media: Media, chunk_size: int = 1024 * MIME_LINE_BYTES
+) -> str:
+    return "".join(
+        [
+            chunk.decode("ascii")
+            async for chunk in iter_mime_base64(media, chunk_size)
+        ]
+    )
+
+
+class MediaPayload(Payload):
+    def __init__(self, value: Media, **kwargs) -> None:
+        kwargs.setdefault("content_type", "application/octet-stream")
+        super().__init__(value, **kwargs)
+        self._size = get_media_size(value)
+
+    async def write(self, writer: AbstractStreamWriter) -> None:
+        async for chunk in iter_media(self._value):
+            await writer.write(chunk)
@@ -0,0 +1,108 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple, Union
+
+from ..config import Config
+from ..src.media import LARGE_MEDIA_SIZE
+
+
+def hash_media(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+async def hash_media_async(data: bytes) -> str:
+    if memoryview(data).nbytes <= LARGE_MEDIA_SIZE:
+        return hash_media(data)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, hash_media, data)
+
+
+class FileIdCache:
+    def __init__(
+        self,
+        max_entries: int = Config.TELEGRAM_FILE_ID_CACHE_SIZE,
+        path: Optional[Union[str, "os.PathLike[str]"]] = None,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("File id cache size must be at least 1")
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._uploads: Dict[str, asyncio.Event] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            self._db = sqlite3.connect(os.fspath(path))
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS file_ids "
+                "(key TEXT PRIMARY KEY, file_id TEXT NOT NULL, used REAL)"
+            )
+            self._db.commit()
+
+    def _remember(self, key: str, file_id: str) -> None:
+        self._entries[key] = file_id
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        file_id = self._entries.get(key)
+        if file_id is not None:
+            self._entries.move_to_end(key)
+            return file_id
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT file_id FROM file_ids WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._remember(key, row[0])
+        return row[0]
+
+    def set(self, key: str, file_id: str) -> None:
+        self._remember(key, file_id)
+        if self._db is None:
+            return
+        self._db.execute(
+            "INSERT OR REPLACE INTO file_ids VALUES (?, ?, ?)",
+            (key, file_id, time.time()),
+        )
+        self._db.execute(
+            "DELETE FROM file_ids WHERE key NOT IN "
+            "(SELECT key FROM file_ids ORDER BY used DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+        self._db.commit()
+
+    def discard(self, key: str) -> None:
+        self._entries.pop(key, None)
+        if self._db is None:
+            return
+        self._db.execute("DELETE FROM file_ids WHERE key = ?", (key,))
+        self._db.commit()
+
+    async def acquire(self, key: str) -> Tuple[Optional[str], bool]:
+        while True:
+            file_id = self.get(key)
+            if file_id is not None:
+                return file_id, False
+            upload = self._uploads.get(key)
+            if upload is None:
+                self._uploads[key] = asyncio.Event()
+                return None, True
+            await upload.wait()
+
+    def release(self, key: str, file_id: Optional[str]) -> None:
+        if file_id is not None:
+            self.set(key, file_id)
+        upload = self._uploads.pop(key, None)
+        if upload is not None:
+            upload.set()
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
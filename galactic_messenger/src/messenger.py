@@ -0,0 +1,226 @@
+import asyncio
+import time
+from types import TracebackType
+from typing import (
+    Any,
+    Awaitable,
+    Dict,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Type,
+    TypedDict,
+)
+
+from ..src.mail import EmailContent, EmailSender, encode_shared_attachments
+from ..src.media import Buffer, MediaSource, MediaStream, read_media, to_media
+from ..src.report import is_delivered
+from ..src.streaming import encode_base64_media
+from ..src.telegram import AllowedBatchTelegramPayload, TelegramSender
+from ..src.whatsapp import AllowedBatchWhatsappPayload, WhatsappSender
+
+Channel = Literal["email", "telegram", "whatsapp"]
+
+MediaType = Literal["IMAGE", "VIDEO"]
+
+
+class AlertRecipients(TypedDict, total=False):
+    email: List[str]
+    telegram: List[str]
+    whatsapp: List[str]
+
+
+class _AlertBase(TypedDict):
+    text: str
+    recipients: AlertRecipients
+
+
+class Alert(_AlertBase, total=False):
+    subject: str
+    media: MediaSource
+    media_type: MediaType
+    media_name: str
+
+
+class ChannelResult(NamedTuple):
+    channel: Channel
+    ok: bool
+    results: List[Any]
+    error: Optional[BaseException]
+    latency: float
+
+
+def _get_subject(alert: Alert) -> str:
+    return alert.get("subject") or (alert["text"].splitlines() or [""])[0]
+
+
+def _get_media_name(alert: Alert, media_type: MediaType) -> str:
+    source = alert.get("media")
+    media = None if source is None else to_media(source)
+    name = media.name if isinstance(media, MediaStream) else None
+    return alert.get("media_name") or name or media_type.lower()
+
+
+async def _build_email(
+    alert: Alert, media: Optional[Buffer]
+) -> List[EmailContent]:
+    recipients = alert["recipients"].get("email", [])
+    if media is None:
+        return [
+            {
+                "to": recipient,
+                "subject": _get_subject(alert),
+                "message": alert["text"],
+            }
+            for recipient in recipients
+        ]
+    attachment_name = _get_media_name(alert, alert.get("media_type", "IMAGE"))
+    (attachment,) = await encode_shared_attachments({attachment_name: media})
+    return [
+        {
+            "to": recipient,
+            "subject": _get_subject(alert),
+            "message": alert["text"],
+            "attachment_name": attachment_name,
+            "attachment": attachment,
+        }
+        for recipient in recipients
+    ]
+
+
+def _build_telegram(
+    alert: Alert, media: Optional[Buffer]
+) -> AllowedBatchTelegramPayload:
+    recipients = alert["recipients"].get("telegram", [])
+    if media is None:
+        return [
+            {"chat_id": chat_id, "text": alert["text"]}
+            for chat_id in recipients
+        ]
+    media_field = (
+        "video" if alert.get("media_type", "IMAGE") == "VIDEO" else "photo"
+    )
+    return [
+        {  # type: ignore
+            "chat_id": chat_id,
+            media_field: media,
+            "caption": alert["text"],
+        }
+        for chat_id in recipients
+    ]
+
+
+async def _build_whatsapp(
+    alert: Alert, media: Optional[Buffer]
+) -> AllowedBatchWhatsappPayload:
+    recipients = alert["recipients"].get("whatsapp", [])
+    if media is None:
+        return [
+            {"groupId": group_id, "message": alert["text"]}
+            for group_id in recipients
+        ]
+    media_field = (
+        "videoBase64"
+        if alert.get("media_type", "IMAGE") == "VIDEO"
+        else "imageBase64"
+    )
+    encoded = await encode_base64_media(media)
+    return [
+        {  # type: ignore
+            "groupId": group_id,
+            media_field: encoded,
+            "caption": alert["text"],
+        }
+        for group_id in recipients
+    ]
+
+
+async def _send_channel(
+    channel: Channel, send: Awaitable[List[Any]]
+) -> ChannelResult:
+    started = time.perf_counter()
+    try:
+        results = await send
+        if results is None:
+            results = []
+        ok = all(map(is_delivered, results))
+    except Exception as error:
+        return ChannelResult(
+            channel, False, [], error, time.perf_counter() - started
+        )
+    return ChannelResult(
+        channel, ok, results, None, time.perf_counter() - started
+    )
+
+
+async def _send_email(
+    sender: EmailSender, alert: Alert, media: Optional[Buffer]
+) -> List[Any]:
+    return await sender.send(await _build_email(alert, media))
+
+
+async def _send_telegram(
+    sender: TelegramSender, alert: Alert, media: Optional[Buffer]
+) -> List[Any]:
+    return await sender.send_payload(_build_telegram(alert, media))
+
+
+async def _send_whatsapp(
+    sender: WhatsappSender, alert: Alert, media: Optional[Buffer]
+) -> List[Any]:
+    return await sender.send_payload(await _build_whatsapp(alert, media))
+
+
+class Messenger:
+    def __init__(
+        self,
+        email: Optional[EmailSender] = None,
+        telegram: Optional[TelegramSender] = None,
+        whatsapp: Optional[WhatsappSender] = None,
+    ) -> None:
+        self.email = email
+        self.telegram = telegram
+        self.whatsapp = whatsapp
+
+    async def send(self, alert: Alert) -> Dict[Channel, ChannelResult]:
+        senders = {
+            "email": (self.email, _send_email),
+            "telegram": (self.telegram, _send_telegram),
+            "whatsapp": (self.whatsapp, _send_whatsapp),
+        }
+        for channel in alert["recipients"]:
+            if senders.get(channel, (None,))[0] is None:
+                raise ValueError(f"No sender configured for {channel}")
+        source = alert.get("media")
+        media = None if source is None else await read_media(to_media(source))
+        results = await asyncio.gather(
+            *[
+                _send_channel(
+                    channel,
+                    senders[channel][1](senders[channel][0], alert, media),
+                )
+                for channel in alert["recipients"]
+            ]
+        )
+        return {result.channel: result for result in results}
+
+    async def aclose(self) -> None:
+        await asyncio.gather(
+            *[
+                sender.aclose()
+                for sender in (self.email, self.telegram, self.whatsapp)
+                if sender is not None
+            ]
+        )
+
+    async def __aenter__(self) -> "Messenger":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        await self.aclose()
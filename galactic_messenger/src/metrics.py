@@ -0,0 +1,292 @@
+import math
+import time
+import weakref
+from bisect import bisect_left
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from ..src.media import MediaStream, get_media_size, is_buffer
+from ..src.retry import RetryHook
+from ..src.streaming import Base64Media
+
+T = TypeVar("T")
+
+Labels = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str]
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels, value: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + value
+
+    def get(self, labels: Labels) -> float:
+        return self.values.get(labels, 0.0)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} "
+            f"{_format_value(value)}"
+            for labels, value in self.values.items()
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: Labels, value: float = 1.0) -> None:
+        self.inc(labels, -value)
+
+    def set(self, labels: Labels, value: float) -> None:
+        self.values[labels] = value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.counts: Dict[Labels, List[int]] = {}
+        self.sums: Dict[Labels, float] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        counts = self.counts.get(labels)
+        if counts is None:
+            counts = self.counts[labels] = [0] * (len(self.buckets) + 1)
+            self.sums[labels] = 0.0
+        counts[bisect_left(self.buckets, value)] += 1
+        self.sums[labels] += value
+
+    def count(self, labels: Labels) -> int:
+        return sum(self.counts.get(labels, ()))
+
+    def samples(self) -> List[str]:
+        lines = []
+        bucket_names = self.labelnames + ("le",)
+        for labels, counts in self.counts.items():
+            total = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                total += count
+                bucket_labels = _format_labels(
+                    bucket_names, labels + (_format_value(bound),)
+                )
+                lines.append(f"{self.name}_bucket{bucket_labels} {total}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(
+                f"{self.name}_sum{label_text} "
+                f"{_format_value(self.sums[labels])}"
+            )
+            lines.append(f"{self.name}_count{label_text} {total}")
+        return lines
+
+
+_pools: MutableMapping[Any, str] = weakref.WeakKeyDictionary()
+
+
+def track_pool(pool: Any, name: str) -> None:
+    _pools[pool] = name
+
+
+class MetricsRegistry:
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        labels = ("channel", "payload_type")
+        self.latency = Histogram(
+            "galactic_messenger_send_duration_seconds",
+            "Time spent sending one message, including retries.",
+            labels,
+            buckets,
+        )
+        self.in_flight = Gauge(
+            "galactic_messenger_in_flight_sends",
+            "Messages currently being sent.",
+            labels,
+        )
+        self.sent = Counter(
+            "galactic_messenger_sent_total",
+            "Messages accepted by the upstream.",
+            labels,
+        )
+        self.failures = Counter(
+            "galactic_messenger_failures_total",
+            "Messages that failed after all retries.",
+            labels + ("reason",),
+        )
+        self.retries = Counter(
+            "galactic_messenger_retries_total",
+            "Retried attempts.",
+            labels,
+        )
+        self.uploaded_bytes = Counter(
+            "galactic_messenger_uploaded_bytes_total",
+            "Payload bytes sent, counting every attempt.",
+            labels,
+        )
+
+    def _pool_gauge(self) -> Gauge:
+        gauge = Gauge(
+            "galactic_messenger_pool_connections",
+            "Pooled connections by state.",
+            ("pool", "state"),
+        )
+        for pool, name in list(_pools.items()):
+            gauge.set((name, "idle"), pool.idle)
+            gauge.set((name, "in_use"), pool.in_use)
+        return gauge
+
+    def render(self) -> str:
+        lines = []
+        for metric in (
+            self.latency,
+            self.in_flight,
+            self.sent,
+            self.failures,
+            self.retries,
+            self.uploaded_bytes,
+            self._pool_gauge(),
+        ):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+_registry: Optional[MetricsRegistry] = None
+
+
+def enable_metrics(
+    registry: Optional[MetricsRegistry] = None,
+) -> MetricsRegistry:
+    global _registry
+    _registry = registry or MetricsRegistry()
+    return _registry
+
+
+def disable_metrics() -> None:
+    global _registry
+    _registry = None
+
+
+def get_metrics() -> Optional[MetricsRegistry]:
+    return _registry
+
+
+def get_upload_size(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if is_buffer(value) or isinstance(value, MediaStream):
+        return get_media_size(value) or 0
+    if isinstance(value, Base64Media):
+        return value.size or 0
+    if isinstance(value, Mapping):
+        return sum(map(get_upload_size, value.values()))
+    if isinstance(value, (list, tuple)):
+        return sum(map(get_upload_size, value))
+    return 0
+
+
+def _no_failure(result: Any) -> Optional[str]:
+    return None
+
+
+async def instrument_send(
+    channel: str,
+    payload_type: str,
+    payload: Any,
+    call: Callable[[Optional[RetryHook]], Awaitable[T]],
+    on_retry: Optional[RetryHook] = None,
+    get_failure_reason: Callable[[T], Optional[str]] = _no_failure,
+) -> T:
+    metrics = _registry
+    if metrics is None:
+        return await call(on_retry)
+    labels = (channel, payload_type)
+    attempts = 1
+
+    def count_retry(result, error, attempt):
+        nonlocal attempts
+        attempts += 1
+        metrics.retries.inc(labels)
+        if on_retry is not None:
+            on_retry(result, error, attempt)
+
+    metrics.in_flight.inc(labels)
+    started = time.perf_counter()
+    try:
+        result = await call(count_retry)
+    except Exception as error:
+        metrics.failures.inc(labels + (type(error).__name__,))
+        raise
+    else:
+        reason = get_failure_reason(result)
+        if reason is None:
+            metrics.sent.inc(labels)
+        else:
+            metrics.failures.inc(labels + (reason,))
+        return result
+    finally:
+        metrics.in_flight.dec(labels)
+        metrics.latency.observe(labels, time.perf_counter() - started)
+        metrics.uploaded_bytes.inc(labels, get_upload_size(payload) * attempts)
@@ -0,0 +1,264 @@
+import asyncio
+import os
+import pickle
+import sqlite3
+import time
+from types import TracebackType
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+from ..config import Config
+from ..src.report import is_delivered
+from ..src.retry import RetryPolicy, get_backoff_delay
+
+Sender = Callable[[List[Any]], Awaitable[List[Any]]]
+
+OutboxRow = Tuple[int, bytes, int]
+
+
+class Outbox:
+    def __init__(
+        self,
+        path: Union[str, "os.PathLike[str]"],
+        senders: Mapping[str, Sender],
+        workers: int = Config.OUTBOX_WORKERS,
+        batch_size: int = Config.OUTBOX_BATCH_SIZE,
+        max_attempts: int = Config.OUTBOX_MAX_ATTEMPTS,
+        poll_interval: float = Config.OUTBOX_POLL_INTERVAL,
+        retry_policy: RetryPolicy = RetryPolicy(),
+    ) -> None:
+        if workers < 1:
+            raise ValueError("Outbox needs at least 1 worker")
+        if batch_size < 1:
+            raise ValueError("Outbox batch size must be at least 1")
+        self.senders = dict(senders)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.retry_policy = retry_policy
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._db: Optional[sqlite3.Connection] = sqlite3.connect(
+            os.fspath(path)
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "channel TEXT NOT NULL, "
+            "item BLOB NOT NULL, "
+            "state TEXT NOT NULL, "
+            "attempts INTEGER NOT NULL, "
+            "available_at REAL NOT NULL, "
+            "error TEXT)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS outbox_ready "
+            "ON outbox (state, available_at, id)"
+        )
+        self._release_claimed()
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            raise RuntimeError("Outbox is closed")
+        return self._db
+
+    @property
+    def closed(self) -> bool:
+        return self._db is None
+
+    def _count(self, *states: str) -> int:
+        return self.db.execute(
+            "SELECT COUNT(*) FROM outbox WHERE state IN "
+            f"({', '.join('?' for _ in states)})",
+            states,
+        ).fetchone()[0]
+
+    @property
+    def pending(self) -> int:
+        return self._count("pending", "claimed")
+
+    @property
+    def dead(self) -> int:
+        return self._count("dead")
+
+    def _release_claimed(self) -> None:
+        self.db.execute(
+            "UPDATE outbox SET state = 'pending' WHERE state = 'claimed'"
+        )
+        self.db.commit()
+
+    def _notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def enqueue_many(self, channel: str, items: Iterable[Any]) -> List[int]:
+        if channel not in self.senders:
+            raise ValueError(f"Unknown outbox channel: {channel}")
+        rows = [pickle.dumps(item) for item in items]
+        now = time.time()
+        with self.db:
+            ids = [
+                self.db.execute(
+                    "INSERT INTO outbox "
+                    "(channel, item, state, attempts, available_at) "
+                    "VALUES (?, ?, 'pending', 0, ?)",
+                    (channel, row, now),
+                ).lastrowid
+                for row in rows
+            ]
+        self._notify()
+        return ids  # type: ignore
+
+    def enqueue(self, channel: str, item: Any) -> int:
+        return self.enqueue_many(channel, [item])[0]
+
+    def dead_letters(self) -> List[Tuple[int, str, Any, Optional[str]]]:
+        return [
+            (row_id, channel, pickle.loads(item), error)
+            for row_id, channel, item, error in self.db.execute(
+                "SELECT id, channel, item, error FROM outbox "
+                "WHERE state = 'dead' ORDER BY id"
+            )
+        ]
+
+    def requeue_dead(self) -> int:
+        with self.db:
+            count = self.db.execute(
+                "UPDATE outbox SET state = 'pending', attempts = 0, "
+                "available_at = ? WHERE state = 'dead'",
+                (time.time(),),
+            ).rowcount
+        self._notify()
+        return count
+
+    def _claim(self) -> Optional[Tuple[str, List[OutboxRow]]]:
+        row = self.db.execute(
+            "SELECT channel FROM outbox WHERE state = 'pending' "
+            "AND available_at <= ? ORDER BY id LIMIT 1",
+            (time.time(),),
+        ).fetchone()
+        if row is None:
+            return None
+        channel = row[0]
+        rows = self.db.execute(
+            "SELECT id, item, attempts FROM outbox WHERE state = 'pending' "
+            "AND channel = ? AND available_at <= ? ORDER BY id LIMIT ?",
+            (channel, time.time(), self.batch_size),
+        ).fetchall()
+        with self.db:
+            self.db.executemany(
+                "UPDATE outbox SET state = 'claimed' WHERE id = ?",
+                [(row_id,) for row_id, _, _ in rows],
+            )
+        return channel, rows
+
+    def _next_available_in(self) -> float:
+        row = self.db.execute(
+            "SELECT MIN(available_at) FROM outbox WHERE state = 'pending'"
+        ).fetchone()
+        if row[0] is None:
+            return self.poll_interval
+        return min(max(row[0] - time.time(), 0), self.poll_interval)
+
+    async def _deliver(self, channel: str, rows: List[OutboxRow]) -> None:
+        try:
+            items = [pickle.loads(item) for _, item, _ in rows]
+            results = await self.senders[channel](items)
+            if not isinstance(results, list) or len(results) != len(rows):
+                raise ValueError(
+                    f"The {channel} sender must return one result per item"
+                )
+        except Exception as error:
+            results = [error] * len(rows)
+        now = time.time()
+        with self.db:
+            for (row_id, _, attempts), result in zip(rows, results):
+                if is_delivered(result):
+                    self.db.execute(
+                        "DELETE FROM outbox WHERE id = ?", (row_id,)
+                    )
+                elif attempts + 1 >= self.max_attempts:
+                    self.db.execute(
+                        "UPDATE outbox SET state = 'dead', attempts = ?, "
+                        "error = ? WHERE id = ?",
+                        (attempts + 1, repr(result), row_id),
+                    )
+                else:
+                    self.db.execute(
+                        "UPDATE outbox SET state = 'pending', attempts = ?, "
+                        "available_at = ?, error = ? WHERE id = ?",
+                        (
+                            attempts + 1,
+                            now
+                            + get_backoff_delay(self.retry_policy, attempts),
+                            repr(result),
+                            row_id,
+                        ),
+                    )
+
+    async def _wait(self, wakeup: asyncio.Event) -> None:
+        try:
+            await asyncio.wait_for(wakeup.wait(), self._next_available_in())
+        except asyncio.TimeoutError:
+            pass
+        wakeup.clear()
+
+    async def _work(self, wakeup: asyncio.Event) -> None:
+        while True:
+            claimed = self._claim()
+            if claimed is None:
+                await self._wait(wakeup)
+            else:
+                await self._deliver(*claimed)
+
+    def start(self) -> None:
+        if self.closed:
+            raise RuntimeError("Outbox is closed")
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._work(self._wakeup))
+            for _ in range(self.workers)
+        ]
+
+    async def join(self) -> None:
+        while self.pending:
+            await asyncio.sleep(min(self.poll_interval, 0.05))
+
+    async def aclose(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._wakeup = None
+        if self._db is not None:
+            self._release_claimed()
+            self._db.close()
+            self._db = None
+
+    async def __aenter__(self) -> "Outbox":
+        self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        await self.aclose()
@@ -0,0 +1,254 @@
+import asyncio
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from importlib.util import find_spec
+from types import TracebackType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from ..src.media import (
+    MediaSource,
+    as_buffer,
+    get_media_size,
+    is_buffer,
+    read_media,
+    to_media,
+)
+
+T = TypeVar("T")
+
+Alert = Dict[str, Any]
+
+MEGABYTE = 2**20
+
+MIN_IMAGE_QUALITY = 40
+
+VIDEO_TIMEOUT = 600
+
+
+class MediaLimits(NamedTuple):
+    max_photo_bytes: int
+    max_upload_bytes: int
+    max_photo_side: int
+    documents: bool
+
+
+TELEGRAM_MEDIA_LIMITS = MediaLimits(10 * MEGABYTE, 50 * MEGABYTE, 2560, True)
+
+WHATSAPP_MEDIA_LIMITS = MediaLimits(5 * MEGABYTE, 16 * MEGABYTE, 1600, False)
+
+_PreparedSource = Union[bytes, str]
+
+
+def _read_source(source: _PreparedSource) -> bytes:
+    if isinstance(source, bytes):
+        return source
+    with open(source, "rb") as file:
+        return file.read()
+
+
+def shrink_image(
+    source: _PreparedSource, max_side: int, max_bytes: int, quality: int = 85
+) -> bytes:
+    from PIL import Image
+
+    data = _read_source(source)
+    with Image.open(io.BytesIO(data)) as image:
+        if max(image.size) <= max_side and len(data) <= max_bytes:
+            return data
+        image.thumbnail((max_side, max_side))
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        while True:
+            output = io.BytesIO()
+            image.save(output, "JPEG", quality=quality, optimize=True)
+            if output.tell() <= max_bytes or quality <= MIN_IMAGE_QUALITY:
+                return output.getvalue()
+            quality = max(quality - 15, MIN_IMAGE_QUALITY)
+
+
+def shrink_video(
+    source: _PreparedSource,
+    max_bytes: int,
+    max_height: int = 720,
+    max_seconds: Optional[float] = None,
+    timeout: Optional[float] = VIDEO_TIMEOUT,
+) -> bytes:
+    with tempfile.TemporaryDirectory() as directory:
+        path = source
+        if isinstance(source, bytes):
+            path = os.path.join(directory, "input")
+            with open(path, "wb") as file:
+                file.write(source)
+        output = os.path.join(directory, "output.mp4")
+        command = ["ffmpeg", "-y", "-loglevel", "error", "-i", str(path)]
+        if max_seconds is not None:
+            command += ["-t", str(max_seconds)]
+        command += [
+            "-vf",
+            f"scale=-2:'min({max_height},ih)'",
+            "-c:v",
+            "libx264",
+            "-preset",
+            "veryfast",
+            "-crf",
+            "28",
+            "-c:a",
+            "aac",
+            "-b:a",
+            "96k",
+            "-movflags",
+            "+faststart",
+            "-fs",
+            str(int(max_bytes * 0.95)),
+            output,
+        ]
+        subprocess.run(
+            command, check=True, capture_output=True, timeout=timeout
+        )
+        return _read_source(output)
+
+
+class MediaPreprocessor:
+    def __init__(
+        self,
+        limits: MediaLimits = TELEGRAM_MEDIA_LIMITS,
+        executor: Optional[Executor] = None,
+        max_workers: Optional[int] = None,
+        image_quality: int = 85,
+        max_video_height: int = 720,
+        max_video_seconds: Optional[float] = None,
+        video_timeout: Optional[float] = VIDEO_TIMEOUT,
+    ) -> None:
+        self.limits = limits
+        self.image_quality = image_quality
+        self.max_video_height = max_video_height
+        self.max_video_seconds = max_video_seconds
+        self.video_timeout = video_timeout
+        self.max_workers = max_workers
+        self.can_resize_images = find_spec("PIL") is not None
+        self.can_transcode_videos = shutil.which("ffmpeg") is not None
+        self._executor = executor
+        self._owns_executor = executor is None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.max_workers)
+        return self._executor
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        try:
+            return await loop.run_in_executor(executor, partial(func, *args))
+        except BrokenProcessPool:
+            if self._owns_executor and self._executor is executor:
+                self._executor = None
+                executor.shutdown(wait=False)
+            raise
+
+    async def _load(self, source: MediaSource) -> _PreparedSource:
+        if isinstance(source, os.PathLike):
+            return os.fspath(source)
+        if is_buffer(source):
+            return bytes(as_buffer(source))
+        return bytes(await read_media(to_media(source)))
+
+    async def _prepare_image(self, alert: Alert) -> Alert:
+        source = alert["imageBytes"]
+        if self.can_resize_images:
+            loaded = await self._load(source)
+            if isinstance(loaded, bytes):
+                source = loaded
+            try:
+                source = await self._run(
+                    shrink_image,
+                    loaded,
+                    self.limits.max_photo_side,
+                    self.limits.max_photo_bytes,
+                    self.image_quality,
+                )
+            except (OSError, ValueError, BrokenProcessPool):
+                pass
+        size = get_media_size(to_media(source))
+        if (
+            self.limits.documents
+            and size is not None
+            and size > self.limits.max_photo_bytes
+        ):
+            document = {k: v for k, v in alert.items() if k != "imageBytes"}
+            return {**document, "documentBytes": source}
+        return {**alert, "imageBytes": source}
+
+    async def _prepare_video(self, alert: Alert) -> Alert:
+        source = alert["videoBytes"]
+        size = get_media_size(to_media(source))
+        if not self.can_transcode_videos or (
+            size is not None
+            and size <= self.limits.max_upload_bytes
+            and self.max_video_seconds is None
+        ):
+            return alert
+        loaded = await self._load(source)
+        if isinstance(loaded, bytes):
+            alert = {**alert, "videoBytes": loaded}
+        try:
+            video = await self._run(
+                shrink_video,
+                loaded,
+                self.limits.max_upload_bytes,
+                self.max_video_height,
+                self.max_video_seconds,
+                self.video_timeout,
+            )
+        except (OSError, subprocess.SubprocessError, BrokenProcessPool):
+            return alert
+        return {**alert, "videoBytes": video}
+
+    async def prepare(self, alert: Mapping[str, Any]) -> Alert:
+        if "imageBytes" in alert:
+            return await self._prepare_image(dict(alert))
+        if "videoBytes" in alert:
+            return await self._prepare_video(dict(alert))
+        return dict(alert)
+
+    async def __call__(
+        self, alerts: Union[Mapping[str, Any], List[Mapping[str, Any]]]
+    ) -> Union[Alert, List[Alert]]:
+        if isinstance(alerts, list):
+            return list(await asyncio.gather(*map(self.prepare, alerts)))
+        return await self.prepare(alerts)
+
+    async def aclose(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None and self._owns_executor:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, executor.shutdown)
+
+    async def __aenter__(self) -> "MediaPreprocessor":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        await self.aclose()
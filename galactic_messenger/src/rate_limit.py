@@ -0,0 +1,108 @@
+import asyncio
+import time
+from typing import Dict, Tuple
+
+from ..config import Config, Settings
+
+MAX_TRACKED_CHATS = 10000
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float) -> None:
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("Rate and capacity must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    @property
+    def idle(self) -> bool:
+        now = time.monotonic()
+        return (
+            self._paused_until <= now
+            and self._tokens + (now - self._updated) * self.rate
+            >= self.capacity
+        )
+
+    def _reserve(self) -> float:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+        self._tokens -= 1
+        return max(-self._tokens / self.rate, self._paused_until - now)
+
+    async def acquire(self) -> None:
+        delay = self._reserve()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = self._paused_until - time.monotonic()
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(
+            self._paused_until, time.monotonic() + seconds
+        )
+
+
+def _is_group(chat_id: str) -> bool:
+    return str(chat_id).startswith("-")
+
+
+class TelegramRateLimiter:
+    def __init__(
+        self,
+        global_rate: float = Config.TELEGRAM_GLOBAL_RATE_LIMIT,
+        chat_rate: float = Config.TELEGRAM_CHAT_RATE_LIMIT,
+        group_rate: float = Config.TELEGRAM_GROUP_RATE_LIMIT / 60,
+    ) -> None:
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self._global = TokenBucket(global_rate, global_rate)
+        self._chats: Dict[str, TokenBucket] = {}
+        self._groups: Dict[str, TokenBucket] = {}
+
+    def _get_bucket(
+        self, buckets: Dict[str, TokenBucket], chat_id: str, rate: float
+    ) -> TokenBucket:
+        bucket = buckets.get(chat_id)
+        if bucket is None:
+            if len(buckets) >= MAX_TRACKED_CHATS:
+                for key in [k for k, b in buckets.items() if b.idle]:
+                    del buckets[key]
+            bucket = buckets[chat_id] = TokenBucket(rate, 1)
+        return bucket
+
+    async def acquire(self, chat_id: str) -> None:
+        chat_id = str(chat_id)
+        await self._get_bucket(self._chats, chat_id, self.chat_rate).acquire()
+        if _is_group(chat_id):
+            await self._get_bucket(
+                self._groups, chat_id, self.group_rate
+            ).acquire()
+        await self._global.acquire()
+
+    def pause(self, chat_id: str, seconds: float) -> None:
+        self._get_bucket(self._chats, str(chat_id), self.chat_rate).pause(
+            seconds
+        )
+
+
+_rate_limiters: Dict[Tuple[str, float, float, float], TelegramRateLimiter] = {}
+
+
+def get_telegram_rate_limiter(
+    token: str, settings: Settings = Config
+) -> TelegramRateLimiter:
+    rates = (
+        settings.TELEGRAM_GLOBAL_RATE_LIMIT,
+        settings.TELEGRAM_CHAT_RATE_LIMIT,
+        settings.TELEGRAM_GROUP_RATE_LIMIT / 60,
+    )
+    key = (token, *rates)
+    rate_limiter = _rate_limiters.get(key)
+    if rate_limiter is None:
+        rate_limiter = _rate_limiters[key] = TelegramRateLimiter(*rates)
+    return rate_limiter
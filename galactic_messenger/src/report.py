@@ -0,0 +1,86 @@
+import time
+from contextvars import ContextVar
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+
+class SendReport(NamedTuple):
+    ok: bool
+    response: Any
+    error: Optional[BaseException]
+    attempts: int
+    latency: float
+
+
+_attempts: ContextVar[Optional[List[int]]] = ContextVar(
+    "galactic_messenger_attempts", default=None
+)
+
+
+def count_attempt() -> None:
+    counter = _attempts.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def is_delivered(result: Any) -> bool:
+    if isinstance(result, SendReport):
+        return result.ok
+    if isinstance(result, BaseException) or result is False:
+        return False
+    return not (isinstance(result, dict) and result.get("ok") is False)
+
+
+async def report_send(send: Awaitable[Any]) -> SendReport:
+    counter = [0]
+    token = _attempts.set(counter)
+    started = time.perf_counter()
+    try:
+        response = await send
+    except Exception as error:
+        return SendReport(
+            False, None, error, counter[0], time.perf_counter() - started
+        )
+    finally:
+        _attempts.reset(token)
+    return SendReport(
+        is_delivered(response),
+        response,
+        None,
+        counter[0],
+        time.perf_counter() - started,
+    )
+
+
+def split_report(report: SendReport, responses: List[Any]) -> List[SendReport]:
+    return [
+        report._replace(ok=is_delivered(response), response=response)
+        for response in responses
+    ]
+
+
+async def resend_failed(
+    send: Callable[[List[T]], Awaitable[List[SendReport]]],
+    items: Sequence[T],
+    reports: Sequence[SendReport],
+) -> List[SendReport]:
+    failed = [index for index, report in enumerate(reports) if not report.ok]
+    merged = list(reports)
+    if not failed:
+        return merged
+    retried = await send([items[index] for index in failed])
+    for index, report in zip(failed, retried):
+        merged[index] = report._replace(
+            attempts=reports[index].attempts + report.attempts
+        )
+    return merged
@@ -0,0 +1,86 @@
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, NamedTuple, Optional, TypeVar
+
+from ..config import Config, Settings
+from ..src.report import count_attempt
+
+T = TypeVar("T")
+
+RetryClassifier = Callable[
+    [Optional[T], Optional[BaseException]], Awaitable[Optional[float]]
+]
+RetryHook = Callable[[Optional[T], Optional[BaseException], int], None]
+
+
+class RetryPolicy(NamedTuple):
+    attempts: int = Config.RETRY_ATTEMPTS
+    base_delay: float = Config.RETRY_BASE_DELAY
+    max_delay: float = Config.RETRY_MAX_DELAY
+    deadline: Optional[float] = Config.RETRY_DEADLINE
+
+
+NO_RETRY = RetryPolicy(attempts=1)
+
+
+def get_retry_policy(settings: Settings = Config) -> RetryPolicy:
+    return RetryPolicy(
+        settings.RETRY_ATTEMPTS,
+        settings.RETRY_BASE_DELAY,
+        settings.RETRY_MAX_DELAY,
+        settings.RETRY_DEADLINE,
+    )
+
+
+def extend_deadline(policy: RetryPolicy, seconds: float) -> RetryPolicy:
+    if policy.deadline is None or not seconds:
+        return policy
+    return policy._replace(deadline=policy.deadline + seconds)
+
+
+def get_backoff_delay(policy: RetryPolicy, attempt: int) -> float:
+    return random.uniform(
+        0, min(policy.max_delay, policy.base_delay * 2**attempt)
+    )
+
+
+async def call_with_retry(
+    policy: RetryPolicy,
+    func: Callable[[], Awaitable[T]],
+    classify: RetryClassifier[T],
+    on_retry: Optional[RetryHook[T]] = None,
+) -> T:
+    deadline_at = (
+        time.monotonic() + policy.deadline
+        if policy.deadline is not None
+        else None
+    )
+    attempt = 0
+    while True:
+        result: Optional[T] = None
+        error: Optional[Exception] = None
+        count_attempt()
+        try:
+            result = await (
+                func()
+                if deadline_at is None
+                else asyncio.wait_for(
+                    func(), max(deadline_at - time.monotonic(), 0)
+                )
+            )
+        except Exception as e:
+            error = e
+        attempt += 1
+        retry_after = await classify(result, error)
+        if retry_after is None or attempt >= policy.attempts:
+            break
+        delay = max(retry_after, get_backoff_delay(policy, attempt - 1))
+        if deadline_at is not None and time.monotonic() + delay >= deadline_at:
+            break
+        if on_retry is not None:
+            on_retry(result, error, attempt)
+        await asyncio.sleep(delay)
+    if error is not None:
+        raise error
+    return result  # type: ignore
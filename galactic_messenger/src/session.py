@@ -0,0 +1,216 @@
+import asyncio
+import json
+import re
+from types import TracebackType
+from typing import Any, Awaitable, Literal, Optional, Set, Type, TypeVar
+
+import aiohttp
+
+from ..config import Config, Settings
+from ..src.utils import or_default
+
+S = TypeVar("S", bound="HttpSender")
+
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+ResponseMode = Literal["full", "status-only", "none"]
+
+TimeoutType = Literal["SINGLE", "BATCH"]
+
+_NOT_OK = re.compile(rb'"ok"\s*:\s*false')
+
+
+def _get_retry_after_header(response: aiohttp.ClientResponse) -> float:
+    try:
+        return float(response.headers.get("Retry-After", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+async def classify_http_retry(
+    response: Optional[aiohttp.ClientResponse], error: Optional[BaseException]
+) -> Optional[float]:
+    if error is not None:
+        return (
+            0.0
+            if isinstance(
+                error, (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+            )
+            else None
+        )
+    if response is not None and response.status in RETRYABLE_STATUSES:
+        return _get_retry_after_header(response)
+    return None
+
+
+def get_http_failure_reason(
+    response: aiohttp.ClientResponse,
+) -> Optional[str]:
+    return str(response.status) if response.status >= 400 else None
+
+
+def release_response(
+    response: Optional[aiohttp.ClientResponse],
+    error: Optional[BaseException],
+    attempt: int,
+) -> None:
+    if response is not None:
+        response.release()
+
+
+async def drain_response(response: aiohttp.ClientResponse) -> None:
+    try:
+        while await response.content.readany():
+            pass
+    finally:
+        response.release()
+
+
+def _parse_failure(response: aiohttp.ClientResponse, body: bytes) -> Any:
+    try:
+        return json.loads(body)
+    except ValueError:
+        return {"ok": False, "error_code": response.status}
+
+
+async def read_response(
+    response: aiohttp.ClientResponse, mode: ResponseMode = "full"
+) -> Any:
+    if mode == "full":
+        return await response.json()
+    if mode == "none":
+        await drain_response(response)
+        return None
+    try:
+        body = await response.read()
+    finally:
+        response.release()
+    if response.status >= 400 or _NOT_OK.search(body):
+        return _parse_failure(response, body)
+    return {"ok": True}
+
+
+def get_size_allowance(size: int, settings: Settings = Config) -> float:
+    return settings.TIMEOUT_PER_MEGABYTE * (size // 2**20)
+
+
+def get_request_timeout(
+    timeout_type: TimeoutType, size: int = 0, settings: Settings = Config
+) -> aiohttp.ClientTimeout:
+    total, connect = (
+        (settings.BATCH_TOTAL_TIMEOUT, settings.BATCH_CONNECT_TIMEOUT)
+        if timeout_type == "BATCH"
+        else (settings.SINGLE_TOTAL_TIMEOUT, settings.SINGLE_CONNECT_TIMEOUT)
+    )
+    return aiohttp.ClientTimeout(
+        total=total + get_size_allowance(size, settings), connect=connect
+    )
+
+
+def _create_connector(
+    limit: int, limit_per_host: int, keepalive_timeout: int, ttl_dns_cache: int
+) -> aiohttp.TCPConnector:
+    return aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        keepalive_timeout=keepalive_timeout,
+        ttl_dns_cache=ttl_dns_cache,
+        use_dns_cache=True,
+    )
+
+
+def _forget(task: asyncio.Future) -> None:
+    if not task.cancelled():
+        task.exception()
+
+
+class HttpSender:
+    def __init__(
+        self,
+        concurrency_limit: Optional[int] = None,
+        per_host_limit: Optional[int] = None,
+        keepalive_timeout: Optional[int] = None,
+        dns_cache_ttl: Optional[int] = None,
+        settings: Settings = Config,
+    ) -> None:
+        self.settings = settings
+        self.concurrency_limit = or_default(
+            concurrency_limit, settings.BATCH_CONCURRENCY_LIMIT
+        )
+        self.per_host_limit = or_default(
+            per_host_limit, settings.PER_HOST_CONNECTION_LIMIT
+        )
+        self.keepalive_timeout = or_default(
+            keepalive_timeout, settings.KEEPALIVE_TIMEOUT
+        )
+        self.dns_cache_ttl = or_default(dns_cache_ttl, settings.DNS_CACHE_TTL)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closed = False
+        self._detached: Set[asyncio.Future] = set()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _get_connector(self) -> Optional[aiohttp.BaseConnector]:
+        if self._session is None or self._session.closed:
+            return None
+        return self._session.connector
+
+    @property
+    def idle(self) -> int:
+        connector = self._get_connector()
+        if connector is None:
+            return 0
+        return sum(map(len, connector._conns.values()))
+
+    @property
+    def in_use(self) -> int:
+        connector = self._get_connector()
+        return 0 if connector is None else len(connector._acquired)
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._closed:
+            raise RuntimeError("Sender is closed")
+        loop = asyncio.get_running_loop()
+        if (
+            self._session is None
+            or self._session.closed
+            or self._loop is not loop
+        ):
+            self._session = aiohttp.ClientSession(
+                connector=_create_connector(
+                    self.concurrency_limit,
+                    self.per_host_limit,
+                    self.keepalive_timeout,
+                    self.dns_cache_ttl,
+                )
+            )
+            self._loop = loop
+        return self._session
+
+    def _detach(self, send: Awaitable[Any]) -> None:
+        task = asyncio.ensure_future(send)
+        self._detached.add(task)
+        task.add_done_callback(self._detached.discard)
+        task.add_done_callback(_forget)
+
+    async def aclose(self) -> None:
+        self._closed = True
+        await asyncio.gather(*self._detached, return_exceptions=True)
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
+
+    async def __aenter__(self: S) -> S:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        await self.aclose()
@@ -0,0 +1,233 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from types import TracebackType
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+)
+
+import aiosmtplib
+from aiosmtplib.typing import SMTPStatus
+
+from ..config import Config
+
+
+def _retrieve_exception(future: "asyncio.Future[Any]") -> None:
+    if not future.cancelled():
+        future.exception()
+
+
+def _close_server(server: aiosmtplib.SMTP) -> None:
+    waiter = getattr(server.protocol, "_response_waiter", None)
+    server.close()
+    if isinstance(waiter, asyncio.Future):
+        waiter.add_done_callback(_retrieve_exception)
+
+
+class PooledSMTPConnection:
+    def __init__(self, server: aiosmtplib.SMTP) -> None:
+        self.server = server
+        self.messages_sent = 0
+        self.last_used = time.monotonic()
+
+    @property
+    def is_connected(self) -> bool:
+        return self.server.is_connected
+
+    async def send_message(self, *args: Any, **kwargs: Any) -> Any:
+        response = await self.server.send_message(*args, **kwargs)
+        self.messages_sent += 1
+        return response
+
+    async def sendmail(self, *args: Any, **kwargs: Any) -> Any:
+        response = await self.server.sendmail(*args, **kwargs)
+        self.messages_sent += 1
+        return response
+
+    async def _write_data(
+        self, chunks: AsyncIterable[bytes]
+    ) -> aiosmtplib.SMTPResponse:
+        server = self.server
+        protocol = server.protocol
+        async for chunk in chunks:
+            protocol.write(chunk)
+            await asyncio.wait_for(protocol._drain_helper(), server.timeout)
+        protocol.write(b".\r\n")
+        return await protocol.read_response(timeout=server.timeout)
+
+    async def send_chunks(
+        self,
+        sender: str,
+        recipients: List[str],
+        chunks: AsyncIterable[bytes],
+    ) -> Tuple[Dict[str, aiosmtplib.SMTPResponse], str]:
+        server = self.server
+        try:
+            await server.mail(sender)
+            refused = []
+            for recipient in recipients:
+                try:
+                    await server.rcpt(recipient)
+                except aiosmtplib.SMTPRecipientRefused as error:
+                    refused.append(error)
+            if len(refused) == len(recipients):
+                raise aiosmtplib.SMTPRecipientsRefused(refused)
+            response = await server.execute_command(b"DATA")
+            if response.code != SMTPStatus.start_input:
+                raise aiosmtplib.SMTPDataError(response.code, response.message)
+        except (
+            aiosmtplib.SMTPResponseException,
+            aiosmtplib.SMTPRecipientsRefused,
+        ):
+            await server.rset()
+            raise
+        try:
+            response = await self._write_data(chunks)
+        except BaseException:
+            _close_server(server)
+            raise
+        if response.code != SMTPStatus.completed:
+            raise aiosmtplib.SMTPDataError(response.code, response.message)
+        self.messages_sent += 1
+        return {
+            error.recipient: aiosmtplib.SMTPResponse(error.code, error.message)
+            for error in refused
+        }, response.message
+
+
+class SMTPPool:
+    def __init__(
+        self,
+        connect: Callable[[], Awaitable[aiosmtplib.SMTP]],
+        max_size: int = Config.SMTP_POOL_SIZE,
+        max_messages_per_connection: int = (
+            Config.SMTP_MAX_MESSAGES_PER_CONNECTION
+        ),
+        health_check_interval: float = Config.SMTP_HEALTH_CHECK_INTERVAL,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("SMTP pool size must be at least 1")
+        self.connect = connect
+        self.max_size = max_size
+        self.max_messages_per_connection = max_messages_per_connection
+        self.health_check_interval = health_check_interval
+        self._idle: Deque[PooledSMTPConnection] = deque()
+        self._in_use = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closed = False
+
+    @property
+    def size(self) -> int:
+        return len(self._idle) + self._in_use
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._closed:
+            raise RuntimeError("SMTP pool is closed")
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._idle.clear()
+            self._in_use = 0
+            self._semaphore = asyncio.Semaphore(self.max_size)
+            self._loop = loop
+        return self._semaphore
+
+    async def _is_healthy(self, connection: PooledSMTPConnection) -> bool:
+        if not connection.is_connected:
+            return False
+        if (
+            time.monotonic() - connection.last_used
+            < self.health_check_interval
+        ):
+            return True
+        try:
+            await connection.server.noop()
+            return True
+        except aiosmtplib.SMTPException:
+            return False
+
+    async def _checkout(self) -> PooledSMTPConnection:
+        while self._idle:
+            connection = self._idle.pop()
+            if await self._is_healthy(connection):
+                return connection
+            await self._retire(connection)
+        return PooledSMTPConnection(await self.connect())
+
+    async def _retire(self, connection: PooledSMTPConnection) -> None:
+        if not connection.is_connected:
+            _close_server(connection.server)
+            return
+        try:
+            await connection.server.quit()
+        except aiosmtplib.SMTPException:
+            _close_server(connection.server)
+
+    async def _checkin(self, connection: PooledSMTPConnection) -> None:
+        if (
+            self._closed
+            or not connection.is_connected
+            or connection.messages_sent >= self.max_messages_per_connection
+        ):
+            await self._retire(connection)
+            return
+        connection.last_used = time.monotonic()
+        self._idle.append(connection)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[PooledSMTPConnection]:
+        async with self._get_semaphore():
+            connection = await self._checkout()
+            self._in_use += 1
+            try:
+                yield connection
+            except aiosmtplib.SMTPResponseException:
+                self._in_use -= 1
+                await self._checkin(connection)
+                raise
+            except BaseException:
+                self._in_use -= 1
+                await self._retire(connection)
+                raise
+            else:
+                self._in_use -= 1
+                await self._checkin(connection)
+
+    async def aclose(self) -> None:
+        self._closed = True
+        idle, self._idle = self._idle, deque()
+        await asyncio.gather(*map(self._retire, idle))
+
+    async def __aenter__(self) -> "SMTPPool":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        await self.aclose()
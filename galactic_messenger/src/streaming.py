@@ -0,0 +1,101 @@
+import base64
+import json
+from typing import Any, AsyncIterator, List, Mapping, Optional, Union
+
+from aiohttp.abc import AbstractStreamWriter
+from aiohttp.payload import Payload
+
+from ..src.media import (
+    Media,
+    MediaStream,
+    as_buffer,
+    get_media_size,
+    iter_aligned,
+)
+
+BASE64_CHUNK_SIZE = 3 * 16384
+
+
+class Base64Media:
+    __slots__ = ("data", "encoded")
+
+    def __init__(
+        self, data: Media, encoded: Optional[List[bytes]] = None
+    ) -> None:
+        self.data = data
+        self.encoded = encoded
+
+    @property
+    def size(self) -> Optional[int]:
+        if self.encoded is not None:
+            return sum(map(len, self.encoded))
+        size = get_media_size(self.data)
+        return None if size is None else 4 * ((size + 2) // 3)
+
+    async def chunks(
+        self, chunk_size: int = BASE64_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        if self.encoded is not None:
+            for chunk in self.encoded:
+                yield chunk
+            return
+        async for chunk in iter_aligned(self.data, chunk_size, 3):
+            yield base64.b64encode(chunk)
+
+    def __str__(self) -> str:
+        if self.encoded is not None:
+            return b"".join(self.encoded).decode("ascii")
+        if isinstance(self.data, MediaStream):
+            raise TypeError("Streamed media can only be encoded in chunks")
+        return base64.b64encode(as_buffer(self.data)).decode("utf-8")
+
+
+async def encode_base64_media(media: Media) -> Base64Media:
+    unencoded = Base64Media(media)
+    return Base64Media(media, [chunk async for chunk in unencoded.chunks()])
+
+
+class JsonBase64Payload(Payload):
+    def __init__(self, value: Mapping[str, Any], **kwargs: Any) -> None:
+        super().__init__(value, content_type="application/json", **kwargs)
+        self._parts: List[Union[bytes, Base64Media]] = [b"{"]
+        for index, (key, item) in enumerate(value.items()):
+            prefix = b", " if index else b""
+            key_bytes = json.dumps(key).encode("utf-8")
+            if isinstance(item, Base64Media):
+                self._parts.extend([prefix + key_bytes + b': "', item, b'"'])
+            else:
+                self._parts.append(
+                    prefix
+                    + key_bytes
+                    + b": "
+                    + json.dumps(item).encode("utf-8")
+                )
+        self._parts.append(b"}")
+        sizes = [
+            part.size if isinstance(part, Base64Media) else len(part)
+            for part in self._parts
+        ]
+        self._size = None if None in sizes else sum(sizes)
+
+    async def write(self, writer: AbstractStreamWriter) -> None:
+        for part in self._parts:
+            if isinstance(part, Base64Media):
+                async for chunk in part.chunks():
+                    await writer.write(chunk)
+            else:
+                await writer.write(part)
+
+    def decode(self, encoding: str = "utf-8", errors: str = "strict") -> str:
+        return b"".join(
+            (
+                str(part).encode("ascii")
+                if isinstance(part, Base64Media)
+                else part
+            )
+            for part in self._parts
+        ).decode(encoding, errors)
+
+
+def has_base64_media(value: Mapping[str, Any]) -> bool:
+    return any(isinstance(item, Base64Media) for item in value.values())
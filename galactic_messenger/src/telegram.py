@@ -1,10 +1,62 @@
+import json
 from functools import partial
-from typing import List, Literal, TypedDict, Union, cast
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypedDict,
+    Union,
+    cast,
+)
 
 import aiohttp
 
-from ..config import Config
-from ..src.utils import compose, is_schema
+from ..config import Config, Settings
+from ..src.media import (
+    Media,
+    MediaPayload,
+    MediaSource,
+    MediaStream,
+    as_buffer,
+    close_media,
+    is_buffer,
+    is_large_media,
+    make_replayable,
+    to_media,
+)
+from ..src.media_cache import FileIdCache, hash_media_async
+from ..src.rate_limit import TelegramRateLimiter, get_telegram_rate_limiter
+from ..src.report import SendReport, report_send, split_report
+from ..src.retry import (
+    RetryPolicy,
+    call_with_retry,
+    extend_deadline,
+    get_retry_policy,
+)
+from ..src.metrics import get_upload_size, instrument_send, track_pool
+from ..src.session import (
+    HttpSender,
+    ResponseMode,
+    TimeoutType,
+    classify_http_retry,
+    get_http_failure_reason,
+    get_request_timeout,
+    get_size_allowance,
+    read_response,
+    release_response,
+)
+from ..src.utils import (
+    SchemaDispatcher,
+    or_default,
+    gather_with_concurrency,
+    stream_with_concurrency,
+)
 
 
 class TelegramMessagePayload(TypedDict):
@@ -14,22 +66,45 @@ class TelegramMessagePayload(TypedDict):
 
 class TelegramImagePayload(TypedDict):
     chat_id: str
-    photo: bytes
+    photo: Union[str, Media]
     caption: str
 
 
 class TelegramVideoPayload(TypedDict):
     chat_id: str
-    video: bytes
+    video: Union[str, Media]
     caption: str
 
 
+class TelegramDocumentPayload(TypedDict):
+    chat_id: str
+    document: Union[str, Media]
+    caption: str
+
+
+TelegramMediaPayload = Union[TelegramImagePayload, TelegramVideoPayload]
+
+
+class TelegramMediaGroupPayload(TypedDict):
+    chat_id: str
+    media: List[TelegramMediaPayload]
+
+
 AllowedSingleTelegramPayload = Union[
-    TelegramMessagePayload, TelegramImagePayload, TelegramVideoPayload
+    TelegramMessagePayload,
+    TelegramImagePayload,
+    TelegramVideoPayload,
+    TelegramDocumentPayload,
+    TelegramMediaGroupPayload,
 ]
 
 AllowedBatchTelegramPayload = List[
-    Union[TelegramMessagePayload, TelegramImagePayload, TelegramVideoPayload]
+    Union[
+        TelegramMessagePayload,
+        TelegramImagePayload,
+        TelegramVideoPayload,
+        TelegramDocumentPayload,
+    ]
 ]
 
 AllowedTelegramPayload = Union[
@@ -45,78 +120,356 @@ class TelegramMessageInput(TypedDict):
 class TelegramImageInput(TypedDict):
     chatId: str
     text: str
-    imageBytes: bytes
+    imageBytes: MediaSource
 
 
 class TelegramVideoInput(TypedDict):
     chatId: str
     text: str
-    videoBytes: bytes
+    videoBytes: MediaSource
+
+
+class TelegramDocumentInput(TypedDict):
+    chatId: str
+    text: str
+    documentBytes: MediaSource
 
 
 SingleTelegramInput = Union[
-    TelegramMessageInput, TelegramImageInput, TelegramVideoInput
+    TelegramMessageInput,
+    TelegramImageInput,
+    TelegramVideoInput,
+    TelegramDocumentInput,
 ]
 
 BatchTelegramInput = List[
-    Union[TelegramMessageInput, TelegramImageInput, TelegramVideoInput]
+    Union[
+        TelegramMessageInput,
+        TelegramImageInput,
+        TelegramVideoInput,
+        TelegramDocumentInput,
+    ]
 ]
 
 TelegramInput = Union[SingleTelegramInput, BatchTelegramInput]
 
+StreamTelegramInput = Union[
+    Iterable[SingleTelegramInput], AsyncIterable[SingleTelegramInput]
+]
+
+
+PayloadType = Literal["MESSAGE", "IMAGE", "VIDEO", "DOCUMENT", "MEDIA_GROUP"]
+
+MAX_MEDIA_GROUP_SIZE = 10
+
+_methods: Dict[PayloadType, str] = {
+    "MESSAGE": "sendMessage",
+    "IMAGE": "sendPhoto",
+    "VIDEO": "sendVideo",
+    "DOCUMENT": "sendDocument",
+    "MEDIA_GROUP": "sendMediaGroup",
+}
+
+_payload_dispatcher: SchemaDispatcher[PayloadType] = SchemaDispatcher(
+    [
+        ("MESSAGE", TelegramMessagePayload),
+        ("IMAGE", TelegramImagePayload),
+        ("VIDEO", TelegramVideoPayload),
+        ("DOCUMENT", TelegramDocumentPayload),
+        ("MEDIA_GROUP", TelegramMediaGroupPayload),
+    ]
+)
+
+_input_dispatcher: SchemaDispatcher[PayloadType] = SchemaDispatcher(
+    [
+        ("IMAGE", TelegramImageInput),
+        ("VIDEO", TelegramVideoInput),
+        ("DOCUMENT", TelegramDocumentInput),
+        ("MESSAGE", TelegramMessageInput),
+    ]
+)
+
 
 def _get_payload_type(
     payload: AllowedSingleTelegramPayload,
-) -> Literal["MESSAGE", "IMAGE", "VIDEO"]:
-    if is_schema(payload, TelegramMessagePayload):
-        return "MESSAGE"
-    elif is_schema(payload, TelegramImagePayload):
-        return "IMAGE"
-    elif is_schema(payload, TelegramVideoPayload):
-        return "VIDEO"
-    else:
+) -> PayloadType:
+    payload_type = _payload_dispatcher.classify(payload)
+    if payload_type is None:
         raise ValueError("Invalid Input Payload")
+    return payload_type
 
 
-async def _to_json(response: aiohttp.ClientResponse) -> str:
-    return await response.json()
+_media_fields = {"IMAGE": "photo", "VIDEO": "video", "DOCUMENT": "document"}
+
+
+async def _to_json(
+    response: aiohttp.ClientResponse, mode: ResponseMode = "full"
+):
+    return await read_response(response, mode)
+
+
+def _add_form_field(data: aiohttp.FormData, key: str, value) -> None:
+    if isinstance(value, str):
+        data.add_field(key, value)
+    elif is_buffer(value) and not is_large_media(value):
+        data.add_field(key, as_buffer(value))
+    else:
+        media = to_media(value)
+        name = media.name if isinstance(media, MediaStream) else None
+        data.add_field(key, MediaPayload(media), filename=name or key)
 
 
 def __create_form_data(payload: AllowedSingleTelegramPayload):
     data = aiohttp.FormData()
-    data.add_fields(*payload.items())
+    for key, value in payload.items():
+        _add_form_field(data, key, value)
     return data
 
 
-async def _send(
+def _create_media_group_form_data(payload: TelegramMediaGroupPayload):
+    data = aiohttp.FormData()
+    data.add_field("chat_id", payload["chat_id"])
+    media = []
+    for index, item in enumerate(payload["media"]):
+        media_field = _media_fields[_get_payload_type(item)]
+        value = item[media_field]  # type: ignore
+        entry = {"type": media_field, "caption": item["caption"]}
+        if isinstance(value, str):
+            entry["media"] = value
+        else:
+            entry["media"] = f"attach://file{index}"
+            _add_form_field(data, f"file{index}", value)
+        media.append(entry)
+    data.add_field("media", json.dumps(media))
+    return data
+
+
+async def _get_retry_after(response: aiohttp.ClientResponse) -> float:
+    try:
+        body = await response.json()
+        return float(body["parameters"]["retry_after"])
+    except (aiohttp.ContentTypeError, KeyError, TypeError, ValueError):
+        return float(response.headers.get("Retry-After", 1))
+
+
+async def _classify_retry(
+    response: Optional[aiohttp.ClientResponse], error: Optional[BaseException]
+) -> Optional[float]:
+    retry_after = await classify_http_retry(response, error)
+    if retry_after is not None and response is not None:
+        if response.status == 429:
+            return await _get_retry_after(response)
+    return retry_after
+
+
+class TelegramSendOptions(NamedTuple):
+    timeout: Optional[aiohttp.ClientTimeout] = None
+    timeout_type: TimeoutType = "SINGLE"
+    settings: Settings = Config
+    rate_limiter: Optional[TelegramRateLimiter] = None
+    retry_policy: RetryPolicy = RetryPolicy()
+    file_id_cache: Optional[FileIdCache] = None
+    group_media: bool = True
+    api_url: str = Config.TELEGRAM_API_URL
+    response_mode: ResponseMode = "full"
+
+
+async def _post(
     token: str,
     session: aiohttp.ClientSession,
-    payload_type: Literal["MESSAGE", "IMAGE", "VIDEO"],
+    payload_type: PayloadType,
     payload: AllowedSingleTelegramPayload,
+    options: TelegramSendOptions = TelegramSendOptions(),
 ) -> aiohttp.ClientResponse:
+    rate_limiter = options.rate_limiter
+    if rate_limiter is not None:
+        await rate_limiter.acquire(payload["chat_id"])
     response = await session.post(
-        f"https://api.telegram.org/bot{token}/send{payload_type.capitalize()}",
-        data=__create_form_data(payload),
+        f"{options.api_url}/bot{token}/{_methods[payload_type]}",
+        data=(
+            _create_media_group_form_data(
+                cast(TelegramMediaGroupPayload, payload)
+            )
+            if payload_type == "MEDIA_GROUP"
+            else __create_form_data(payload)
+        ),
+        timeout=options.timeout
+        or _get_timeout_option(
+            options.timeout_type, settings=options.settings
+        ),
     )
+    if rate_limiter is not None and response.status == 429:
+        rate_limiter.pause(
+            payload["chat_id"], await _get_retry_after(response)
+        )
     return response
 
 
+async def _make_replayable(
+    payload: AllowedSingleTelegramPayload,
+) -> AllowedSingleTelegramPayload:
+    return cast(
+        AllowedSingleTelegramPayload,
+        {
+            key: (
+                [await _make_replayable(item) for item in value]
+                if key == "media" and isinstance(value, list)
+                else (
+                    await make_replayable(value)
+                    if isinstance(value, MediaStream)
+                    else value
+                )
+            )
+            for key, value in payload.items()
+        },
+    )
+
+
+def _close_media(payload: AllowedSingleTelegramPayload) -> None:
+    for key, value in payload.items():
+        if key == "media" and isinstance(value, list):
+            for item in value:
+                _close_media(item)
+        else:
+            close_media(value)
+
+
+async def _send(
+    token: str,
+    session: aiohttp.ClientSession,
+    payload_type: PayloadType,
+    payload: AllowedSingleTelegramPayload,
+    options: TelegramSendOptions = TelegramSendOptions(),
+) -> aiohttp.ClientResponse:
+    if options.retry_policy.attempts > 1:
+        payload = await _make_replayable(payload)
+    try:
+        size = get_upload_size(payload)
+        options = options._replace(
+            timeout=options.timeout
+            or _get_timeout_option(
+                options.timeout_type, size, options.settings
+            )
+        )
+        return await instrument_send(
+            "telegram",
+            payload_type,
+            payload,
+            partial(
+                call_with_retry,
+                extend_deadline(
+                    options.retry_policy,
+                    get_size_allowance(size, options.settings),
+                ),
+                partial(_post, token, session, payload_type, payload, options),
+                _classify_retry,
+            ),
+            release_response,
+            get_http_failure_reason,
+        )
+    finally:
+        _close_media(payload)
+
+
+async def _get_file_id_cache_key(
+    token: str,
+    payload_type: PayloadType,
+    payload: AllowedSingleTelegramPayload,
+) -> Optional[str]:
+    media_field = _media_fields.get(payload_type)
+    if media_field is None:
+        return None
+    media = payload.get(media_field)
+    if not is_buffer(media):
+        return None
+    digest = await hash_media_async(as_buffer(media))
+    return f"{token.split(':')[0]}:{media_field}:{digest}"
+
+
+def _get_file_id(result) -> Optional[str]:
+    if not isinstance(result, dict) or not result.get("ok"):
+        return None
+    message = result.get("result") or {}
+    photo = message.get("photo")
+    if photo:
+        return photo[-1]["file_id"]
+    for media_field in ("video", "animation", "document"):
+        if media_field in message:
+            return message[media_field]["file_id"]
+    return None
+
+
+def _is_rejected(result) -> bool:
+    return isinstance(result, dict) and result.get("error_code") == 400
+
+
+def _get_checked_mode(mode: ResponseMode) -> ResponseMode:
+    return "status-only" if mode == "none" else mode
+
+
 async def _send_and_parse_to_json(
     ip: str,
     session: aiohttp.ClientSession,
-    payload_type: Literal["MESSAGE", "IMAGE", "VIDEO"],
+    payload_type: PayloadType,
     payload: AllowedSingleTelegramPayload,
+    options: TelegramSendOptions = TelegramSendOptions(),
 ) -> str:
-    return await _to_json(await _send(ip, session, payload_type, payload))
+    cache = options.file_id_cache
+    cache_key = (
+        await _get_file_id_cache_key(ip, payload_type, payload)
+        if cache is not None
+        else None
+    )
+    if cache is None or cache_key is None:
+        return await _to_json(
+            await _send(ip, session, payload_type, payload, options),
+            options.response_mode,
+        )
+    file_id, claimed = await cache.acquire(cache_key)
+    if not claimed:
+        result = await _to_json(
+            await _send(
+                ip,
+                session,
+                payload_type,
+                {**payload, _media_fields[payload_type]: file_id},
+                options,
+            ),
+            _get_checked_mode(options.response_mode),
+        )
+        if not _is_rejected(result):
+            return result
+        cache.discard(cache_key)
+        result = await _to_json(
+            await _send(ip, session, payload_type, payload, options)
+        )
+        file_id = _get_file_id(result)
+        if file_id is not None:
+            cache.set(cache_key, file_id)
+        return result
+    file_id = None
+    try:
+        result = await _to_json(
+            await _send(ip, session, payload_type, payload, options)
+        )
+        file_id = _get_file_id(result)
+        return result
+    finally:
+        cache.release(cache_key, file_id)
 
 
 async def _get_type_and_send_and_parse_to_json(
     ip: str,
     session: aiohttp.ClientSession,
     payload: AllowedSingleTelegramPayload,
+    options: TelegramSendOptions = TelegramSendOptions(),
 ):
     return await partial(
-        _send_and_parse_to_json, ip=ip, session=session, payload=payload
+        _send_and_parse_to_json,
+        ip=ip,
+        session=session,
+        payload=payload,
+        options=options,
     )(payload_type=_get_payload_type(payload))
 
 
@@ -124,87 +477,258 @@ async def _send_single(
     ip: str,
     session: aiohttp.ClientSession,
     payload: AllowedSingleTelegramPayload,
+    options: TelegramSendOptions = TelegramSendOptions(),
 ):
-    return await _get_type_and_send_and_parse_to_json(ip, session, payload)
+    return await _get_type_and_send_and_parse_to_json(
+        ip, session, payload, options
+    )
 
 
-async def _send_multiple(
+def _is_groupable(payload: AllowedSingleTelegramPayload) -> bool:
+    return _payload_dispatcher.classify(payload) in ("IMAGE", "VIDEO")
+
+
+def _plan_media_groups(
+    payloads: AllowedBatchTelegramPayload,
+) -> List[List[int]]:
+    groups: List[List[int]] = []
+    for index, payload in enumerate(payloads):
+        group = groups[-1] if groups else []
+        if (
+            _is_groupable(payload)
+            and group
+            and len(group) < MAX_MEDIA_GROUP_SIZE
+            and _is_groupable(payloads[group[0]])
+            and payloads[group[0]]["chat_id"] == payload["chat_id"]
+        ):
+            group.append(index)
+        else:
+            groups.append([index])
+    return groups
+
+
+def _create_media_group_payload(
+    payloads: List[TelegramMediaPayload], file_ids: List[Optional[str]]
+) -> TelegramMediaGroupPayload:
+    return {
+        "chat_id": payloads[0]["chat_id"],
+        "media": [
+            (
+                cast(
+                    TelegramMediaPayload,
+                    {
+                        **payload,
+                        _media_fields[_get_payload_type(payload)]: file_id,
+                    },
+                )
+                if file_id is not None
+                else payload
+            )
+            for payload, file_id in zip(payloads, file_ids)
+        ],
+    }
+
+
+def _split_media_group_result(result, count: int) -> list:
+    if (
+        isinstance(result, dict)
+        and result.get("ok")
+        and isinstance(result.get("result"), list)
+        and len(result["result"]) == count
+    ):
+        return [
+            {"ok": True, "result": message} for message in result["result"]
+        ]
+    return [result] * count
+
+
+async def _send_media_group(
     ip: str,
     session: aiohttp.ClientSession,
-    payloads: AllowedBatchTelegramPayload,
-) -> list[str]:
-    return [
-        await partial(
-            _send_single,
-            ip=ip,
-            session=session,
-        )(payload=payload)
+    payloads: List[TelegramMediaPayload],
+    options: TelegramSendOptions = TelegramSendOptions(),
+) -> list:
+    cache = options.file_id_cache
+    cache_keys = [
+        (
+            await _get_file_id_cache_key(
+                ip, _get_payload_type(payload), payload
+            )
+            if cache is not None
+            else None
+        )
         for payload in payloads
     ]
+    file_ids = [
+        cache.get(key) if cache is not None and key is not None else None
+        for key in cache_keys
+    ]
+    if any(
+        key is not None and file_id is None
+        for key, file_id in zip(cache_keys, file_ids)
+    ):
+        options = options._replace(response_mode="full")
+    elif any(file_ids):
+        options = options._replace(
+            response_mode=_get_checked_mode(options.response_mode)
+        )
+    result = await _send_and_parse_to_json(
+        ip,
+        session,
+        "MEDIA_GROUP",
+        _create_media_group_payload(payloads, file_ids),
+        options,
+    )
+    if cache is not None and _is_rejected(result) and any(file_ids):
+        for key, file_id in zip(cache_keys, file_ids):
+            if key is not None and file_id is not None:
+                cache.discard(key)
+        file_ids = [None] * len(payloads)
+        options = options._replace(response_mode="full")
+        result = await _send_and_parse_to_json(
+            ip,
+            session,
+            "MEDIA_GROUP",
+            _create_media_group_payload(payloads, file_ids),
+            options,
+        )
+    results = _split_media_group_result(result, len(payloads))
+    if cache is not None:
+        for key, file_id, item in zip(cache_keys, file_ids, results):
+            new_file_id = _get_file_id(item)
+            if key is not None and file_id is None and new_file_id:
+                cache.set(key, new_file_id)
+    return results
 
 
-async def _handle_send(
-    ip: str, session: aiohttp.ClientSession, payload: AllowedTelegramPayload
-) -> Union[str, list[str]]:
-    async with session:
-        return (
-            await _send_multiple(
-                ip, session, cast(AllowedBatchTelegramPayload, payload)
-            )
-            if _is_batch(payload)
-            else await _send_single(
-                ip, session, cast(AllowedSingleTelegramPayload, payload)
-            )
-        )
+async def _send_group(
+    ip: str,
+    session: aiohttp.ClientSession,
+    payloads: AllowedBatchTelegramPayload,
+    options: TelegramSendOptions = TelegramSendOptions(),
+) -> list:
+    if len(payloads) == 1:
+        return [await _send_single(ip, session, payloads[0], options)]
+    return await _send_media_group(
+        ip, session, cast(List[TelegramMediaPayload], payloads), options
+    )
 
 
-def _is_batch(payload: AllowedTelegramPayload) -> bool:
-    return True if isinstance(payload, List) else False
+async def _report_group(
+    ip: str,
+    session: aiohttp.ClientSession,
+    payloads: AllowedBatchTelegramPayload,
+    options: TelegramSendOptions = TelegramSendOptions(),
+) -> List[SendReport]:
+    report = await report_send(_send_group(ip, session, payloads, options))
+    if report.error is not None:
+        return [report] * len(payloads)
+    return split_report(report, report.response)
 
 
-def _get_timeout_option(
-    timeout_type: Literal["SINGLE", "BATCH"],
-) -> aiohttp.ClientTimeout:
+async def _send_multiple(
+    ip: str,
+    session: aiohttp.ClientSession,
+    payloads: AllowedBatchTelegramPayload,
+    concurrency_limit: int = Config.BATCH_CONCURRENCY_LIMIT,
+    options: TelegramSendOptions = TelegramSendOptions(),
+) -> List[SendReport]:
+    groups = (
+        _plan_media_groups(payloads)
+        if options.group_media
+        else [[index] for index in range(len(payloads))]
+    )
+    reports = await gather_with_concurrency(
+        concurrency_limit,
+        *[
+            _report_group(
+                ip,
+                session,
+                [payloads[index] for index in group],
+                options._replace(timeout_type="BATCH"),
+            )
+            for group in groups
+        ],
+    )
+    return [report for group_reports in reports for report in group_reports]
+
+
+async def _handle_send(
+    ip: str,
+    session: aiohttp.ClientSession,
+    payload: AllowedTelegramPayload,
+    concurrency_limit: int = Config.BATCH_CONCURRENCY_LIMIT,
+    options: TelegramSendOptions = TelegramSendOptions(),
+) -> Union[str, List[SendReport]]:
     return (
-        aiohttp.ClientTimeout(
-            total=Config.BATCH_TOTAL_TIMEOUT,
-            connect=Config.BATCH_CONNECT_TIMEOUT,
+        await _send_multiple(
+            ip,
+            session,
+            cast(AllowedBatchTelegramPayload, payload),
+            concurrency_limit,
+            options,
         )
-        if timeout_type == "BATCH"
-        else aiohttp.ClientTimeout(
-            total=Config.SINGLE_TOTAL_TIMEOUT,
-            connect=Config.SINGLE_CONNECT_TIMEOUT,
+        if _is_batch(payload)
+        else await _send_single(
+            ip, session, cast(AllowedSingleTelegramPayload, payload), options
         )
     )
 
 
-def _handle_create_session(payload: AllowedTelegramPayload):
-    return aiohttp.ClientSession(
-        timeout=compose(
-            _get_timeout_option,
-            lambda x: "BATCH" if _is_batch(x) else "SINGLE",
-        )(payload)
-    )
+async def _send_streamed(
+    ip: str,
+    session: aiohttp.ClientSession,
+    options: TelegramSendOptions,
+    validate: bool,
+    telegram_input: SingleTelegramInput,
+) -> SendReport:
+    async def send():
+        return await _send_single(
+            ip,
+            session,
+            _parse_single_input_to_payload(telegram_input, validate),
+            options._replace(timeout_type="BATCH"),
+        )
+
+    return await report_send(send())
+
+
+def _is_batch(payload: AllowedTelegramPayload) -> bool:
+    return True if isinstance(payload, List) else False
+
+
+def _get_timeout_option(
+    timeout_type: TimeoutType, size: int = 0, settings: Settings = Config
+) -> aiohttp.ClientTimeout:
+    return get_request_timeout(timeout_type, size, settings)
 
 
 def _parse_single_input_to_payload(
-    input_dict: SingleTelegramInput,
+    input_dict: SingleTelegramInput, validate: bool = False
 ) -> AllowedSingleTelegramPayload:
-    if is_schema(input_dict, TelegramImageInput):
+    input_type = _input_dispatcher.classify(input_dict, validate)
+    if input_type == "IMAGE":
         t_ii = cast(TelegramImageInput, input_dict)
         return {
             "chat_id": t_ii["chatId"],
-            "photo": t_ii["imageBytes"],
+            "photo": to_media(t_ii["imageBytes"]),
             "caption": t_ii["text"],
         }
-    elif is_schema(input_dict, TelegramVideoInput):
+    elif input_type == "VIDEO":
         t_ii = cast(TelegramVideoInput, input_dict)
         return {
             "chat_id": t_ii["chatId"],
-            "video": t_ii["videoBytes"],
+            "video": to_media(t_ii["videoBytes"]),
             "caption": t_ii["text"],
         }
-    elif is_schema(input_dict, TelegramMessageInput):
+    elif input_type == "DOCUMENT":
+        t_di = cast(TelegramDocumentInput, input_dict)
+        return {
+            "chat_id": t_di["chatId"],
+            "document": to_media(t_di["documentBytes"]),
+            "caption": t_di["text"],
+        }
+    elif input_type == "MESSAGE":
         wa_mi = cast(TelegramImageInput, input_dict)
         return {
             "chat_id": wa_mi["chatId"],
@@ -214,29 +738,175 @@ def _parse_single_input_to_payload(
         raise ValueError("Input Schema is Invalid")
 
 
+def _parse_or_keep(
+    input_dict: SingleTelegramInput, validate: bool = False
+) -> AllowedSingleTelegramPayload:
+    try:
+        return _parse_single_input_to_payload(input_dict, validate)
+    except ValueError:
+        return cast(AllowedSingleTelegramPayload, input_dict)
+
+
 def _parse_multiple_input_to_payload(
-    input_dicts: BatchTelegramInput,
+    input_dicts: BatchTelegramInput, validate: bool = False
 ) -> AllowedTelegramPayload:
-    return list(map(_parse_single_input_to_payload, input_dicts))
+    return [_parse_or_keep(input_dict, validate) for input_dict in input_dicts]
 
 
 def _handle_parse_input_to_payload(
-    telegram_input: TelegramInput,
+    telegram_input: TelegramInput, validate: bool = False
 ) -> AllowedTelegramPayload:
     return (
         _parse_multiple_input_to_payload(
-            cast(BatchTelegramInput, telegram_input)
+            cast(BatchTelegramInput, telegram_input), validate
         )
         if isinstance(telegram_input, List)
         else _parse_single_input_to_payload(
-            cast(SingleTelegramInput, telegram_input)
+            cast(SingleTelegramInput, telegram_input), validate
         )
     )
 
 
-def setup_telegram(ip: str):
-    async def send_telegram(telegram_input: TelegramInput):
-        payload = _handle_parse_input_to_payload(telegram_input)
-        return await _handle_send(ip, _handle_create_session(payload), payload)
+class TelegramSender(HttpSender):
+    def __init__(
+        self,
+        token: str,
+        concurrency_limit: Optional[int] = None,
+        per_host_limit: Optional[int] = None,
+        keepalive_timeout: Optional[int] = None,
+        dns_cache_ttl: Optional[int] = None,
+        validate: bool = False,
+        rate_limiter: Optional[TelegramRateLimiter] = None,
+        rate_limit: bool = True,
+        retry_policy: Optional[RetryPolicy] = None,
+        file_id_cache: Optional[FileIdCache] = None,
+        cache_media: bool = True,
+        group_media: bool = True,
+        api_url: Optional[str] = None,
+        response_mode: ResponseMode = "full",
+        timeout: Optional[aiohttp.ClientTimeout] = None,
+        settings: Settings = Config,
+    ) -> None:
+        super().__init__(
+            concurrency_limit,
+            per_host_limit,
+            keepalive_timeout,
+            dns_cache_ttl,
+            settings,
+        )
+        self.token = token
+        self.validate = validate
+        self.options = TelegramSendOptions(
+            rate_limiter=(
+                rate_limiter or get_telegram_rate_limiter(token, settings)
+                if rate_limit
+                else None
+            ),
+            retry_policy=or_default(retry_policy, get_retry_policy(settings)),
+            file_id_cache=(
+                file_id_cache
+                or FileIdCache(settings.TELEGRAM_FILE_ID_CACHE_SIZE)
+                if cache_media
+                else None
+            ),
+            group_media=group_media,
+            api_url=or_default(api_url, settings.TELEGRAM_API_URL).rstrip("/"),
+            response_mode=response_mode,
+            timeout=timeout,
+            settings=settings,
+        )
+        track_pool(self, f"telegram:{token.partition(':')[0]}")
+
+    def _get_options(
+        self,
+        response_mode: Optional[ResponseMode],
+        timeout: Optional[aiohttp.ClientTimeout],
+    ) -> TelegramSendOptions:
+        return self.options._replace(
+            response_mode=or_default(
+                response_mode, self.options.response_mode
+            ),
+            timeout=or_default(timeout, self.options.timeout),
+        )
+
+    async def send(
+        self,
+        telegram_input: TelegramInput,
+        response_mode: Optional[ResponseMode] = None,
+        timeout: Optional[aiohttp.ClientTimeout] = None,
+    ):
+        return await self.send_payload(
+            _handle_parse_input_to_payload(telegram_input, self.validate),
+            response_mode,
+            timeout,
+        )
+
+    async def send_payload(
+        self,
+        payload: AllowedTelegramPayload,
+        response_mode: Optional[ResponseMode] = None,
+        timeout: Optional[aiohttp.ClientTimeout] = None,
+    ):
+        options = self._get_options(response_mode, timeout)
+        send = _handle_send(
+            self.token,
+            self.session,
+            payload,
+            self.concurrency_limit,
+            options,
+        )
+        if options.response_mode == "none":
+            self._detach(send)
+            return None
+        return await send
+
+    def stream(
+        self,
+        telegram_inputs: StreamTelegramInput,
+        response_mode: Optional[ResponseMode] = None,
+        timeout: Optional[aiohttp.ClientTimeout] = None,
+    ) -> AsyncIterator[Tuple[int, SendReport]]:
+        return stream_with_concurrency(
+            self.concurrency_limit,
+            partial(
+                _send_streamed,
+                self.token,
+                self.session,
+                self._get_options(response_mode, timeout),
+                self.validate,
+            ),
+            telegram_inputs,
+        )
+
+    __call__ = send
+
+
+def setup_telegram(
+    ip: str,
+    concurrency_limit: Optional[int] = None,
+    per_host_limit: Optional[int] = None,
+    api_url: Optional[str] = None,
+    response_mode: ResponseMode = "full",
+    timeout: Optional[aiohttp.ClientTimeout] = None,
+    settings: Settings = Config,
+):
+    sender = TelegramSender(
+        ip,
+        concurrency_limit,
+        per_host_limit,
+        api_url=api_url,
+        response_mode=response_mode,
+        timeout=timeout,
+        settings=settings,
+    )
+
+    async def send_telegram(
+        telegram_input: TelegramInput,
+        response_mode: Optional[ResponseMode] = None,
+        timeout: Optional[aiohttp.ClientTimeout] = None,
+    ):
+        return await sender.send(telegram_input, response_mode, timeout)
 
+    send_telegram.stream = sender.stream  # type: ignore
+    send_telegram.aclose = sender.aclose  # type: ignore
     return send_telegram
@@ -1,18 +1,183 @@
-from pydantic import BaseModel, create_model_from_typeddict
-from typing import TypeVar, Callable, Type, Any, Dict
+import asyncio
+from functools import lru_cache
+from typing import (
+    TYPE_CHECKING,
+    TypeVar,
+    Callable,
+    Type,
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Dict,
+    FrozenSet,
+    Generic,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+if TYPE_CHECKING:
+    from pydantic import BaseModel
 
 T = TypeVar("T")
 F = TypeVar("F")
+R = TypeVar("R")
+K = TypeVar("K")
+
+MAX_CACHED_SIGNATURES = 256
+
+
+def or_default(value: Optional[T], default: T) -> T:
+    return default if value is None else value
 
 
 def compose(f: Callable[..., F], g: Callable[..., Any]) -> Callable[..., F]:
     return lambda *a, **kw: f(g(*a, **kw))
 
 
+@lru_cache(maxsize=None)
+def _get_schema_model(typedData: Type) -> "Type[BaseModel]":
+    from pydantic import BaseConfig, create_model_from_typeddict
+
+    class _SchemaConfig(BaseConfig):
+        arbitrary_types_allowed = True
+
+    return create_model_from_typeddict(typedData, __config__=_SchemaConfig)
+
+
 def is_schema(data: Any, typedData: Type) -> bool:
     try:
-        Schema = create_model_from_typeddict(typedData)
+        Schema = _get_schema_model(typedData)
         Schema(**data)
         return True
     except ValueError:
         return False
+
+
+class SchemaDispatcher(Generic[K]):
+    def __init__(self, schemas: Sequence[Tuple[K, Type]]) -> None:
+        self._schemas: List[Tuple[K, Type, FrozenSet[str]]] = [
+            (tag, typedData, frozenset(typedData.__required_keys__))
+            for tag, typedData in schemas
+        ]
+        self._signatures: Dict[FrozenSet[str], Optional[Tuple[K, Type]]] = {}
+
+    def _match(self, keys: FrozenSet[str]) -> Optional[Tuple[K, Type]]:
+        for tag, typedData, required_keys in self._schemas:
+            if required_keys <= keys:
+                return tag, typedData
+        return None
+
+    def classify(self, data: Any, validate: bool = False) -> Optional[K]:
+        if not isinstance(data, Mapping):
+            return None
+        keys = frozenset(data)
+        try:
+            match = self._signatures[keys]
+        except KeyError:
+            match = self._match(keys)
+            if len(self._signatures) < MAX_CACHED_SIGNATURES:
+                self._signatures[keys] = match
+        if match is None:
+            return None
+        tag, typedData = match
+        if validate and not is_schema(data, typedData):
+            return None
+        return tag
+
+
+async def gather_with_concurrency(limit: int, *aws: Awaitable[T]) -> List[T]:
+    if limit < 1:
+        raise ValueError("Concurrency limit must be at least 1")
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _bounded(aw: Awaitable[T]) -> T:
+        async with semaphore:
+            return await aw
+
+    return list(await asyncio.gather(*map(_bounded, aws)))
+
+
+def is_async_iterable(items: Any) -> bool:
+    return hasattr(items, "__aiter__")
+
+
+async def _aiter(
+    items: Union[Iterable[T], AsyncIterable[T]],
+) -> AsyncIterator[T]:
+    if is_async_iterable(items):
+        async for item in items:  # type: ignore
+            yield item
+    else:
+        for item in items:  # type: ignore
+            yield item
+
+
+async def stream_with_concurrency(
+    limit: int,
+    func: Callable[[T], Awaitable[R]],
+    items: Union[Iterable[T], AsyncIterable[T]],
+) -> AsyncIterator[Tuple[int, R]]:
+    if limit < 1:
+        raise ValueError("Concurrency limit must be at least 1")
+    iterator = _aiter(items)
+    lock = asyncio.Lock()
+    completed: "asyncio.Queue[Tuple[int, R]]" = asyncio.Queue(limit)
+    count = 0
+
+    async def _next() -> Optional[Tuple[int, T]]:
+        nonlocal count
+        async with lock:
+            try:
+                item = await iterator.__anext__()
+            except StopAsyncIteration:
+                return None
+            count += 1
+            return count - 1, item
+
+    async def _worker() -> None:
+        entry = await _next()
+        while entry is not None:
+            index, item = entry
+            await completed.put((index, await func(item)))
+            entry = await _next()
+
+    workers = [asyncio.ensure_future(_worker()) for _ in range(limit)]
+    finished = asyncio.gather(*workers)
+    get: Optional[asyncio.Future] = None
+    try:
+        while True:
+            get = asyncio.ensure_future(completed.get())
+            await asyncio.wait(
+                {get, finished}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if get.done():
+                yield get.result()
+                continue
+            finished.result()
+            while not completed.empty():
+                yield completed.get_nowait()
+            return
+    finally:
+        if get is not None:
+            get.cancel()
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def map_with_concurrency(
+    limit: int,
+    func: Callable[[T], Awaitable[R]],
+    items: Union[Iterable[T], AsyncIterable[T]],
+) -> List[R]:
+    results = {
+        index: result
+        async for index, result in stream_with_concurrency(limit, func, items)
+    }
+    return [results[index] for index in range(len(results))]
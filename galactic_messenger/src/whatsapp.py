@@ -1,11 +1,51 @@
 import base64
 from functools import partial
-from typing import List, Literal, TypedDict, Union, cast
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypedDict,
+    Union,
+    cast,
+)
 
 import aiohttp
 
-from ..config import Config
-from ..src.utils import compose, is_schema
+from ..config import Config, Settings
+from ..src.media import MediaSource, close_media, make_replayable, to_media
+from ..src.report import SendReport, report_send
+from ..src.retry import (
+    RetryPolicy,
+    call_with_retry,
+    extend_deadline,
+    get_retry_policy,
+)
+from ..src.metrics import get_upload_size, instrument_send, track_pool
+from ..src.session import (
+    HttpSender,
+    ResponseMode,
+    TimeoutType,
+    classify_http_retry,
+    get_http_failure_reason,
+    get_request_timeout,
+    get_size_allowance,
+    read_response,
+    release_response,
+)
+from ..src.streaming import Base64Media, JsonBase64Payload, has_base64_media
+from ..src.utils import (
+    SchemaDispatcher,
+    or_default,
+    gather_with_concurrency,
+    stream_with_concurrency,
+)
 
 
 class WhatsappMessagePayload(TypedDict):
@@ -16,13 +56,13 @@ class WhatsappMessagePayload(TypedDict):
 class WhatsappImagePayload(TypedDict):
     groupId: str
     caption: str
-    imageBase64: str
+    imageBase64: Union[str, Base64Media]
 
 
 class WhatsappVideoPayload(TypedDict):
     groupId: str
     caption: str
-    videoBase64: str
+    videoBase64: Union[str, Base64Media]
 
 
 AllowedSingleWhatsappPayload = Union[
@@ -46,13 +86,13 @@ class WhatsappMessageInput(TypedDict):
 class WhatsappImageInput(TypedDict):
     chatId: str
     text: str
-    imageBytes: bytes
+    imageBytes: MediaSource
 
 
 class WhatsappVideoInput(TypedDict):
     chatId: str
     text: str
-    videoBytes: bytes
+    videoBytes: MediaSource
 
 
 SingleWhatsappInput = Union[
@@ -65,52 +105,163 @@ BatchWhatsappInput = List[
 
 WhatsappInput = Union[SingleWhatsappInput, BatchWhatsappInput]
 
+StreamWhatsappInput = Union[
+    Iterable[SingleWhatsappInput], AsyncIterable[SingleWhatsappInput]
+]
+
+
+PayloadType = Literal["MESSAGE", "IMAGE", "VIDEO"]
+
+_payload_dispatcher: SchemaDispatcher[PayloadType] = SchemaDispatcher(
+    [
+        ("MESSAGE", WhatsappMessagePayload),
+        ("IMAGE", WhatsappImagePayload),
+        ("VIDEO", WhatsappVideoPayload),
+    ]
+)
+
+_input_dispatcher: SchemaDispatcher[PayloadType] = SchemaDispatcher(
+    [
+        ("IMAGE", WhatsappImageInput),
+        ("VIDEO", WhatsappVideoInput),
+        ("MESSAGE", WhatsappMessageInput),
+    ]
+)
+
 
 def _get_payload_type(
     payload: AllowedSingleWhatsappPayload,
-) -> Literal["MESSAGE", "IMAGE", "VIDEO"]:
-    if is_schema(payload, WhatsappMessagePayload):
-        return "MESSAGE"
-    elif is_schema(payload, WhatsappImagePayload):
-        return "IMAGE"
-    elif is_schema(payload, WhatsappVideoPayload):
-        return "VIDEO"
-    else:
+) -> PayloadType:
+    payload_type = _payload_dispatcher.classify(payload)
+    if payload_type is None:
         raise ValueError("Invalid Input Payload")
+    return payload_type
+
 
+async def _to_json(
+    response: aiohttp.ClientResponse, mode: ResponseMode = "full"
+):
+    return await read_response(response, mode)
 
-async def _to_json(response: aiohttp.ClientResponse) -> str:
-    return await response.json()
 
+class WhatsappSendOptions(NamedTuple):
+    timeout: Optional[aiohttp.ClientTimeout] = None
+    timeout_type: TimeoutType = "SINGLE"
+    settings: Settings = Config
+    retry_policy: RetryPolicy = RetryPolicy()
+    response_mode: ResponseMode = "full"
 
-async def _send(
+
+def _get_body(payload: AllowedSingleWhatsappPayload) -> Dict[str, Any]:
+    return (
+        {"data": JsonBase64Payload(payload)}
+        if has_base64_media(payload)
+        else {"json": payload}
+    )
+
+
+async def _post(
     ip: str,
     session: aiohttp.ClientSession,
-    payload_type: Literal["MESSAGE", "IMAGE", "VIDEO"],
+    payload_type: PayloadType,
     payload: AllowedSingleWhatsappPayload,
+    options: WhatsappSendOptions = WhatsappSendOptions(),
 ) -> aiohttp.ClientResponse:
     response = await session.post(
-        f"{ip}/sendWhatsapp/{payload_type.lower()}", json=payload
+        f"{ip}/sendWhatsapp/{payload_type.lower()}",
+        **_get_body(payload),
+        timeout=options.timeout
+        or _get_timeout_option(
+            options.timeout_type, settings=options.settings
+        ),
     )
     return response
 
 
+async def _make_replayable(
+    payload: AllowedSingleWhatsappPayload,
+) -> AllowedSingleWhatsappPayload:
+    return cast(
+        AllowedSingleWhatsappPayload,
+        {
+            key: (
+                Base64Media(await make_replayable(value.data))
+                if isinstance(value, Base64Media) and value.encoded is None
+                else value
+            )
+            for key, value in payload.items()
+        },
+    )
+
+
+def _close_media(payload: AllowedSingleWhatsappPayload) -> None:
+    for value in payload.values():
+        if isinstance(value, Base64Media):
+            close_media(value.data)
+
+
+async def _send(
+    ip: str,
+    session: aiohttp.ClientSession,
+    payload_type: PayloadType,
+    payload: AllowedSingleWhatsappPayload,
+    options: WhatsappSendOptions = WhatsappSendOptions(),
+) -> aiohttp.ClientResponse:
+    if options.retry_policy.attempts > 1:
+        payload = await _make_replayable(payload)
+    try:
+        size = get_upload_size(payload)
+        options = options._replace(
+            timeout=options.timeout
+            or _get_timeout_option(
+                options.timeout_type, size, options.settings
+            )
+        )
+        return await instrument_send(
+            "whatsapp",
+            payload_type,
+            payload,
+            partial(
+                call_with_retry,
+                extend_deadline(
+                    options.retry_policy,
+                    get_size_allowance(size, options.settings),
+                ),
+                partial(_post, ip, session, payload_type, payload, options),
+                classify_http_retry,
+            ),
+            release_response,
+            get_http_failure_reason,
+        )
+    finally:
+        _close_media(payload)
+
+
 async def _send_and_parse_to_json(
     ip: str,
     session: aiohttp.ClientSession,
-    payload_type: Literal["MESSAGE", "IMAGE", "VIDEO"],
+    payload_type: PayloadType,
     payload: AllowedSingleWhatsappPayload,
+    options: WhatsappSendOptions = WhatsappSendOptions(),
 ) -> str:
-    return await _to_json(await _send(ip, session, payload_type, payload))
+    return await _to_json(
+        await _send(ip, session, payload_type, payload, options),
+        options.response_mode,
+    )
 
 
 async def _get_type_and_send_and_parse_to_json(
     ip: str,
     session: aiohttp.ClientSession,
     payload: AllowedSingleWhatsappPayload,
+    options: WhatsappSendOptions = WhatsappSendOptions(),
 ):
     return await partial(
-        _send_and_parse_to_json, ip=ip, session=session, payload=payload
+        _send_and_parse_to_json,
+        ip=ip,
+        session=session,
+        payload=payload,
+        options=options,
     )(payload_type=_get_payload_type(payload))
 
 
@@ -118,67 +269,84 @@ async def _send_single(
     ip: str,
     session: aiohttp.ClientSession,
     payload: AllowedSingleWhatsappPayload,
+    options: WhatsappSendOptions = WhatsappSendOptions(),
 ):
-    return await _get_type_and_send_and_parse_to_json(ip, session, payload)
+    return await _get_type_and_send_and_parse_to_json(
+        ip, session, payload, options
+    )
 
 
 async def _send_multiple(
     ip: str,
     session: aiohttp.ClientSession,
     payloads: AllowedBatchWhatsappPayload,
-) -> list[str]:
-    return [
-        await partial(
-            _send_single,
-            ip=ip,
-            session=session,
-        )(payload=payload)
-        for payload in payloads
-    ]
+    concurrency_limit: int = Config.BATCH_CONCURRENCY_LIMIT,
+    options: WhatsappSendOptions = WhatsappSendOptions(),
+) -> List[SendReport]:
+    return await gather_with_concurrency(
+        concurrency_limit,
+        *[
+            report_send(
+                partial(
+                    _send_single,
+                    ip=ip,
+                    session=session,
+                    options=options._replace(timeout_type="BATCH"),
+                )(payload=payload)
+            )
+            for payload in payloads
+        ],
+    )
 
 
 async def _handle_send(
-    ip: str, session: aiohttp.ClientSession, payload: AllowedWhatsappPayload
-) -> Union[str, list[str]]:
-    async with session:
-        return (
-            await _send_multiple(
-                ip, session, cast(AllowedBatchWhatsappPayload, payload)
-            )
-            if _is_batch(payload)
-            else await _send_single(
-                ip, session, cast(AllowedSingleWhatsappPayload, payload)
-            )
+    ip: str,
+    session: aiohttp.ClientSession,
+    payload: AllowedWhatsappPayload,
+    concurrency_limit: int = Config.BATCH_CONCURRENCY_LIMIT,
+    options: WhatsappSendOptions = WhatsappSendOptions(),
+) -> Union[str, List[SendReport]]:
+    return (
+        await _send_multiple(
+            ip,
+            session,
+            cast(AllowedBatchWhatsappPayload, payload),
+            concurrency_limit,
+            options,
+        )
+        if _is_batch(payload)
+        else await _send_single(
+            ip, session, cast(AllowedSingleWhatsappPayload, payload), options
+        )
+    )
+
+
+async def _send_streamed(
+    ip: str,
+    session: aiohttp.ClientSession,
+    options: WhatsappSendOptions,
+    validate: bool,
+    whatsapp_input: SingleWhatsappInput,
+) -> SendReport:
+    async def send():
+        return await _send_single(
+            ip,
+            session,
+            _parse_single_input_to_payload(whatsapp_input, validate),
+            options._replace(timeout_type="BATCH"),
         )
 
+    return await report_send(send())
+
 
 def _is_batch(payload: AllowedWhatsappPayload) -> bool:
     return True if isinstance(payload, List) else False
 
 
 def _get_timeout_option(
-    timeout_type: Literal["SINGLE", "BATCH"],
+    timeout_type: TimeoutType, size: int = 0, settings: Settings = Config
 ) -> aiohttp.ClientTimeout:
-    return (
-        aiohttp.ClientTimeout(
-            total=Config.BATCH_TOTAL_TIMEOUT,
-            connect=Config.BATCH_CONNECT_TIMEOUT,
-        )
-        if timeout_type == "BATCH"
-        else aiohttp.ClientTimeout(
-            total=Config.SINGLE_TOTAL_TIMEOUT,
-            connect=Config.SINGLE_CONNECT_TIMEOUT,
-        )
-    )
-
-
-def _handle_create_session(payload: AllowedWhatsappPayload):
-    return aiohttp.ClientSession(
-        timeout=compose(
-            _get_timeout_option,
-            lambda x: "BATCH" if _is_batch(x) else "SINGLE",
-        )(payload)
-    )
+    return get_request_timeout(timeout_type, size, settings)
 
 
 def _bytes_to_base64(b: bytes) -> str:
@@ -186,23 +354,24 @@ def _bytes_to_base64(b: bytes) -> str:
 
 
 def _parse_single_input_to_payload(
-    input_dict: SingleWhatsappInput,
+    input_dict: SingleWhatsappInput, validate: bool = False
 ) -> AllowedSingleWhatsappPayload:
-    if is_schema(input_dict, WhatsappImageInput):
+    input_type = _input_dispatcher.classify(input_dict, validate)
+    if input_type == "IMAGE":
         wa_ii = cast(WhatsappImageInput, input_dict)
         return {
             "groupId": wa_ii["chatId"],
-            "imageBase64": _bytes_to_base64(wa_ii["imageBytes"]),
+            "imageBase64": Base64Media(to_media(wa_ii["imageBytes"])),
             "caption": wa_ii["text"],
         }
-    elif is_schema(input_dict, WhatsappVideoInput):
+    elif input_type == "VIDEO":
         wa_ii = cast(WhatsappVideoInput, input_dict)
         return {
             "groupId": wa_ii["chatId"],
-            "videoBase64": _bytes_to_base64(wa_ii["videoBytes"]),
+            "videoBase64": Base64Media(to_media(wa_ii["videoBytes"])),
             "caption": wa_ii["text"],
         }
-    elif is_schema(input_dict, WhatsappMessageInput):
+    elif input_type == "MESSAGE":
         wa_mi = cast(WhatsappMessageInput, input_dict)
         return {
             "groupId": wa_mi["chatId"],
@@ -212,29 +381,154 @@ def _parse_single_input_to_payload(
         raise ValueError("Input Schema is Invalid")
 
 
+def _parse_or_keep(
+    input_dict: SingleWhatsappInput, validate: bool = False
+) -> AllowedSingleWhatsappPayload:
+    try:
+        return _parse_single_input_to_payload(input_dict, validate)
+    except ValueError:
+        return cast(AllowedSingleWhatsappPayload, input_dict)
+
+
 def _parse_multiple_input_to_payload(
-    input_dicts: BatchWhatsappInput,
+    input_dicts: BatchWhatsappInput, validate: bool = False
 ) -> AllowedBatchWhatsappPayload:
-    return list(map(_parse_single_input_to_payload, input_dicts))
+    return [_parse_or_keep(input_dict, validate) for input_dict in input_dicts]
 
 
 def _handle_parse_input_to_payload(
-    whatsapp_input: WhatsappInput,
+    whatsapp_input: WhatsappInput, validate: bool = False
 ) -> AllowedWhatsappPayload:
     return (
         _parse_multiple_input_to_payload(
-            cast(BatchWhatsappInput, whatsapp_input)
+            cast(BatchWhatsappInput, whatsapp_input), validate
         )
         if isinstance(whatsapp_input, List)
         else _parse_single_input_to_payload(
-            cast(SingleWhatsappInput, whatsapp_input)
+            cast(SingleWhatsappInput, whatsapp_input), validate
         )
     )
 
 
-def setup_whatsapp(ip: str):
-    async def send_whatsapp(whatsapp_input: WhatsappInput):
-        payload = _handle_parse_input_to_payload(whatsapp_input)
-        return await _handle_send(ip, _handle_create_session(payload), payload)
+class WhatsappSender(HttpSender):
+    def __init__(
+        self,
+        ip: str,
+        concurrency_limit: Optional[int] = None,
+        per_host_limit: Optional[int] = None,
+        keepalive_timeout: Optional[int] = None,
+        dns_cache_ttl: Optional[int] = None,
+        validate: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+        response_mode: ResponseMode = "full",
+        timeout: Optional[aiohttp.ClientTimeout] = None,
+        settings: Settings = Config,
+    ) -> None:
+        super().__init__(
+            concurrency_limit,
+            per_host_limit,
+            keepalive_timeout,
+            dns_cache_ttl,
+            settings,
+        )
+        self.ip = ip
+        self.validate = validate
+        self.options = WhatsappSendOptions(
+            retry_policy=or_default(retry_policy, get_retry_policy(settings)),
+            response_mode=response_mode,
+            timeout=timeout,
+            settings=settings,
+        )
+        track_pool(self, f"whatsapp:{ip}")
+
+    def _get_options(
+        self,
+        response_mode: Optional[ResponseMode],
+        timeout: Optional[aiohttp.ClientTimeout],
+    ) -> WhatsappSendOptions:
+        return self.options._replace(
+            response_mode=or_default(
+                response_mode, self.options.response_mode
+            ),
+            timeout=or_default(timeout, self.options.timeout),
+        )
+
+    async def send(
+        self,
+        whatsapp_input: WhatsappInput,
+        response_mode: Optional[ResponseMode] = None,
+        timeout: Optional[aiohttp.ClientTimeout] = None,
+    ):
+        return await self.send_payload(
+            _handle_parse_input_to_payload(whatsapp_input, self.validate),
+            response_mode,
+            timeout,
+        )
+
+    async def send_payload(
+        self,
+        payload: AllowedWhatsappPayload,
+        response_mode: Optional[ResponseMode] = None,
+        timeout: Optional[aiohttp.ClientTimeout] = None,
+    ):
+        options = self._get_options(response_mode, timeout)
+        send = _handle_send(
+            self.ip,
+            self.session,
+            payload,
+            self.concurrency_limit,
+            options,
+        )
+        if options.response_mode == "none":
+            self._detach(send)
+            return None
+        return await send
+
+    def stream(
+        self,
+        whatsapp_inputs: StreamWhatsappInput,
+        response_mode: Optional[ResponseMode] = None,
+        timeout: Optional[aiohttp.ClientTimeout] = None,
+    ) -> AsyncIterator[Tuple[int, SendReport]]:
+        return stream_with_concurrency(
+            self.concurrency_limit,
+            partial(
+                _send_streamed,
+                self.ip,
+                self.session,
+                self._get_options(response_mode, timeout),
+                self.validate,
+            ),
+            whatsapp_inputs,
+        )
+
+    __call__ = send
+
+
+def setup_whatsapp(
+    ip: str,
+    concurrency_limit: Optional[int] = None,
+    per_host_limit: Optional[int] = None,
+    response_mode: ResponseMode = "full",
+    timeout: Optional[aiohttp.ClientTimeout] = None,
+    settings: Settings = Config,
+):
+    sender = WhatsappSender(
+        ip,
+        concurrency_limit,
+        per_host_limit,
+        response_mode=response_mode,
+        timeout=timeout,
+        settings=settings,
+    )
+
+    async def send_whatsapp(
+        whatsapp_input: WhatsappInput,
+        response_mode: Optional[ResponseMode] = None,
+        timeout: Optional[aiohttp.ClientTimeout] = None,
+    ):
+        return await sender.send(whatsapp_input, response_mode, timeout)
 
+    send_whatsapp.stream = sender.stream  # type: ignore
+    send_whatsapp.aclose = sender.aclose  # type: ignore
     return send_whatsapp
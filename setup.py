@@ -11,6 +11,7 @@ setup(
     url="https://github.com/Invigilo-AI/Galactic-Messenger",
     packages=find_packages(),
     install_requires=open("requirements.txt").readlines(),
+    extras_require={"media": ["Pillow"]},
     classifiers=[
         "Development Status :: 3 - Alpha",
         "License :: OSI Approved :: MIT License",
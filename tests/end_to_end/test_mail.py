@@ -7,12 +7,11 @@ from galactic_messenger.src.mail import setup_email
 @pytest.mark.asyncio
 async def test_send_email_plain():
     send_email = setup_email(env.TEST_MAIL_EMAIL, env.TEST_MAIL_PASSWORD)
-    assert (
-        await send_email(
-            {
-                "to": env.TEST_MAIL_DESTINATION_EMAIL,
-                "subject": "Unit Test Run Successful - Great Job!",
-                "message": """
+    result = await send_email(
+        {
+            "to": env.TEST_MAIL_DESTINATION_EMAIL,
+            "subject": "Unit Test Run Successful - Great Job!",
+            "message": """
 Dear Fellow Software Engineer,
 
 I hope this email finds you well. I am pleased to inform you that the unit tests for Alert Service ran successfully! Congratulations to you and the entire team on this achievement.
@@ -35,21 +34,20 @@ Akrit Woranithiphong
 Your Fellow Software Engineer
 Invigilo AI Safety Video Analytics
                 """,
-            }
-        )
-        is True
+        }
     )
+    assert result.accepted
+    assert not result.failed
 
 
 @pytest.mark.asyncio
 async def test_send_email_attachment():
     send_email = setup_email(env.TEST_MAIL_EMAIL, env.TEST_MAIL_PASSWORD)
-    assert (
-        await send_email(
-            {
-                "to": env.TEST_MAIL_DESTINATION_EMAIL,
-                "subject": "Celebrating Our Unit Test Success! 🎉",
-                "message": """
+    result = await send_email(
+        {
+            "to": env.TEST_MAIL_DESTINATION_EMAIL,
+            "subject": "Celebrating Our Unit Test Success! 🎉",
+            "message": """
 Dear Fellow Software Engineer,
 
 I hope this email finds you in high spirits. I am thrilled to announce that our unit tests for the Alert Service have run successfully, marking a significant milestone for our team. As we celebrate this achievement, I wanted to take a moment to express my gratitude and appreciation for your exceptional work.
@@ -74,9 +72,9 @@ Akrit Woranithiphong
 Your Fellow Software Engineer
 Invigilo AI Safety Video Analytics
         """,
-                "attachment_name": "segual.png",
-                "attachment": open("tests/data/SampleImage.jpg", "rb").read(),
-            }
-        )
-        is True
+            "attachment_name": "segual.png",
+            "attachment": open("tests/data/SampleImage.jpg", "rb").read(),
+        }
     )
+    assert result.accepted
+    assert not result.failed
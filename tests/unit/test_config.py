@@ -0,0 +1,36 @@
+import pytest
+
+from galactic_messenger.config import Settings, load_settings
+
+
+def test_load_settings_reads_environment():
+    settings = load_settings(
+        {
+            "EMAIL_SERVICE": "GMAIL",
+            "BATCH_TOTAL_TIMEOUT": "120.5",
+            "BATCH_CONCURRENCY_LIMIT": "25",
+            "UNRELATED": "ignored",
+        }
+    )
+
+    assert settings.SMTP_SERVER == "GMAIL"
+    assert settings.BATCH_TOTAL_TIMEOUT == 120.5
+    assert settings.BATCH_CONCURRENCY_LIMIT == 25
+    assert settings.SMTP_POOL_SIZE == Settings().SMTP_POOL_SIZE
+
+
+def test_load_settings_prefers_overrides():
+    settings = load_settings(
+        {"SMTP_SERVER": "ZOHO", "EMAIL_SERVICE": "GMAIL"},
+        PER_HOST_CONNECTION_LIMIT=4,
+    )
+
+    assert settings.SMTP_SERVER == "ZOHO"
+    assert settings.PER_HOST_CONNECTION_LIMIT == 4
+
+
+def test_load_settings_rejects_bad_values():
+    with pytest.raises(ValueError, match="SMTP_POOL_SIZE"):
+        load_settings({"SMTP_POOL_SIZE": "many"})
+    with pytest.raises(ValueError, match="POOL"):
+        load_settings({}, POOL=3)
@@ -0,0 +1,209 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from galactic_messenger.src.dedup import AlertDeduplicator, get_dedup_key
+from galactic_messenger.src.report import SendReport
+
+
+@pytest.mark.asyncio
+async def test_get_dedup_key():
+    alert = {"chatId": "1", "text": "Intrusion", "imageBytes": b"frame"}
+
+    assert await get_dedup_key(alert) == await get_dedup_key(dict(alert))
+    assert (await get_dedup_key(alert))[0] == "1"
+    assert await get_dedup_key(alert) != await get_dedup_key(
+        {**alert, "imageBytes": b"other"}
+    )
+    assert await get_dedup_key(alert) != await get_dedup_key(
+        {**alert, "chatId": "2"}
+    )
+
+    async def chunks():
+        yield b"frame"
+
+    assert await get_dedup_key({**alert, "imageBytes": chunks()}) is None
+
+
+@pytest.mark.asyncio
+async def test_file_media_is_keyed_by_content(tmp_path):
+    path = tmp_path / "latest.jpg"
+    path.write_bytes(b"frame")
+    alert = {"chatId": "1", "text": "Intrusion", "imageBytes": path}
+
+    assert await get_dedup_key(alert) == await get_dedup_key(
+        {**alert, "imageBytes": b"frame"}
+    )
+    first = await get_dedup_key(alert)
+    path.write_bytes(b"next frame")
+    assert await get_dedup_key(alert) != first
+    assert (
+        await get_dedup_key({**alert, "imageBytes": Path("missing.jpg")})
+        is None
+    )
+
+    sent = []
+
+    async def send(alert):
+        sent.append(alert)
+        return {"ok": True}
+
+    dedup = AlertDeduplicator(send)
+    path.write_bytes(b"frame")
+    assert await dedup(alert) == {"ok": True}
+    path.write_bytes(b"next frame")
+    assert await dedup(alert) == {"ok": True}
+    assert dedup.dropped == 0
+
+
+@pytest.mark.asyncio
+async def test_duplicates_are_dropped_within_window():
+    sent = []
+
+    async def send(alert):
+        if isinstance(alert, list):
+            sent.extend(alert)
+            return [{"ok": True}] * len(alert)
+        sent.append(alert)
+        return {"ok": True}
+
+    dedup = AlertDeduplicator(send, window=0.05)
+    alert = {"chatId": "1", "text": "Intrusion", "imageBytes": b"frame"}
+
+    assert await dedup.send([alert, dict(alert), dict(alert)]) == [
+        {"ok": True},
+        None,
+        None,
+    ]
+    assert await dedup(dict(alert)) is None
+    await asyncio.sleep(0.06)
+    assert await dedup(dict(alert)) == {"ok": True}
+    assert len(sent) == 2
+    assert dedup.dropped == 3
+
+
+@pytest.mark.asyncio
+async def test_batches_reach_the_sender_in_one_call():
+    batches = []
+
+    async def send(alerts):
+        batches.append(alerts)
+        return [
+            SendReport(alert["text"] != "b", None, None, 1, 0.0)
+            for alert in alerts
+        ]
+
+    dedup = AlertDeduplicator(send)
+    alerts = [{"chatId": "1", "text": text} for text in "aab"]
+
+    results = await dedup.send(alerts)
+
+    assert batches == [[alerts[0], alerts[2]]]
+    assert results[0].ok
+    assert results[1] is None
+    assert not results[2].ok
+    assert await dedup.send(alerts) == [None, None, results[2]]
+    assert batches[1] == [alerts[2]]
+    assert dedup.dropped == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_alerts_are_not_remembered():
+    results = [ConnectionError("reset"), {"ok": False}, {"ok": True}]
+    sent = []
+
+    async def send(alert):
+        sent.append(alert)
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    dedup = AlertDeduplicator(send)
+    alert = {"chatId": "1", "text": "Intrusion", "imageBytes": b"frame"}
+
+    with pytest.raises(ConnectionError):
+        await dedup(alert)
+    assert await dedup(alert) == {"ok": False}
+    assert await dedup(alert) == {"ok": True}
+    assert await dedup(alert) is None
+    assert len(sent) == 3
+    assert dedup.dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_dedup_cache_is_bounded():
+    async def send(alert):
+        return True
+
+    dedup = AlertDeduplicator(send, max_entries=2)
+    for text in "abc":
+        await dedup({"chatId": "1", "text": text})
+
+    assert await dedup({"chatId": "1", "text": "a"}) is True
+    assert await dedup({"chatId": "1", "text": "c"}) is None
+
+
+@pytest.mark.asyncio
+async def test_text_bursts_are_coalesced_per_chat():
+    sent = []
+
+    async def send(alert):
+        sent.append(alert)
+        return len(sent)
+
+    dedup = AlertDeduplicator(send, coalesce=True, coalesce_window=0.02)
+    results = await asyncio.gather(
+        dedup({"chatId": "1", "text": "Zone 1"}),
+        dedup({"chatId": "2", "text": "Zone 2"}),
+        dedup({"chatId": "1", "text": "Zone 3"}),
+        dedup({"chatId": "1", "text": "Zone 1"}),
+        dedup({"chatId": "1", "text": "Photo", "imageBytes": b"frame"}),
+    )
+
+    assert sent[0] == {"chatId": "1", "text": "Photo", "imageBytes": b"frame"}
+    assert sorted(sent[1:], key=lambda alert: alert["chatId"]) == [
+        {"chatId": "1", "text": "Zone 1\nZone 3"},
+        {"chatId": "2", "text": "Zone 2"},
+    ]
+    assert results[0] == results[2]
+    assert results[3] is None
+    assert dedup.coalesced == 1
+
+
+@pytest.mark.asyncio
+async def test_digests_are_split_at_max_length_and_flushed_on_close():
+    sent = []
+
+    async def send(alert):
+        sent.append(alert["text"])
+        return True
+
+    async with AlertDeduplicator(
+        send, coalesce=True, coalesce_window=60, max_digest_length=9
+    ) as dedup:
+        waiters = [
+            asyncio.ensure_future(dedup({"chatId": "1", "text": text}))
+            for text in ("abcd", "efgh", "ijkl")
+        ]
+        await asyncio.sleep(0)
+        assert not sent
+
+    assert sent == ["abcd\nefgh", "ijkl"]
+    assert await asyncio.gather(*waiters) == [True, True, True]
+
+
+@pytest.mark.asyncio
+async def test_digest_failures_reach_every_waiter():
+    async def send(alert):
+        raise ConnectionResetError()
+
+    dedup = AlertDeduplicator(send, coalesce=True, coalesce_window=0.01)
+    results = await asyncio.gather(
+        dedup({"chatId": "1", "text": "a"}),
+        dedup({"chatId": "1", "text": "b"}),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, ConnectionResetError) for result in results)
@@ -0,0 +1,50 @@
+import subprocess
+import sys
+
+import pytest
+
+import galactic_messenger
+from galactic_messenger.src.mail import setup_email
+from galactic_messenger.src.messenger import Messenger
+from galactic_messenger.src.telegram import setup_telegram
+from galactic_messenger.src.whatsapp import setup_whatsapp
+
+
+def _loaded_modules(statement):
+    code = (
+        f"import sys\n{statement}\n"
+        "print(' '.join(sorted({m.split('.')[0] for m in sys.modules})))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(completed.stdout.split())
+
+
+def test_package_import_does_not_load_channel_dependencies():
+    loaded = _loaded_modules("import galactic_messenger")
+
+    assert not loaded & {"aiohttp", "aiosmtplib", "pydantic"}
+
+
+def test_channel_is_loaded_on_first_access():
+    loaded = _loaded_modules("from galactic_messenger import setup_telegram")
+
+    assert "aiohttp" in loaded
+    assert not loaded & {"aiosmtplib", "pydantic"}
+
+
+def test_public_names():
+    assert galactic_messenger.setup_email is setup_email
+    assert galactic_messenger.setup_telegram is setup_telegram
+    assert galactic_messenger.setup_whatsapp is setup_whatsapp
+    assert galactic_messenger.Messenger is Messenger
+    assert set(galactic_messenger.__all__) <= set(dir(galactic_messenger))
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError, match="setup_pigeon"):
+        galactic_messenger.setup_pigeon
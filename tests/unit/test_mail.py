@@ -1,11 +1,24 @@
+import email
 import smtplib
-from unittest.mock import MagicMock, Mock
+from unittest.mock import AsyncMock, MagicMock, Mock
 
-from galactic_messenger.src.mail import (_create_email_body,
+import aiosmtplib
+import pytest
+
+from galactic_messenger.src import mail as mail_module
+from galactic_messenger.src.mail import (EmailSender, _classify_retry,
+                                         _create_email_body,
                                          _create_email_plain_body,
                                          _create_email_with_attachment_body,
                                          _create_server_connection, _send,
+                                         _encode_attachment, _get_recipients,
+                                         _send_bulk, _send_multiple,
+                                         _send_single,
+                                         encode_shared_attachments,
                                          setup_email)
+from galactic_messenger.src.media import LARGE_MEDIA_SIZE
+from galactic_messenger.src.retry import NO_RETRY
+from galactic_messenger.src.smtp_pool import SMTPPool
 
 
 def test_send_email():
@@ -119,3 +132,358 @@ def test_create_email_body():
         attachment_email_body.get_payload()[0].get_content_type()
         == "text/plain"
     )
+
+
+@pytest.mark.asyncio
+async def test_send_multiple_reuses_pooled_connections():
+    def connect():
+        server = MagicMock()
+        server.is_connected = True
+        server.quit = AsyncMock()
+        server.send_message = AsyncMock(return_value=({}, "OK"))
+        return server
+
+    login = AsyncMock(side_effect=connect)
+    pool = SMTPPool(login, max_size=2)
+
+    async def contents():
+        for i in range(20):
+            yield {
+                "to": f"recipient{i}@example.com",
+                "subject": "Shift report",
+                "message": "Hello, World!",
+            }
+
+    reports = await _send_multiple(pool, "test@example.com", contents())
+    assert [report.response.accepted for report in reports] == [
+        [f"recipient{i}@example.com"] for i in range(20)
+    ]
+    assert all(report.ok and report.attempts == 1 for report in reports)
+    assert login.await_count <= pool.max_size
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_classify_retry():
+    assert await _classify_retry(True, None) is None
+    assert (
+        await _classify_retry(
+            None, aiosmtplib.SMTPResponseException(451, "try later")
+        )
+        == 0.0
+    )
+    assert (
+        await _classify_retry(
+            None, aiosmtplib.SMTPResponseException(550, "no such user")
+        )
+        is None
+    )
+    assert (
+        await _classify_retry(None, aiosmtplib.SMTPServerDisconnected("gone"))
+        == 0.0
+    )
+
+
+@pytest.mark.asyncio
+async def test_encode_attachment_streams_file_sources():
+    path = "tests/data/SampleImage.jpg"
+    with open(path, "rb") as file:
+        email_content = await _encode_attachment(
+            {
+                "to": "example@gmail.com",
+                "subject": "example subject",
+                "message": "example message",
+                "attachment_name": "file",
+                "attachment": file,
+            }
+        )
+        file.seek(0)
+        data = file.read()
+
+    email_body = _create_email_body("example@invigilo.sg", email_content)
+
+    attachment = email_body.get_payload()[1]
+    assert attachment["Content-Transfer-Encoding"] == "base64"
+    assert attachment.get_payload(decode=True) == data
+
+
+def _fake_data_server():
+    server = MagicMock()
+    server.is_connected = True
+    server.quit = AsyncMock()
+    server.send_message = AsyncMock()
+    server.mail = AsyncMock()
+    server.rcpt = AsyncMock()
+    server.execute_command = AsyncMock(
+        return_value=aiosmtplib.SMTPResponse(354, "Go ahead")
+    )
+    server.timeout = 1
+    server.protocol._drain_helper = AsyncMock()
+    server.protocol.read_response = AsyncMock(
+        return_value=aiosmtplib.SMTPResponse(250, "OK")
+    )
+    return server
+
+
+def _written_messages(server):
+    messages, chunks = [], []
+    for call in server.protocol.write.call_args_list:
+        if call.args[0] == b".\r\n":
+            messages.append(
+                email.message_from_bytes(
+                    b"".join(chunks).replace(b"\r\n..", b"\r\n.")
+                )
+            )
+            chunks = []
+        else:
+            chunks.append(call.args[0])
+    return messages
+
+
+@pytest.mark.asyncio
+async def test_large_attachments_are_streamed_into_smtp_data():
+    data = bytes(range(256)) * (LARGE_MEDIA_SIZE // 256 + 1)
+    server = _fake_data_server()
+    pool = SMTPPool(AsyncMock(return_value=server))
+
+    assert await _send_single(
+        pool,
+        "test@example.com",
+        {
+            "to": "example@gmail.com",
+            "subject": "Clip",
+            "message": ".hidden\nline",
+            "attachment_name": "clip.mp4",
+            "attachment": data,
+        },
+    )
+
+    server.send_message.assert_not_called()
+    server.mail.assert_awaited_once_with("test@example.com")
+    server.rcpt.assert_awaited_once_with("example@gmail.com")
+    assert server.protocol.write.call_count > 4
+    (message,) = _written_messages(server)
+    text, attachment = message.get_payload()
+    assert message["Subject"] == "Clip"
+    assert text.get_payload() == ".hidden\r\nline"
+    assert attachment.get_filename() == "clip.mp4"
+    assert attachment.get_payload(decode=True) == data
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_one_shot_attachments_reach_every_recipient_chunk():
+    data = bytes(range(256)) * (LARGE_MEDIA_SIZE // 256 + 1)
+    server = _fake_data_server()
+    pool = SMTPPool(AsyncMock(return_value=server))
+
+    async def chunks():
+        yield data[:1000]
+        yield data[1000:]
+
+    result = await _send_single(
+        pool,
+        "test@example.com",
+        {
+            "to": ["a@example.com", "b@example.com", "c@example.com"],
+            "subject": "Clip",
+            "message": "Zone 3",
+            "attachment_name": "clip.mp4",
+            "attachment": chunks(),
+        },
+        max_recipients=2,
+    )
+
+    assert result.accepted == [
+        "a@example.com",
+        "b@example.com",
+        "c@example.com",
+    ]
+    assert result.failed == {}
+    messages = _written_messages(server)
+    assert len(messages) == 2
+    for message in messages:
+        _, attachment = message.get_payload()
+        assert attachment.get_payload(decode=True) == data
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_send_bulk_encodes_shared_attachments_once(monkeypatch):
+    encoded = []
+    iter_mime_base64 = mail_module.iter_mime_base64
+
+    def count_encoding(media, *args, **kwargs):
+        encoded.append(media)
+        return iter_mime_base64(media, *args, **kwargs)
+
+    monkeypatch.setattr(mail_module, "iter_mime_base64", count_encoding)
+    server = _fake_data_server()
+    login = AsyncMock(return_value=server)
+    pool = SMTPPool(login)
+    report = bytes(range(256)) * 1000
+
+    reports = await _send_bulk(
+        pool,
+        "test@example.com",
+        {"subject": "Report for {site}", "message": "Hello {name},\n"},
+        [
+            {"to": "a@example.com", "name": "Ann", "site": "Pier 1"},
+            {"to": "b@example.com", "name": "Ben"},
+            {"to": "c@example.com", "name": "Cat", "site": "Yard"},
+        ],
+        {"report.pdf": report, "notes.txt": b"notes"},
+    )
+
+    assert [report.ok for report in reports] == [True, False, True]
+    assert isinstance(reports[1].error, KeyError)
+    assert len(encoded) == 2
+    assert login.await_count == 1
+    messages = _written_messages(server)
+    assert [message["To"] for message in messages] == [
+        "a@example.com",
+        "c@example.com",
+    ]
+    assert messages[1]["Subject"] == "Report for Yard"
+    text, pdf, notes = messages[1].get_payload()
+    assert text.get_payload() == "Hello Cat,\r\n"
+    assert pdf.get_filename() == "report.pdf"
+    assert pdf.get_payload(decode=True) == report
+    assert notes.get_payload(decode=True) == b"notes"
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_shared_attachments_are_streamed_into_smtp_data():
+    server = _fake_data_server()
+    pool = SMTPPool(AsyncMock(return_value=server))
+    (attachment,) = await encode_shared_attachments({"zone3.jpg": b"frame"})
+
+    for recipient in ("a@example.com", "b@example.com"):
+        assert await _send_single(
+            pool,
+            "test@example.com",
+            {
+                "to": recipient,
+                "subject": "Intrusion",
+                "message": "Zone 3",
+                "attachment_name": "zone3.jpg",
+                "attachment": attachment,
+            },
+        )
+
+    server.send_message.assert_not_called()
+    messages = _written_messages(server)
+    assert [message["To"] for message in messages] == [
+        "a@example.com",
+        "b@example.com",
+    ]
+    text, image = messages[1].get_payload()
+    assert text.get_payload() == "Zone 3"
+    assert image.get_filename() == "zone3.jpg"
+    assert image.get_payload(decode=True) == b"frame"
+    await pool.aclose()
+
+
+def test_recipient_lists_become_headers_and_envelope():
+    email_content = {
+        "to": ["a@example.com", "b@example.com"],
+        "cc": "c@example.com",
+        "bcc": ["d@example.com", "a@example.com"],
+        "subject": "Shift report",
+        "message": "Hello",
+    }
+
+    email_body = _create_email_body("test@example.com", email_content)
+
+    assert email_body["To"] == "a@example.com, b@example.com"
+    assert email_body["Cc"] == "c@example.com"
+    assert email_body["Bcc"] is None
+    assert _get_recipients(email_content) == [
+        "a@example.com",
+        "b@example.com",
+        "c@example.com",
+        "d@example.com",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_recipients_are_chunked_and_refusals_reported():
+    server = MagicMock()
+    server.is_connected = True
+    server.quit = AsyncMock()
+    server.send_message = AsyncMock(
+        side_effect=[
+            ({"b": aiosmtplib.SMTPResponse(550, "No such user")}, "OK"),
+            aiosmtplib.SMTPRecipientsRefused(
+                [aiosmtplib.SMTPRecipientRefused(553, "Denied", "c")]
+            ),
+        ]
+    )
+    pool = SMTPPool(AsyncMock(return_value=server))
+
+    result = await _send_single(
+        pool,
+        "test@example.com",
+        {"to": ["a", "b"], "bcc": "c", "subject": "Hi", "message": "Hi"},
+        NO_RETRY,
+        max_recipients=2,
+    )
+
+    assert [
+        call.kwargs["recipients"]
+        for call in server.send_message.call_args_list
+    ] == [["a", "b"], ["c"]]
+    assert result.accepted == ["a"]
+    assert {k: v.code for k, v in result.refused.items()} == {
+        "b": 550,
+        "c": 553,
+    }
+    assert result
+
+    lost = ConnectionError("reset")
+    server.send_message = AsyncMock(side_effect=[({}, "OK"), lost])
+    result = await _send_single(
+        pool,
+        "test@example.com",
+        {"to": ["a", "b"], "cc": "c", "subject": "Hi", "message": "Hi"},
+        NO_RETRY,
+        max_recipients=2,
+    )
+
+    assert result.accepted == ["a", "b"]
+    assert result.refused == {}
+    assert result.failed == {"c": lost}
+    assert result
+
+    server.send_message = AsyncMock(side_effect=lost)
+    with pytest.raises(ConnectionError):
+        await _send_single(
+            pool,
+            "test@example.com",
+            {"to": ["a", "b"], "subject": "Hi", "message": "Hi"},
+            NO_RETRY,
+            max_recipients=1,
+        )
+
+    server.send_message = AsyncMock(
+        side_effect=aiosmtplib.SMTPRecipientsRefused(
+            [aiosmtplib.SMTPRecipientRefused(550, "No such user", "a")]
+        )
+    )
+    with pytest.raises(aiosmtplib.SMTPRecipientsRefused):
+        await _send_single(
+            pool,
+            "test@example.com",
+            {"to": "a", "subject": "Hi", "message": "Hi"},
+            NO_RETRY,
+        )
+    await pool.aclose()
+
+
+def test_email_sender_connects_to_configured_host():
+    sender = EmailSender(
+        "example@invigilo.sg", "example_password", host="127.0.0.1", port=2525
+    )
+
+    assert sender.pool.connect.args[:2] == ("127.0.0.1", 2525)
@@ -0,0 +1,188 @@
+import asyncio
+import io
+import mmap
+import os
+from email import encoders
+from email.mime.base import MIMEBase
+
+import pytest
+from aiohttp import ClientSession, web
+
+from galactic_messenger.src import telegram
+from galactic_messenger.src.media import (
+    LARGE_MEDIA_SIZE,
+    MediaStream,
+    encode_mime_base64,
+    get_media_size,
+    is_large_media,
+    iter_media,
+    iter_mime_base64,
+    make_replayable,
+    to_media,
+)
+
+
+async def _collect(media):
+    return b"".join([bytes(chunk) async for chunk in iter_media(media, 1000)])
+
+
+def test_to_media_keeps_buffers_and_wraps_streams(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(b"video")
+    data = b"image"
+
+    assert to_media(data) is data
+    assert isinstance(to_media(path), MediaStream)
+    assert to_media(path).name == "clip.mp4"
+    assert get_media_size(to_media(path)) == 5
+    with pytest.raises(TypeError):
+        to_media(1)
+
+
+@pytest.mark.asyncio
+async def test_media_sources_stream_their_content(tmp_path):
+    data = os.urandom(4321)
+    path = tmp_path / "image.jpg"
+    path.write_bytes(data)
+
+    async def reader():
+        yield data[:100]
+        yield data[100:]
+
+    with (
+        open(path, "rb") as file,
+        mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+    ):
+        assert await _collect(to_media(mapped)) == data
+    assert await _collect(to_media(memoryview(data))) == data
+    assert await _collect(to_media(path)) == data
+    assert await _collect(to_media(reader())) == data
+
+
+@pytest.mark.asyncio
+async def test_file_streams_replay_from_start_offset():
+    file = io.BytesIO(b"headerpayload")
+    file.seek(6)
+    media = MediaStream(file)
+
+    assert media.size == 7
+    assert await _collect(media) == b"payload"
+    assert await _collect(media) == b"payload"
+
+
+@pytest.mark.asyncio
+async def test_async_iterators_can_only_be_read_once():
+    async def reader():
+        yield b"data"
+
+    media = MediaStream(reader())
+
+    assert media.size is None
+    assert await _collect(media) == b"data"
+    with pytest.raises(RuntimeError):
+        await _collect(media)
+
+
+@pytest.mark.asyncio
+async def test_one_shot_streams_are_spooled_for_replay():
+    data = os.urandom(LARGE_MEDIA_SIZE + 1000)
+
+    async def chunks(data):
+        view = memoryview(data)
+        while view:
+            chunk, view = view[:1000], view[1000:]
+            yield bytes(chunk)
+
+    assert await make_replayable(to_media(chunks(b"small"))) == b"small"
+    spooled = await make_replayable(to_media(chunks(data)))
+    assert isinstance(spooled, MediaStream)
+    assert spooled.replayable
+    assert spooled.size == len(data)
+    assert await _collect(spooled) == data
+    assert await _collect(spooled) == data
+
+    spooled.close()
+    assert spooled.source.closed
+    stream = MediaStream(io.BytesIO(b"abc"))
+    assert await make_replayable(stream) is stream
+    stream.close()
+    assert not stream.source.closed
+
+
+@pytest.mark.asyncio
+async def test_encode_mime_base64_matches_email_encoder():
+    for data in (os.urandom(5000), os.urandom(57 * 40), b"text\n"):
+        part = MIMEBase("application", "octet-stream")
+        part.set_payload(data)
+        encoders.encode_base64(part)
+
+        encoded = await encode_mime_base64(to_media(io.BytesIO(data)), 570)
+        chunks = [
+            chunk
+            async for chunk in iter_mime_base64(data, 570, linesep=b"\r\n")
+        ]
+
+        assert encoded == part.get_payload()
+        assert b"".join(chunks) == encoded.replace("\n", "\r\n").encode()
+
+
+@pytest.mark.asyncio
+async def test_large_buffers_yield_to_the_loop_between_chunks():
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    ticker = asyncio.ensure_future(tick())
+    await asyncio.sleep(0)
+    assert await _collect(os.urandom(10000)) is not None
+    ticker.cancel()
+
+    assert ticks >= 10
+    assert not is_large_media(b"small")
+    assert is_large_media(bytes(LARGE_MEDIA_SIZE + 1))
+    assert is_large_media(to_media(io.BytesIO(bytes(LARGE_MEDIA_SIZE + 1))))
+
+
+@pytest.mark.asyncio
+async def test_telegram_form_data_streams_files(tmp_path):
+    received = {}
+
+    async def handler(request):
+        async for field in await request.multipart():
+            received[field.name] = (field.filename, await field.read())
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_post("/", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    data = os.urandom(200000)
+    video = os.urandom(LARGE_MEDIA_SIZE + 1)
+    path = tmp_path / "snapshot.jpg"
+    path.write_bytes(data)
+
+    async with ClientSession() as session:
+        form = getattr(telegram, "__create_form_data")(
+            {
+                "chat_id": "1",
+                "photo": to_media(path),
+                "video": video,
+                "caption": "alert",
+            }
+        )
+        async with session.post(
+            f"http://127.0.0.1:{port}/", data=form
+        ) as response:
+            assert response.status == 200
+    await runner.cleanup()
+
+    assert received["photo"] == ("snapshot.jpg", data)
+    assert received["video"] == ("video", video)
+    assert received["caption"] == (None, b"alert")
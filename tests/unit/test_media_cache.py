@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from galactic_messenger.src.media import LARGE_MEDIA_SIZE
+from galactic_messenger.src.media_cache import (
+    FileIdCache,
+    hash_media,
+    hash_media_async,
+)
+
+
+def test_cache_evicts_least_recently_used():
+    cache = FileIdCache(max_entries=2)
+    cache.set("a", "file-a")
+    cache.set("b", "file-b")
+    cache.get("a")
+    cache.set("c", "file-c")
+
+    assert cache.get("a") == "file-a"
+    assert cache.get("b") is None
+    assert cache.get("c") == "file-c"
+
+
+def test_cache_is_backed_by_disk(tmp_path):
+    path = tmp_path / "file_ids.db"
+    cache = FileIdCache(path=path)
+    cache.set("a", "file-a")
+    cache.set("b", "file-b")
+    cache.discard("b")
+    cache.close()
+
+    cache = FileIdCache(path=path)
+    assert cache.get("a") == "file-a"
+    assert cache.get("b") is None
+    cache.close()
+
+
+def test_hash_media_is_content_based():
+    assert hash_media(b"image") == hash_media(bytearray(b"image"))
+    assert hash_media(b"image") != hash_media(b"video")
+
+
+@pytest.mark.asyncio
+async def test_large_media_is_hashed_off_the_loop():
+    data = bytes(LARGE_MEDIA_SIZE + 1)
+
+    assert await hash_media_async(data) == hash_media(data)
+    assert await hash_media_async(b"image") == hash_media(b"image")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_uploads_of_same_media_wait_for_first():
+    cache = FileIdCache()
+    uploads = []
+
+    async def send():
+        file_id, claimed = await cache.acquire("key")
+        if claimed:
+            uploads.append(1)
+            await asyncio.sleep(0.01)
+            cache.release("key", "file-id")
+            return "file-id"
+        return file_id
+
+    assert await asyncio.gather(*[send() for _ in range(5)]) == ["file-id"] * 5
+    assert len(uploads) == 1
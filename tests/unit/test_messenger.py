@@ -0,0 +1,121 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from galactic_messenger.src.mail import SharedAttachment
+from galactic_messenger.src.messenger import Messenger
+from galactic_messenger.src.streaming import Base64Media
+
+TEXT = "Intrusion in zone 3\nCamera 7"
+
+
+def _sender(results):
+    sender = MagicMock()
+    sender.send = AsyncMock(side_effect=lambda items: results(items))
+    sender.send_payload = AsyncMock(side_effect=lambda items: results(items))
+    sender.aclose = AsyncMock()
+    return sender
+
+
+@pytest.mark.asyncio
+async def test_send_fans_out_with_media_encoded_once_per_channel(tmp_path):
+    path = tmp_path / "zone3.jpg"
+    path.write_bytes(b"snapshot")
+    email = _sender(lambda items: [True] * len(items))
+    telegram = _sender(lambda items: [{"ok": True}] * len(items))
+    whatsapp = _sender(lambda items: [{"ok": True}] * len(items))
+
+    async with Messenger(email, telegram, whatsapp) as messenger:
+        results = await messenger.send(
+            {
+                "text": TEXT,
+                "media": path,
+                "recipients": {
+                    "email": ["a@example.com", "b@example.com"],
+                    "telegram": ["1", "2"],
+                    "whatsapp": ["group_1", "group_2"],
+                },
+            }
+        )
+
+    assert {channel: result.ok for channel, result in results.items()} == {
+        "email": True,
+        "telegram": True,
+        "whatsapp": True,
+    }
+    assert results["telegram"].results == [{"ok": True}, {"ok": True}]
+    emails = email.send.call_args.args[0]
+    assert [item["to"] for item in emails] == [
+        "a@example.com",
+        "b@example.com",
+    ]
+    assert emails[0]["subject"] == "Intrusion in zone 3"
+    assert emails[0]["attachment_name"] == "zone3.jpg"
+    assert isinstance(emails[0]["attachment"], SharedAttachment)
+    assert emails[0]["attachment"] is emails[1]["attachment"]
+    assert b"zone3.jpg" in emails[0]["attachment"].head
+    assert telegram.send_payload.call_args.args[0] == [
+        {"chat_id": "1", "photo": b"snapshot", "caption": TEXT},
+        {"chat_id": "2", "photo": b"snapshot", "caption": TEXT},
+    ]
+    whatsapp_payloads = whatsapp.send_payload.call_args.args[0]
+    assert [item["groupId"] for item in whatsapp_payloads] == [
+        "group_1",
+        "group_2",
+    ]
+    assert whatsapp_payloads[0]["caption"] == TEXT
+    encoded = whatsapp_payloads[0]["imageBase64"]
+    assert isinstance(encoded, Base64Media)
+    assert encoded is whatsapp_payloads[1]["imageBase64"]
+    assert b"".join(encoded.encoded) == b"c25hcHNob3Q="
+    assert str(encoded) == "c25hcHNob3Q="
+    for sender in (email, telegram, whatsapp):
+        sender.aclose.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_channel_failures_are_reported_per_channel():
+    telegram = _sender(lambda items: [{"ok": False, "error_code": 400}])
+    whatsapp = MagicMock()
+    whatsapp.send_payload = AsyncMock(side_effect=ConnectionError("down"))
+
+    results = await Messenger(telegram=telegram, whatsapp=whatsapp).send(
+        {
+            "text": "Hello",
+            "recipients": {"telegram": ["1"], "whatsapp": ["group"]},
+        }
+    )
+
+    assert results["telegram"].ok is False
+    assert results["telegram"].error is None
+    assert results["whatsapp"].ok is False
+    assert isinstance(results["whatsapp"].error, ConnectionError)
+    assert telegram.send_payload.call_args.args[0] == [
+        {"chat_id": "1", "text": "Hello"}
+    ]
+
+
+@pytest.mark.asyncio
+async def test_detached_sends_are_reported_as_ok():
+    telegram = _sender(lambda items: None)
+    whatsapp = _sender(lambda items: [{"ok": True}])
+
+    results = await Messenger(telegram=telegram, whatsapp=whatsapp).send(
+        {
+            "text": "Hello",
+            "recipients": {"telegram": ["1"], "whatsapp": ["group"]},
+        }
+    )
+
+    assert results["telegram"].ok is True
+    assert results["telegram"].results == []
+    assert results["telegram"].error is None
+    assert results["whatsapp"].ok is True
+
+
+@pytest.mark.asyncio
+async def test_send_requires_a_sender_for_each_channel():
+    with pytest.raises(ValueError):
+        await Messenger().send(
+            {"text": "Hello", "recipients": {"email": ["a@example.com"]}}
+        )
@@ -0,0 +1,162 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from galactic_messenger.src.metrics import (
+    Histogram,
+    MetricsRegistry,
+    disable_metrics,
+    enable_metrics,
+    get_upload_size,
+    instrument_send,
+    track_pool,
+)
+from galactic_messenger.src.retry import NO_RETRY, RetryPolicy
+from galactic_messenger.src.streaming import Base64Media
+from galactic_messenger.src.telegram import (
+    TelegramSender,
+    TelegramSendOptions,
+    _send,
+)
+from galactic_messenger.src.whatsapp import WhatsappSender
+
+
+@pytest.fixture
+def metrics():
+    registry = enable_metrics(MetricsRegistry())
+    yield registry
+    disable_metrics()
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency", "Latency.", ("channel",), (0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(("telegram",), value)
+
+    assert histogram.samples() == [
+        'latency_bucket{channel="telegram",le="0.1"} 2',
+        'latency_bucket{channel="telegram",le="1"} 3',
+        'latency_bucket{channel="telegram",le="+Inf"} 4',
+        'latency_sum{channel="telegram"} 3.65',
+        'latency_count{channel="telegram"} 4',
+    ]
+
+
+def test_get_upload_size_counts_text_and_media():
+    assert (
+        get_upload_size(
+            {
+                "chat_id": "42",
+                "photo": b"12345",
+                "caption": "✓",
+                "media": [{"video": Base64Media(b"123")}],
+            }
+        )
+        == 2 + 5 + 3 + 4
+    )
+
+
+@pytest.mark.asyncio
+async def test_instrument_send_is_a_passthrough_when_disabled():
+    hook = MagicMock()
+    call = AsyncMock(return_value="result")
+
+    assert await instrument_send("telegram", "IMAGE", {}, call, hook) == (
+        "result"
+    )
+    call.assert_awaited_once_with(hook)
+
+
+@pytest.mark.asyncio
+async def test_instrument_send_records_retries_and_failures(metrics):
+    async def call(on_retry):
+        on_retry(None, None, 1)
+        return False
+
+    result = await instrument_send(
+        "email",
+        "MESSAGE",
+        {"message": "abc"},
+        call,
+        get_failure_reason=lambda result: None if result else "rejected",
+    )
+
+    labels = ("email", "MESSAGE")
+    assert result is False
+    assert metrics.retries.get(labels) == 1
+    assert metrics.failures.get(labels + ("rejected",)) == 1
+    assert metrics.uploaded_bytes.get(labels) == 6
+    assert metrics.in_flight.get(labels) == 0
+    assert metrics.latency.count(labels) == 1
+
+    with pytest.raises(ValueError):
+        await instrument_send(
+            "email", "MESSAGE", {}, AsyncMock(side_effect=ValueError())
+        )
+    assert metrics.failures.get(labels + ("ValueError",)) == 1
+
+
+@pytest.mark.asyncio
+async def test_telegram_send_reports_http_failures(metrics):
+    response = MagicMock()
+    response.status = 503
+    response.headers = {}
+    session = AsyncMock()
+    session.post = AsyncMock(return_value=response)
+
+    await _send(
+        "token",
+        session,
+        "MESSAGE",
+        {"chat_id": "42", "text": "Hello"},
+        TelegramSendOptions(
+            retry_policy=RetryPolicy(attempts=2, base_delay=0, max_delay=0)
+        ),
+    )
+    await _send(
+        "token",
+        session,
+        "MESSAGE",
+        {"chat_id": "42", "text": "Hello"},
+        TelegramSendOptions(retry_policy=NO_RETRY),
+    )
+
+    labels = ("telegram", "MESSAGE")
+    assert metrics.failures.get(labels + ("503",)) == 2
+    assert metrics.retries.get(labels) == 1
+    assert response.release.call_count == 1
+    assert (
+        'galactic_messenger_failures_total{channel="telegram",'
+        'payload_type="MESSAGE",reason="503"} 2' in metrics.render()
+    )
+
+
+def test_http_senders_are_tracked_as_pools(metrics):
+    telegram = TelegramSender("123:secret")
+    whatsapp = WhatsappSender("http://10.0.0.1:3000")
+
+    text = metrics.render()
+
+    assert (
+        'galactic_messenger_pool_connections{pool="telegram:123",'
+        'state="idle"} 0' in text
+    )
+    assert (
+        'galactic_messenger_pool_connections{pool="whatsapp:'
+        'http://10.0.0.1:3000",state="in_use"} 0' in text
+    )
+    assert "secret" not in text
+    del telegram, whatsapp
+
+
+def test_render_includes_tracked_pools(metrics):
+    pool = MagicMock(idle=2, in_use=1)
+    track_pool(pool, "smtp:alerts@example.com")
+
+    text = metrics.render()
+
+    assert "# TYPE galactic_messenger_pool_connections gauge" in text
+    assert (
+        'galactic_messenger_pool_connections{pool="smtp:alerts@example.com",'
+        'state="idle"} 2' in text
+    )
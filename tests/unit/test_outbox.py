@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from galactic_messenger.src.outbox import Outbox
+from galactic_messenger.src.retry import RetryPolicy
+
+FAST_RETRY = RetryPolicy(base_delay=0, max_delay=0)
+
+
+@pytest.mark.asyncio
+async def test_enqueue_returns_before_delivery_and_drains_in_batches(
+    tmp_path,
+):
+    batches = []
+
+    async def send(items):
+        batches.append(items)
+        return [True] * len(items)
+
+    outbox = Outbox(tmp_path / "outbox.db", {"email": send}, batch_size=3)
+    ids = outbox.enqueue_many("email", [{"to": str(i)} for i in range(7)])
+
+    assert len(ids) == 7
+    assert outbox.pending == 7
+    assert batches == []
+
+    async with outbox:
+        await asyncio.wait_for(outbox.join(), 5)
+
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert [item["to"] for batch in batches for item in batch] == [
+        str(i) for i in range(7)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_failed_items_are_retried_then_dead_lettered(tmp_path):
+    calls = []
+
+    async def send(items):
+        calls.append([item["text"] for item in items])
+        return [
+            {"ok": item["text"] != "bad"} if len(calls) > 1 else {"ok": False}
+            for item in items
+        ]
+
+    outbox = Outbox(
+        tmp_path / "outbox.db",
+        {"telegram": send},
+        max_attempts=2,
+        retry_policy=FAST_RETRY,
+        poll_interval=0.01,
+    )
+    outbox.enqueue("telegram", {"text": "good"})
+    outbox.enqueue("telegram", {"text": "bad"})
+
+    async with outbox:
+        await asyncio.wait_for(outbox.join(), 5)
+        assert outbox.dead == 1
+        assert [
+            (channel, item) for _, channel, item, _ in outbox.dead_letters()
+        ] == [("telegram", {"text": "bad"})]
+
+    assert calls == [["good", "bad"], ["good", "bad"]]
+
+
+@pytest.mark.asyncio
+async def test_mismatched_results_fail_every_item(tmp_path):
+    results = [[{"ok": True}], {"ok": True}]
+
+    async def send(items):
+        return results.pop(0) if results else [True] * len(items)
+
+    outbox = Outbox(
+        tmp_path / "outbox.db",
+        {"telegram": send},
+        max_attempts=2,
+        retry_policy=FAST_RETRY,
+        poll_interval=0.01,
+    )
+    outbox.enqueue_many("telegram", [{"text": "a"}, {"text": "b"}])
+
+    async with outbox:
+        await asyncio.wait_for(outbox.join(), 5)
+        assert outbox.dead == 2
+        assert all(
+            "one result per item" in error
+            for _, _, _, error in outbox.dead_letters()
+        )
+
+
+@pytest.mark.asyncio
+async def test_unfinished_items_are_recovered_after_restart(tmp_path):
+    path = tmp_path / "outbox.db"
+    started = asyncio.Event()
+
+    async def hang(items):
+        started.set()
+        await asyncio.Event().wait()
+
+    outbox = Outbox(path, {"whatsapp": hang})
+    outbox.enqueue("whatsapp", {"text": "alert"})
+    outbox.start()
+    await asyncio.wait_for(started.wait(), 5)
+    await outbox.aclose()
+
+    delivered = []
+
+    async def send(items):
+        delivered.extend(items)
+        return [{"ok": True}] * len(items)
+
+    async with Outbox(path, {"whatsapp": send}) as outbox:
+        await asyncio.wait_for(outbox.join(), 5)
+
+    assert delivered == [{"text": "alert"}]
+
+
+def test_enqueue_rejects_unknown_channels(tmp_path):
+    outbox = Outbox(tmp_path / "outbox.db", {"email": None})
+
+    with pytest.raises(ValueError):
+        outbox.enqueue("sms", {"text": "alert"})
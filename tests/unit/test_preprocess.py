@@ -0,0 +1,209 @@
+import io
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from galactic_messenger.src import preprocess
+from galactic_messenger.src.preprocess import (
+    TELEGRAM_MEDIA_LIMITS,
+    WHATSAPP_MEDIA_LIMITS,
+    MediaLimits,
+    MediaPreprocessor,
+    shrink_image,
+    shrink_video,
+)
+
+SMALL_LIMITS = MediaLimits(4, 8, 100, True)
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(2) as executor:
+        yield executor
+
+
+@pytest.mark.asyncio
+async def test_oversized_photos_become_documents(executor):
+    preprocessor = MediaPreprocessor(SMALL_LIMITS, executor=executor)
+    preprocessor.can_resize_images = False
+    alert = {"chatId": "1", "text": "Intrusion", "imageBytes": b"large"}
+
+    assert await preprocessor(alert) == {
+        "chatId": "1",
+        "text": "Intrusion",
+        "documentBytes": b"large",
+    }
+    assert await preprocessor({**alert, "imageBytes": b"tiny"}) == {
+        **alert,
+        "imageBytes": b"tiny",
+    }
+
+    preprocessor.limits = SMALL_LIMITS._replace(documents=False)
+    assert await preprocessor(alert) == alert
+
+
+@pytest.mark.asyncio
+async def test_images_are_shrunk_in_executor(executor, monkeypatch):
+    calls = []
+
+    def fake_shrink(source, max_side, max_bytes, quality):
+        calls.append((source, max_side, max_bytes, quality))
+        return b"jpg"
+
+    monkeypatch.setattr(preprocess, "shrink_image", fake_shrink)
+    preprocessor = MediaPreprocessor(
+        SMALL_LIMITS, executor=executor, image_quality=70
+    )
+    preprocessor.can_resize_images = True
+
+    result = await preprocessor(
+        [
+            {"chatId": "1", "text": "a", "imageBytes": io.BytesIO(b"large")},
+            {"chatId": "1", "text": "b"},
+        ]
+    )
+
+    assert result == [
+        {"chatId": "1", "text": "a", "imageBytes": b"jpg"},
+        {"chatId": "1", "text": "b"},
+    ]
+    assert calls == [(b"large", 100, 4, 70)]
+
+
+@pytest.mark.asyncio
+async def test_failed_processing_keeps_original_media(executor, monkeypatch):
+    def broken(*args):
+        raise OSError("cannot identify image file")
+
+    monkeypatch.setattr(preprocess, "shrink_image", broken)
+    monkeypatch.setattr(preprocess, "shrink_video", broken)
+    preprocessor = MediaPreprocessor(SMALL_LIMITS, executor=executor)
+    preprocessor.can_resize_images = True
+    preprocessor.can_transcode_videos = True
+
+    assert await preprocessor(
+        {"chatId": "1", "text": "a", "imageBytes": bytearray(b"ab")}
+    ) == {"chatId": "1", "text": "a", "imageBytes": b"ab"}
+    assert await preprocessor(
+        {"chatId": "1", "text": "a", "videoBytes": b"0123456789"}
+    ) == {"chatId": "1", "text": "a", "videoBytes": b"0123456789"}
+
+
+@pytest.mark.asyncio
+async def test_videos_are_only_transcoded_when_needed(executor, monkeypatch):
+    calls = []
+
+    def fake_transcode(source, max_bytes, max_height, max_seconds, timeout):
+        calls.append((source, max_bytes, max_height, max_seconds, timeout))
+        return b"mp4"
+
+    monkeypatch.setattr(preprocess, "shrink_video", fake_transcode)
+    preprocessor = MediaPreprocessor(
+        SMALL_LIMITS, executor=executor, video_timeout=30
+    )
+    preprocessor.can_transcode_videos = True
+    small = {"chatId": "1", "text": "a", "videoBytes": b"clip"}
+    large = {"chatId": "1", "text": "a", "videoBytes": b"0123456789"}
+
+    assert await preprocessor(small) == small
+    assert await preprocessor(large) == {**large, "videoBytes": b"mp4"}
+
+    preprocessor.max_video_seconds = 5
+    assert await preprocessor(small) == {**small, "videoBytes": b"mp4"}
+    assert calls == [
+        (b"0123456789", 8, 720, None, 30),
+        (b"clip", 8, 720, 5, 30),
+    ]
+
+    preprocessor.can_transcode_videos = False
+    assert await preprocessor(large) == large
+
+
+@pytest.mark.asyncio
+async def test_hung_ffmpeg_keeps_original_video(executor, monkeypatch):
+    def hung(command, **kwargs):
+        raise subprocess.TimeoutExpired(command, kwargs["timeout"])
+
+    monkeypatch.setattr(preprocess.subprocess, "run", hung)
+    preprocessor = MediaPreprocessor(
+        SMALL_LIMITS, executor=executor, video_timeout=0.5
+    )
+    preprocessor.can_transcode_videos = True
+    alert = {"chatId": "1", "text": "a", "videoBytes": b"0123456789"}
+
+    assert await preprocessor(alert) == alert
+
+
+@pytest.mark.asyncio
+async def test_broken_process_pool_keeps_original_media(monkeypatch):
+    def broken(*args):
+        raise BrokenProcessPool("worker died")
+
+    monkeypatch.setattr(preprocess, "shrink_image", broken)
+    monkeypatch.setattr(preprocess, "shrink_video", broken)
+    preprocessor = MediaPreprocessor(SMALL_LIMITS)
+    preprocessor.can_resize_images = True
+    preprocessor.can_transcode_videos = True
+    image = {"chatId": "1", "text": "a", "imageBytes": b"ab"}
+    video = {"chatId": "1", "text": "a", "videoBytes": b"0123456789"}
+
+    for alert in (image, video):
+        preprocessor._executor = ThreadPoolExecutor(1)
+        assert await preprocessor(alert) == alert
+        assert preprocessor._executor is None
+
+
+@pytest.mark.asyncio
+async def test_process_pool_is_created_lazily_and_closed():
+    async with MediaPreprocessor(WHATSAPP_MEDIA_LIMITS) as preprocessor:
+        assert preprocessor._executor is None
+        assert await preprocessor({"chatId": "1", "text": "a"}) == {
+            "chatId": "1",
+            "text": "a",
+        }
+        assert preprocessor._executor is None
+        assert preprocessor.executor is preprocessor.executor
+
+    assert preprocessor._executor is None
+
+
+def test_shrink_image():
+    Image = pytest.importorskip("PIL.Image")
+    output = io.BytesIO()
+    Image.new("RGB", (4000, 1000), "red").save(output, "PNG")
+
+    data = shrink_image(output.getvalue(), 2000, 2**20)
+
+    with Image.open(io.BytesIO(data)) as image:
+        assert image.format == "JPEG"
+        assert image.size == (2000, 500)
+    assert shrink_image(data, 2000, 2**20) == data
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="requires ffmpeg")
+def test_shrink_video(tmp_path):
+    import subprocess
+
+    source = tmp_path / "clip.mp4"
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            "testsrc=duration=3:size=1280x720:rate=10",
+            str(source),
+        ],
+        check=True,
+    )
+
+    data = shrink_video(
+        str(source), TELEGRAM_MEDIA_LIMITS.max_upload_bytes, 360
+    )
+
+    assert 0 < len(data) <= TELEGRAM_MEDIA_LIMITS.max_upload_bytes
@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+import pytest
+
+from galactic_messenger.config import load_settings
+from galactic_messenger.src.rate_limit import (
+    TelegramRateLimiter,
+    TokenBucket,
+    get_telegram_rate_limiter,
+)
+from galactic_messenger.src.telegram import TelegramSender
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_enforces_rate():
+    bucket = TokenBucket(rate=100, capacity=1)
+    start = time.monotonic()
+
+    for _ in range(6):
+        await bucket.acquire()
+
+    assert time.monotonic() - start >= 0.045
+
+
+@pytest.mark.asyncio
+async def test_paused_chat_does_not_block_other_chats():
+    rate_limiter = TelegramRateLimiter(global_rate=1000, chat_rate=1000)
+    rate_limiter.pause("1", 0.2)
+    start = time.monotonic()
+
+    await rate_limiter.acquire("2")
+    assert time.monotonic() - start < 0.1
+
+    await rate_limiter.acquire("1")
+    assert time.monotonic() - start >= 0.19
+
+
+@pytest.mark.asyncio
+async def test_group_rate_is_applied_to_negative_chat_ids():
+    rate_limiter = TelegramRateLimiter(
+        global_rate=1000, chat_rate=1000, group_rate=20
+    )
+
+    start = time.monotonic()
+    await asyncio.gather(*[rate_limiter.acquire("42") for _ in range(3)])
+    assert time.monotonic() - start < 0.05
+
+    start = time.monotonic()
+    await asyncio.gather(*[rate_limiter.acquire("-42") for _ in range(3)])
+    assert time.monotonic() - start >= 0.09
+
+
+def test_rate_limiter_is_shared_per_token():
+    assert get_telegram_rate_limiter("a") is get_telegram_rate_limiter("a")
+    assert get_telegram_rate_limiter("a") is not get_telegram_rate_limiter("b")
+
+
+def test_rate_limiter_uses_sender_settings():
+    settings = load_settings(
+        {},
+        TELEGRAM_GLOBAL_RATE_LIMIT=10,
+        TELEGRAM_CHAT_RATE_LIMIT=0.5,
+        TELEGRAM_GROUP_RATE_LIMIT=6,
+    )
+    rate_limiter = TelegramSender("c", settings=settings).options.rate_limiter
+
+    assert rate_limiter is get_telegram_rate_limiter("c", settings)
+    assert rate_limiter is not get_telegram_rate_limiter("c")
+    assert rate_limiter.chat_rate == 0.5
+    assert rate_limiter.group_rate == 0.1
+    assert rate_limiter._global.rate == 10
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from galactic_messenger.src.report import (
+    SendReport,
+    is_delivered,
+    report_send,
+    resend_failed,
+)
+from galactic_messenger.src.retry import RetryPolicy, call_with_retry
+
+
+def test_is_delivered():
+    assert is_delivered(True) is True
+    assert is_delivered({"ok": True}) is True
+    assert is_delivered(False) is False
+    assert is_delivered({"ok": False, "error_code": 400}) is False
+    assert is_delivered(ValueError("boom")) is False
+    assert is_delivered(SendReport(True, None, None, 1, 0.0)) is True
+    assert is_delivered(SendReport(False, None, None, 1, 0.0)) is False
+
+
+@pytest.mark.asyncio
+async def test_report_send_counts_attempts():
+    calls = []
+
+    async def flaky():
+        calls.append(True)
+        return {"ok": len(calls) == 3}
+
+    async def classify(result, error):
+        return None if result["ok"] else 0.0
+
+    report = await report_send(
+        call_with_retry(RetryPolicy(attempts=5, base_delay=0), flaky, classify)
+    )
+
+    assert report.ok
+    assert report.response == {"ok": True}
+    assert report.error is None
+    assert report.attempts == 3
+    assert report.latency >= 0
+
+
+@pytest.mark.asyncio
+async def test_report_send_captures_errors():
+    async def fail():
+        raise ValueError("Invalid Input Payload")
+
+    report = await report_send(fail())
+
+    assert not report.ok
+    assert isinstance(report.error, ValueError)
+    assert report.attempts == 0
+
+
+@pytest.mark.asyncio
+async def test_attempt_counters_are_isolated_per_task():
+    async def send(attempts):
+        for _ in range(attempts):
+            await call_with_retry(
+                RetryPolicy(attempts=1), _yield, _never_retry
+            )
+        return True
+
+    reports = await asyncio.gather(*[report_send(send(n)) for n in (1, 2, 3)])
+
+    assert [report.attempts for report in reports] == [1, 2, 3]
+
+
+async def _yield():
+    await asyncio.sleep(0)
+
+
+async def _never_retry(result, error):
+    return None
+
+
+@pytest.mark.asyncio
+async def test_resend_failed_only_resends_failures():
+    sent = []
+
+    async def send(items):
+        sent.append(items)
+        return [SendReport(True, item, None, 1, 0.0) for item in items]
+
+    reports = [
+        SendReport(True, "a", None, 1, 0.0),
+        SendReport(False, None, ValueError("b"), 2, 0.0),
+        SendReport(True, "c", None, 1, 0.0),
+        SendReport(False, {"ok": False}, None, 1, 0.0),
+    ]
+
+    merged = await resend_failed(send, ["a", "b", "c", "d"], reports)
+
+    assert sent == [["b", "d"]]
+    assert [report.ok for report in merged] == [True] * 4
+    assert [report.response for report in merged] == ["a", "b", "c", "d"]
+    assert [report.attempts for report in merged] == [1, 3, 1, 2]
+    assert await resend_failed(send, ["a", "b", "c", "d"], merged) == merged
+    assert len(sent) == 1
@@ -0,0 +1,111 @@
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import aiohttp
+import pytest
+
+from galactic_messenger.src.retry import (
+    RetryPolicy,
+    call_with_retry,
+    get_backoff_delay,
+)
+from galactic_messenger.src.session import classify_http_retry
+
+FAST = RetryPolicy(attempts=4, base_delay=0.001, max_delay=0.01)
+
+
+async def _retry_on_value_error(result, error):
+    return 0.0 if isinstance(error, ValueError) else None
+
+
+@pytest.mark.asyncio
+async def test_retries_until_success():
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ValueError()
+        return "ok"
+
+    assert await call_with_retry(FAST, flaky, _retry_on_value_error) == "ok"
+    assert len(attempts) == 3
+
+
+@pytest.mark.asyncio
+async def test_permanent_error_is_not_retried():
+    attempts = []
+
+    async def broken():
+        attempts.append(1)
+        raise KeyError()
+
+    with pytest.raises(KeyError):
+        await call_with_retry(FAST, broken, _retry_on_value_error)
+    assert len(attempts) == 1
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_attempts():
+    attempts = []
+    retried = []
+
+    async def broken():
+        attempts.append(1)
+        raise ValueError()
+
+    with pytest.raises(ValueError):
+        await call_with_retry(
+            FAST,
+            broken,
+            _retry_on_value_error,
+            lambda result, error, attempt: retried.append(attempt),
+        )
+    assert len(attempts) == 4
+    assert retried == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_deadline_stops_retrying():
+    async def slow():
+        await asyncio.sleep(1)
+
+    start = time.monotonic()
+    with pytest.raises(asyncio.TimeoutError):
+        await call_with_retry(
+            FAST._replace(deadline=0.05),
+            slow,
+            lambda result, error: asyncio.sleep(0, 0.0),
+        )
+    assert time.monotonic() - start < 0.5
+
+
+def test_backoff_is_capped():
+    policy = RetryPolicy(base_delay=1, max_delay=4)
+
+    assert all(
+        0 <= get_backoff_delay(policy, attempt) <= 4 for attempt in range(10)
+    )
+
+
+@pytest.mark.asyncio
+async def test_classify_http_retry():
+    def response(status, headers={}):
+        r = MagicMock()
+        r.status = status
+        r.headers = headers
+        return r
+
+    assert await classify_http_retry(response(502), None) == 0.0
+    assert (
+        await classify_http_retry(response(429, {"Retry-After": "3"}), None)
+        == 3.0
+    )
+    assert await classify_http_retry(response(400), None) is None
+    assert await classify_http_retry(response(200), None) is None
+    assert (
+        await classify_http_retry(None, aiohttp.ServerDisconnectedError())
+        == 0.0
+    )
+    assert await classify_http_retry(None, ValueError()) is None
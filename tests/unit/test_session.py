@@ -0,0 +1,170 @@
+import asyncio
+
+import pytest
+from aiohttp import ClientSession, web
+
+from galactic_messenger.config import load_settings
+from galactic_messenger.src.session import (
+    HttpSender,
+    get_request_timeout,
+    read_response,
+)
+
+
+async def _start_server(routes):
+    app = web.Application()
+    for path, handler in routes.items():
+        app.router.add_get(path, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, f"http://127.0.0.1:{runner.addresses[0][1]}"
+
+
+@pytest.mark.asyncio
+async def test_session_is_reused():
+    sender = HttpSender(concurrency_limit=4, per_host_limit=2)
+    session = sender.session
+
+    assert sender.session is session
+    assert session.connector.limit == 4
+    assert session.connector.limit_per_host == 2
+
+    await sender.aclose()
+
+    assert session.closed
+    assert sender.closed
+
+
+@pytest.mark.asyncio
+async def test_session_is_recreated_after_external_close():
+    sender = HttpSender()
+    session = sender.session
+    await session.close()
+
+    assert sender.session is not session
+
+    await sender.aclose()
+
+
+@pytest.mark.asyncio
+async def test_closed_sender_rejects_session():
+    async with HttpSender() as sender:
+        assert not sender.session.closed
+
+    with pytest.raises(RuntimeError):
+        sender.session
+
+
+@pytest.mark.asyncio
+async def test_read_response_modes():
+    async def sent(request):
+        return web.json_response({"ok": True, "result": {"photo": [1, 2]}})
+
+    async def refused(request):
+        return web.json_response(
+            {"ok": False, "error_code": 403, "description": "Forbidden"},
+            status=403,
+        )
+
+    async def not_ok(request):
+        return web.json_response({"ok": False, "error_code": 1})
+
+    runner, url = await _start_server(
+        {"/sent": sent, "/refused": refused, "/not-ok": not_ok}
+    )
+    async with ClientSession() as session:
+
+        async def read(path, mode):
+            return await read_response(await session.get(url + path), mode)
+
+        assert await read("/sent", "full") == {
+            "ok": True,
+            "result": {"photo": [1, 2]},
+        }
+        assert await read("/sent", "status-only") == {"ok": True}
+        assert await read("/sent", "none") is None
+        assert (await read("/refused", "status-only"))["error_code"] == 403
+        assert await read("/not-ok", "status-only") == {
+            "ok": False,
+            "error_code": 1,
+        }
+        assert session.connector._conns
+    await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_detached_sends_finish_before_close():
+    finished = []
+
+    async def send():
+        await asyncio.sleep(0.01)
+        finished.append(True)
+
+    async def fail():
+        raise ValueError("lost")
+
+    sender = HttpSender()
+    sender._detach(send())
+    sender._detach(fail())
+
+    assert not finished
+    await sender.aclose()
+    assert finished == [True]
+
+
+def test_request_timeout_scales_with_payload_size():
+    settings = load_settings(
+        {},
+        SINGLE_TOTAL_TIMEOUT=10,
+        BATCH_TOTAL_TIMEOUT=30,
+        BATCH_CONNECT_TIMEOUT=3,
+        TIMEOUT_PER_MEGABYTE=2,
+    )
+
+    assert get_request_timeout("SINGLE", 1000, settings).total == 10
+    timeout = get_request_timeout("BATCH", 5 * 2**20 + 1, settings)
+    assert timeout.total == 40
+    assert timeout.connect == 3
+
+
+@pytest.mark.asyncio
+async def test_sender_reads_limits_from_settings():
+    sender = HttpSender(
+        per_host_limit=2,
+        settings=load_settings(
+            {}, BATCH_CONCURRENCY_LIMIT=7, PER_HOST_CONNECTION_LIMIT=5
+        ),
+    )
+
+    assert sender.session.connector.limit == 7
+    assert sender.session.connector.limit_per_host == 2
+    await sender.aclose()
+
+
+@pytest.mark.asyncio
+async def test_sender_reports_connection_counts():
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow(request):
+        started.set()
+        await release.wait()
+        return web.Response(text="done")
+
+    runner, url = await _start_server({"/slow": slow})
+    sender = HttpSender()
+    assert (sender.idle, sender.in_use) == (0, 0)
+
+    request = asyncio.ensure_future(sender.session.get(f"{url}/slow"))
+    await started.wait()
+    assert (sender.idle, sender.in_use) == (0, 1)
+    release.set()
+    async with await request as response:
+        await response.read()
+    assert (sender.idle, sender.in_use) == (1, 0)
+
+    await sender.aclose()
+    assert (sender.idle, sender.in_use) == (0, 0)
+    await runner.cleanup()
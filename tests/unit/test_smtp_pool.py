@@ -0,0 +1,257 @@
+import asyncio
+import gc
+from unittest.mock import AsyncMock, MagicMock
+
+import aiosmtplib
+import pytest
+
+from galactic_messenger.src.smtp_pool import PooledSMTPConnection, SMTPPool
+
+
+def _fake_server():
+    server = MagicMock()
+    server.is_connected = True
+    server.noop = AsyncMock()
+    server.quit = AsyncMock()
+    server.send_message = AsyncMock(return_value=({}, "OK"))
+    return server
+
+
+@pytest.mark.asyncio
+async def test_connection_is_reused():
+    connect = AsyncMock(side_effect=lambda: _fake_server())
+    pool = SMTPPool(connect, max_size=2)
+
+    for _ in range(3):
+        async with pool.acquire() as connection:
+            await connection.send_message("body")
+
+    assert connect.await_count == 1
+    assert pool.idle == 1
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_pool_size_is_capped():
+    connect = AsyncMock(side_effect=lambda: _fake_server())
+    pool = SMTPPool(connect, max_size=2)
+    peak = 0
+
+    async def send():
+        nonlocal peak
+        async with pool.acquire() as connection:
+            peak = max(peak, pool.in_use)
+            await asyncio.sleep(0.01)
+            await connection.send_message("body")
+
+    await asyncio.gather(*[send() for _ in range(6)])
+
+    assert peak == 2
+    assert connect.await_count == 2
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_connection_is_retired_after_max_messages():
+    servers = []
+
+    async def connect():
+        servers.append(_fake_server())
+        return servers[-1]
+
+    pool = SMTPPool(connect, max_size=1, max_messages_per_connection=2)
+
+    for _ in range(3):
+        async with pool.acquire() as connection:
+            await connection.send_message("body")
+
+    assert len(servers) == 2
+    servers[0].quit.assert_awaited_once()
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_idle_connection_is_replaced():
+    servers = []
+
+    async def connect():
+        servers.append(_fake_server())
+        return servers[-1]
+
+    pool = SMTPPool(connect, max_size=1, health_check_interval=0)
+
+    async with pool.acquire() as connection:
+        await connection.send_message("body")
+    servers[0].noop.side_effect = aiosmtplib.SMTPServerDisconnected("idle")
+    async with pool.acquire() as connection:
+        await connection.send_message("body")
+
+    assert len(servers) == 2
+    servers[0].noop.assert_awaited_once()
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_connection_is_discarded_after_error():
+    connect = AsyncMock(side_effect=lambda: _fake_server())
+    pool = SMTPPool(connect, max_size=1)
+
+    with pytest.raises(ConnectionError):
+        async with pool.acquire():
+            raise ConnectionError()
+
+    assert pool.size == 0
+    await pool.aclose()
+
+
+def _fake_data_server(*rcpt_errors):
+    server = _fake_server()
+    server.mail = AsyncMock()
+    server.rcpt = AsyncMock(side_effect=list(rcpt_errors) or None)
+    server.rset = AsyncMock()
+    server.execute_command = AsyncMock(
+        return_value=aiosmtplib.SMTPResponse(354, "Go ahead")
+    )
+    server.timeout = 1
+    server.close = MagicMock(
+        side_effect=lambda: setattr(server, "is_connected", False)
+    )
+    server.protocol = MagicMock()
+    server.protocol._drain_helper = AsyncMock()
+    server.protocol.read_response = AsyncMock(
+        return_value=aiosmtplib.SMTPResponse(250, "OK")
+    )
+    return server
+
+
+async def _chunks():
+    yield b"head\r\n"
+    yield b"body\r\n"
+
+
+async def _broken_chunks():
+    yield b"head\r\n"
+    raise RuntimeError("Media stream can only be read once")
+
+
+@pytest.mark.asyncio
+async def test_send_chunks_streams_message_data():
+    server = _fake_data_server()
+    pool = SMTPPool(AsyncMock(return_value=server))
+
+    async with pool.acquire() as connection:
+        response = await connection.send_chunks(
+            "from@example.com", ["to@example.com"], _chunks()
+        )
+
+    assert response == ({}, "OK")
+    assert connection.messages_sent == 1
+    server.mail.assert_awaited_once_with("from@example.com")
+    server.rcpt.assert_awaited_once_with("to@example.com")
+    server.execute_command.assert_awaited_once_with(b"DATA")
+    assert [call.args[0] for call in server.protocol.write.call_args_list] == [
+        b"head\r\n",
+        b"body\r\n",
+        b".\r\n",
+    ]
+    assert server.protocol._drain_helper.await_count == 2
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_send_chunks_resets_when_all_recipients_are_refused():
+    refused = aiosmtplib.SMTPRecipientRefused(550, "No such user", "to")
+    server = _fake_data_server(refused)
+    pool = SMTPPool(AsyncMock(return_value=server))
+
+    with pytest.raises(aiosmtplib.SMTPRecipientsRefused):
+        async with pool.acquire() as connection:
+            await connection.send_chunks("from", ["to"], _chunks())
+
+    server.rset.assert_awaited_once()
+    server.protocol.write.assert_not_called()
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_send_chunks_reports_partially_refused_recipients():
+    refused = aiosmtplib.SMTPRecipientRefused(550, "No such user", "b")
+    server = _fake_data_server(None, refused)
+    pool = SMTPPool(AsyncMock(return_value=server))
+
+    async with pool.acquire() as connection:
+        errors, message = await connection.send_chunks(
+            "from", ["a", "b"], _chunks()
+        )
+
+    assert list(errors) == ["b"]
+    assert errors["b"].code == 550
+    assert message == "OK"
+    await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_send_chunks_closes_connection_when_data_fails():
+    server = _fake_data_server()
+    pool = SMTPPool(AsyncMock(return_value=server))
+
+    with pytest.raises(RuntimeError):
+        async with pool.acquire() as connection:
+            await connection.send_chunks("from", ["to"], _broken_chunks())
+
+    server.close.assert_called()
+    server.quit.assert_not_called()
+    assert pool.size == 0
+    await pool.aclose()
+
+
+async def _close_mid_data():
+    loop = asyncio.get_running_loop()
+    server = _fake_data_server()
+    waiter = loop.create_future()
+    server.protocol._response_waiter = waiter
+
+    def close():
+        server.is_connected = False
+        loop.call_soon(
+            waiter.set_exception, aiosmtplib.SMTPServerDisconnected("lost")
+        )
+
+    server.close = MagicMock(side_effect=close)
+    with pytest.raises(RuntimeError):
+        await PooledSMTPConnection(server).send_chunks(
+            "from", ["to"], _broken_chunks()
+        )
+    await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_closing_mid_data_retrieves_the_disconnect_error():
+    loop = asyncio.get_running_loop()
+    errors = []
+    loop.set_exception_handler(lambda loop, context: errors.append(context))
+
+    await _close_mid_data()
+    gc.collect()
+
+    loop.set_exception_handler(None)
+    assert errors == []
+
+
+@pytest.mark.asyncio
+async def test_send_chunks_times_out_on_stalled_peer():
+    async def stall():
+        await asyncio.sleep(1)
+
+    server = _fake_data_server()
+    server.timeout = 0.01
+    server.protocol._drain_helper = AsyncMock(side_effect=stall)
+    pool = SMTPPool(AsyncMock(return_value=server))
+
+    with pytest.raises(asyncio.TimeoutError):
+        async with pool.acquire() as connection:
+            await connection.send_chunks("from", ["to"], _chunks())
+
+    server.close.assert_called()
+    server.quit.assert_not_called()
+    await pool.aclose()
@@ -0,0 +1,132 @@
+import base64
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+from aiohttp import ClientSession, web
+
+from galactic_messenger.src.media import MediaStream
+from galactic_messenger.src.streaming import (
+    BASE64_CHUNK_SIZE,
+    Base64Media,
+    JsonBase64Payload,
+    encode_base64_media,
+)
+
+
+class _Writer:
+    def __init__(self):
+        self.chunks = []
+
+    async def write(self, chunk):
+        self.chunks.append(chunk)
+
+
+async def _collect(chunks):
+    return b"".join([chunk async for chunk in chunks])
+
+
+@pytest.mark.asyncio
+async def test_base64_media_chunks_concatenate_to_full_encoding():
+    data = os.urandom(100003)
+    media = Base64Media(data)
+
+    assert await _collect(media.chunks(3 * 1000)) == base64.b64encode(data)
+    assert media.size == len(base64.b64encode(data))
+    assert str(media) == base64.b64encode(data).decode()
+    with pytest.raises(ValueError):
+        await _collect(media.chunks(1000))
+
+
+@pytest.mark.asyncio
+async def test_encoded_base64_media_is_reused_across_reads():
+    data = os.urandom(3 * BASE64_CHUNK_SIZE + 7)
+
+    expected = base64.b64encode(data)
+
+    media = await encode_base64_media(data)
+
+    assert b"".join(media.encoded) == expected
+    assert media.size == len(expected)
+    with patch("base64.b64encode") as b64encode:
+        assert await _collect(media.chunks()) == expected
+        assert await _collect(media.chunks()) == expected
+        assert str(media) == expected.decode()
+    b64encode.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_base64_media_encodes_unaligned_streams():
+    data = os.urandom(10007)
+
+    async def reader():
+        for start in range(0, len(data), 1001):
+            end = start + 1001
+            yield data[start:end]
+
+    media = Base64Media(MediaStream(reader()))
+
+    assert media.size is None
+    assert await _collect(media.chunks(3 * 100)) == base64.b64encode(data)
+    with pytest.raises(TypeError):
+        str(media)
+
+
+@pytest.mark.asyncio
+async def test_json_payload_matches_json_encoding():
+    data = os.urandom(200000)
+    payload = JsonBase64Payload(
+        {
+            "groupId": "group",
+            "caption": 'Alert "zone 1" ✓',
+            "videoBase64": Base64Media(data),
+        }
+    )
+    writer = _Writer()
+
+    await payload.write(writer)
+
+    body = b"".join(writer.chunks)
+    assert body == json.dumps(
+        {
+            "groupId": "group",
+            "caption": 'Alert "zone 1" ✓',
+            "videoBase64": base64.b64encode(data).decode(),
+        }
+    ).encode("utf-8")
+    assert payload.size == len(body)
+    assert max(map(len, writer.chunks)) <= 65536
+    assert payload.headers["Content-Type"] == "application/json"
+
+
+@pytest.mark.asyncio
+async def test_json_payload_is_received_as_json():
+    received = []
+
+    async def handler(request):
+        received.append(await request.json())
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_post("/", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    data = os.urandom(50000)
+
+    async with ClientSession() as session:
+        async with session.post(
+            f"http://127.0.0.1:{port}/",
+            data=JsonBase64Payload(
+                {"groupId": "group", "imageBase64": Base64Media(data)}
+            ),
+        ) as response:
+            assert response.status == 200
+    await runner.cleanup()
+
+    assert received == [
+        {"groupId": "group", "imageBase64": base64.b64encode(data).decode()}
+    ]
@@ -0,0 +1,362 @@
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiohttp import ClientSession, web
+
+from galactic_messenger.src.retry import NO_RETRY, RetryPolicy
+from galactic_messenger.src import telegram
+from galactic_messenger.src.media_cache import FileIdCache
+from galactic_messenger.src.telegram import (
+    TelegramSender,
+    TelegramSendOptions,
+    _create_media_group_form_data,
+    _send,
+    _get_file_id_cache_key,
+    _get_payload_type,
+    _parse_single_input_to_payload,
+    _plan_media_groups,
+    _send_and_parse_to_json,
+    _send_multiple,
+)
+
+
+@pytest.mark.asyncio
+async def test_send_pauses_chat_on_429():
+    session = AsyncMock()
+    response = MagicMock()
+    response.status = 429
+    response.json = AsyncMock(
+        return_value={
+            "ok": False,
+            "error_code": 429,
+            "parameters": {"retry_after": 7},
+        }
+    )
+    session.post = AsyncMock(return_value=response)
+    rate_limiter = MagicMock()
+    rate_limiter.acquire = AsyncMock()
+
+    assert (
+        await _send(
+            "token",
+            session,
+            "MESSAGE",
+            {"chat_id": "42", "text": "Hello"},
+            TelegramSendOptions(
+                rate_limiter=rate_limiter, retry_policy=NO_RETRY
+            ),
+        )
+        == response
+    )
+    rate_limiter.acquire.assert_awaited_once_with("42")
+    rate_limiter.pause.assert_called_once_with("42", 7.0)
+
+
+def _photo_response(file_id):
+    response = MagicMock()
+    response.status = 200
+    response.json = AsyncMock(
+        return_value={
+            "ok": True,
+            "result": {
+                "photo": [
+                    {"file_id": f"{file_id}-small"},
+                    {"file_id": file_id},
+                ]
+            },
+        }
+    )
+    return response
+
+
+@pytest.mark.asyncio
+async def test_repeated_media_is_sent_by_file_id(monkeypatch):
+    monkeypatch.setattr(telegram, "__create_form_data", dict)
+    session = AsyncMock()
+    session.post = AsyncMock(return_value=_photo_response("photo-id"))
+    options = TelegramSendOptions(file_id_cache=FileIdCache())
+    payload = {"chat_id": "42", "photo": b"snapshot", "caption": "Alert"}
+
+    for _ in range(3):
+        await _send_and_parse_to_json(
+            "1:token", session, "IMAGE", payload, options
+        )
+
+    assert [
+        call.kwargs["data"]["photo"] for call in session.post.call_args_list
+    ] == [b"snapshot", "photo-id", "photo-id"]
+
+
+@pytest.mark.asyncio
+async def test_rejected_file_id_is_uploaded_again(monkeypatch):
+    monkeypatch.setattr(telegram, "__create_form_data", dict)
+    rejected = MagicMock()
+    rejected.status = 400
+    rejected.json = AsyncMock(
+        return_value={"ok": False, "error_code": 400, "description": "bad"}
+    )
+    session = AsyncMock()
+    session.post = AsyncMock(
+        side_effect=[rejected, _photo_response("new-photo-id")]
+    )
+    cache = FileIdCache()
+    options = TelegramSendOptions(file_id_cache=cache)
+    payload = {"chat_id": "42", "photo": b"snapshot", "caption": "Alert"}
+    cache_key = await _get_file_id_cache_key("1:token", "IMAGE", payload)
+    cache.set(cache_key, "stale-photo-id")
+
+    await _send_and_parse_to_json(
+        "1:token", session, "IMAGE", payload, options
+    )
+
+    assert [
+        call.kwargs["data"]["photo"] for call in session.post.call_args_list
+    ] == ["stale-photo-id", b"snapshot"]
+    assert cache.get(cache_key) == "new-photo-id"
+
+
+def _album_response(file_ids):
+    response = MagicMock()
+    response.status = 200
+    response.json = AsyncMock(
+        return_value={
+            "ok": True,
+            "result": [
+                {"message_id": index, "photo": [{"file_id": file_id}]}
+                for index, file_id in enumerate(file_ids)
+            ],
+        }
+    )
+    return response
+
+
+def test_plan_media_groups_groups_consecutive_media_per_chat():
+    photo = {"chat_id": "1", "photo": b"x", "caption": ""}
+    video = {"chat_id": "1", "video": b"x", "caption": ""}
+    message = {"chat_id": "1", "text": "Hello"}
+    other_chat = {"chat_id": "2", "photo": b"x", "caption": ""}
+
+    assert _plan_media_groups(
+        [photo, video, message, photo, other_chat, other_chat] + [photo] * 12
+    ) == [
+        [0, 1],
+        [2],
+        [3],
+        [4, 5],
+        list(range(6, 16)),
+        [16, 17],
+    ]
+
+
+def test_documents_are_classified_and_never_grouped():
+    payload = _parse_single_input_to_payload(
+        {"chatId": "1", "text": "Report", "documentBytes": b"pdf"}
+    )
+    photo = {"chat_id": "1", "photo": b"x", "caption": ""}
+
+    assert payload == {"chat_id": "1", "document": b"pdf", "caption": "Report"}
+    assert _get_payload_type(payload) == "DOCUMENT"
+    assert _plan_media_groups([payload, payload, photo, payload, photo]) == [
+        [0],
+        [1],
+        [2],
+        [3],
+        [4],
+    ]
+    assert _plan_media_groups([photo, photo, payload]) == [[0, 1], [2]]
+
+
+@pytest.mark.asyncio
+async def test_documents_are_sent_with_send_document():
+    received = []
+
+    async def handler(request):
+        fields = {}
+        async for field in await request.multipart():
+            fields[field.name] = await field.read()
+        received.append((request.match_info["method"], fields))
+        return web.json_response({"ok": True, "result": {}})
+
+    app = web.Application()
+    app.router.add_post("/bot1:token/{method}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    async with TelegramSender(
+        "1:token",
+        rate_limit=False,
+        cache_media=False,
+        api_url=f"http://127.0.0.1:{port}",
+    ) as sender:
+        reports = await sender.send(
+            [
+                {"chatId": "1", "text": "A", "imageBytes": b"a"},
+                {"chatId": "1", "text": "B", "imageBytes": b"b"},
+                {"chatId": "1", "text": "Report", "documentBytes": b"pdf"},
+            ]
+        )
+    await runner.cleanup()
+
+    assert [report.ok for report in reports] == [True, True, True]
+    assert sorted(method for method, _ in received) == [
+        "sendDocument",
+        "sendMediaGroup",
+    ]
+    (document,) = [
+        fields for method, fields in received if method == "sendDocument"
+    ]
+    assert document == {
+        "chat_id": b"1",
+        "document": b"pdf",
+        "caption": b"Report",
+    }
+
+
+@pytest.mark.asyncio
+async def test_send_multiple_sends_albums_and_maps_results(monkeypatch):
+    monkeypatch.setattr(telegram, "__create_form_data", dict)
+    monkeypatch.setattr(telegram, "_create_media_group_form_data", dict)
+    message_response = MagicMock()
+    message_response.status = 200
+    message_response.json = AsyncMock(return_value={"ok": True})
+    session = AsyncMock()
+    session.post = AsyncMock(
+        side_effect=[_album_response(["a", "b"]), message_response]
+    )
+    cache = FileIdCache()
+    payloads = [
+        {"chat_id": "1", "photo": b"front", "caption": "Front"},
+        {"chat_id": "1", "photo": b"back", "caption": "Back"},
+        {"chat_id": "1", "text": "Hello"},
+    ]
+
+    results = await _send_multiple(
+        "1:token",
+        session,
+        payloads,
+        1,
+        TelegramSendOptions(file_id_cache=cache),
+    )
+
+    assert [call.args[0] for call in session.post.call_args_list] == [
+        "https://api.telegram.org/bot1:token/sendMediaGroup",
+        "https://api.telegram.org/bot1:token/sendMessage",
+    ]
+    assert session.post.call_args_list[0].kwargs["data"] == {
+        "chat_id": "1",
+        "media": payloads[:2],
+    }
+    assert [
+        report.response["result"]["message_id"] for report in results[:2]
+    ] == [0, 1]
+    assert results[2].response == {"ok": True}
+    assert all(report.ok for report in results)
+    cache_key = await _get_file_id_cache_key("1:token", "IMAGE", payloads[1])
+    assert cache.get(cache_key) == "b"
+
+
+@pytest.mark.asyncio
+async def test_media_group_form_data_attaches_files():
+    received = {}
+
+    async def handler(request):
+        async for field in await request.multipart():
+            received[field.name] = await field.read()
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_post("/", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    async with ClientSession() as session:
+        async with session.post(
+            f"http://127.0.0.1:{port}/",
+            data=_create_media_group_form_data(
+                {
+                    "chat_id": "1",
+                    "media": [
+                        {"chat_id": "1", "photo": b"image", "caption": "A"},
+                        {"chat_id": "1", "video": "video-id", "caption": "B"},
+                    ],
+                }
+            ),
+        ) as response:
+            assert response.status == 200
+    await runner.cleanup()
+
+    assert received["chat_id"] == b"1"
+    assert received["file0"] == b"image"
+    assert json.loads(received["media"]) == [
+        {"type": "photo", "caption": "A", "media": "attach://file0"},
+        {"type": "video", "caption": "B", "media": "video-id"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_send_uses_configured_api_url(monkeypatch):
+    monkeypatch.setattr(telegram, "__create_form_data", dict)
+    response = MagicMock()
+    response.status = 200
+    session = AsyncMock()
+    session.post = AsyncMock(return_value=response)
+
+    await _send(
+        "1:token",
+        session,
+        "MESSAGE",
+        {"chat_id": "42", "text": "Hello"},
+        TelegramSendOptions(api_url="http://127.0.0.1:8081"),
+    )
+
+    assert (
+        session.post.call_args.args[0]
+        == "http://127.0.0.1:8081/bot1:token/sendMessage"
+    )
+
+
+@pytest.mark.asyncio
+async def test_streamed_media_is_buffered_for_retries():
+    received = []
+
+    async def handler(request):
+        async for field in await request.multipart():
+            if field.name == "photo":
+                received.append(await field.read())
+        if len(received) == 1:
+            return web.Response(status=502)
+        return web.json_response({"ok": True})
+
+    async def chunks():
+        yield b"ima"
+        yield b"ge"
+
+    app = web.Application()
+    app.router.add_post("/bot1:token/sendPhoto", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    async with TelegramSender(
+        "1:token",
+        rate_limit=False,
+        cache_media=False,
+        retry_policy=RetryPolicy(attempts=2, base_delay=0),
+        api_url=f"http://127.0.0.1:{port}",
+    ) as sender:
+        result = await sender.send(
+            {"chatId": "1", "text": "Intrusion", "imageBytes": chunks()}
+        )
+    await runner.cleanup()
+
+    assert result == {"ok": True}
+    assert received == [b"image", b"image"]
@@ -1,6 +1,16 @@
+import asyncio
 from typing import TypedDict
 
-from galactic_messenger.src.utils import compose, is_schema
+import pytest
+
+from galactic_messenger.src.utils import (
+    SchemaDispatcher,
+    compose,
+    gather_with_concurrency,
+    is_schema,
+    map_with_concurrency,
+    stream_with_concurrency,
+)
 
 
 def test_compose():
@@ -29,3 +39,104 @@ def test_is_schema():
     x = {"z": "xyz"}
 
     assert is_schema(x, Y) is False
+
+
+@pytest.mark.asyncio
+async def test_gather_with_concurrency():
+    in_flight = 0
+    peak = 0
+
+    async def work(x):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01 * (5 - x % 5))
+        in_flight -= 1
+        return x
+
+    results = await gather_with_concurrency(3, *[work(x) for x in range(12)])
+
+    assert results == list(range(12))
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_map_with_concurrency_accepts_async_iterables():
+    async def items():
+        for x in range(10):
+            await asyncio.sleep(0)
+            yield x
+
+    async def double(x):
+        await asyncio.sleep(0.001 * (10 - x))
+        return x * 2
+
+    assert await map_with_concurrency(4, double, items()) == [
+        x * 2 for x in range(10)
+    ]
+    assert await map_with_concurrency(4, double, []) == []
+
+
+@pytest.mark.asyncio
+async def test_stream_with_concurrency_yields_as_completed():
+    async def delayed(x):
+        await asyncio.sleep(0.01 * (4 - x))
+        return x * 2
+
+    assert [
+        entry async for entry in stream_with_concurrency(4, delayed, range(4))
+    ] == [(3, 6), (2, 4), (1, 2), (0, 0)]
+
+
+@pytest.mark.asyncio
+async def test_stream_with_concurrency_applies_backpressure():
+    started = []
+
+    async def record(x):
+        started.append(x)
+        return x
+
+    async def items():
+        for x in range(100):
+            yield x
+
+    stream = stream_with_concurrency(2, record, items())
+    assert await stream.__anext__() == (0, 0)
+    await asyncio.sleep(0.01)
+    assert len(started) <= 5
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_with_concurrency_raises_failures():
+    async def fail(x):
+        if x == 2:
+            raise ValueError(x)
+        return x
+
+    with pytest.raises(ValueError):
+        async for _ in stream_with_concurrency(2, fail, range(5)):
+            pass
+
+
+def test_schema_dispatcher():
+    class Message(TypedDict):
+        chatId: str
+        text: str
+
+    class Image(TypedDict):
+        chatId: str
+        text: str
+        imageBytes: bytes
+
+    dispatcher = SchemaDispatcher([("IMAGE", Image), ("MESSAGE", Message)])
+
+    assert dispatcher.classify({"chatId": "1", "text": "hi"}) == "MESSAGE"
+    assert (
+        dispatcher.classify({"chatId": "1", "text": "hi", "imageBytes": b""})
+        == "IMAGE"
+    )
+    assert dispatcher.classify({"chatId": "1"}) is None
+    assert dispatcher.classify(["chatId", "text"]) is None
+    assert dispatcher.classify({"chatId": [], "text": "hi"}) == "MESSAGE"
+    assert dispatcher.classify({"chatId": [], "text": "hi"}, True) is None
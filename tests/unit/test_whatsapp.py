@@ -1,16 +1,18 @@
+import asyncio
 from typing import TypedDict
 from unittest.mock import AsyncMock
 
 import pytest
-from aiohttp import ClientSession
+from aiohttp import ClientSession, ClientTimeout, web
 
+from galactic_messenger.src.retry import NO_RETRY, RetryPolicy
 from galactic_messenger.src.whatsapp import (
-    _bytes_to_base64, _get_payload_type, _get_timeout_option,
-    _get_type_and_send_and_parse_to_json, _handle_create_session,
-    _handle_parse_input_to_payload, _handle_send, _is_batch,
-    _parse_multiple_input_to_payload, _parse_single_input_to_payload, _send,
-    _send_and_parse_to_json, _send_multiple, _send_single, _to_json,
-    setup_whatsapp)
+    WhatsappSender, WhatsappSendOptions, _bytes_to_base64, _get_payload_type,
+    _get_timeout_option, _get_type_and_send_and_parse_to_json,
+    _handle_parse_input_to_payload,
+    _handle_send, _is_batch, _parse_multiple_input_to_payload,
+    _parse_single_input_to_payload, _send, _send_and_parse_to_json,
+    _send_multiple, _send_single, _to_json, setup_whatsapp)
 
 
 @pytest.mark.asyncio
@@ -73,7 +75,9 @@ async def test_send():
 
     assert await _send(ip, session, payload_type, payload) == response
     session.post.assert_called_once_with(
-        f"{ip}/sendWhatsapp/{payload_type.lower()}", json=payload
+        f"{ip}/sendWhatsapp/{payload_type.lower()}",
+        json=payload,
+        timeout=_get_timeout_option("SINGLE"),
     )
 
 
@@ -98,6 +102,159 @@ async def test_send_and_parse_to_json():
         == "json_response"
     )
     session.post.assert_called_once_with(
-        f"{ip}/sendWhatsapp/{payload_type.lower()}", json=payload
+        f"{ip}/sendWhatsapp/{payload_type.lower()}",
+        json=payload,
+        timeout=_get_timeout_option("SINGLE"),
     )
     response.json.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_send_multiple_keeps_input_order():
+    ip = "example.com"
+    session = AsyncMock()
+    payloads = [
+        {"groupId": "groupId", "message": str(i)} for i in range(6)
+    ]
+
+    async def post(url, json, timeout):
+        await asyncio.sleep(0.01 * (6 - int(json["message"])))
+        response = AsyncMock()
+        response.json = AsyncMock(return_value=json["message"])
+        return response
+
+    session.post = post
+
+    reports = await _send_multiple(ip, session, payloads, 3)
+    assert [report.response for report in reports] == [
+        str(i) for i in range(6)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sender_stream_yields_in_completion_order():
+    session = AsyncMock()
+    session.closed = False
+
+    async def post(url, json, timeout):
+        assert timeout == _get_timeout_option("BATCH")
+        await asyncio.sleep(0.01 * (4 - int(json["message"])))
+        response = AsyncMock()
+        response.json = AsyncMock(return_value=json["message"])
+        return response
+
+    session.post = post
+    sender = WhatsappSender("example.com", concurrency_limit=4)
+    sender._session = session
+    sender._loop = asyncio.get_running_loop()
+
+    async def inputs():
+        for i in range(4):
+            yield {"chatId": "chatId", "text": str(i)}
+
+    assert [
+        (index, report.response)
+        async for index, report in sender.stream(inputs())
+    ] == [(3, "3"), (2, "2"), (1, "1"), (0, "0")]
+
+
+@pytest.mark.asyncio
+async def test_send_multiple_isolates_failures():
+    session = AsyncMock()
+
+    async def post(url, json, timeout):
+        if json["message"] == "down":
+            raise ConnectionResetError()
+        response = AsyncMock()
+        response.status = 200
+        response.json = AsyncMock(return_value={"ok": True})
+        return response
+
+    session.post = post
+    payloads = [
+        {"groupId": "groupId", "message": "up"},
+        {"groupId": "groupId"},
+        {"groupId": "groupId", "message": "down"},
+        {"groupId": "groupId", "message": "up"},
+    ]
+
+    reports = await _send_multiple(
+        "example.com",
+        session,
+        payloads,
+        2,
+        WhatsappSendOptions(retry_policy=NO_RETRY),
+    )
+
+    assert [report.ok for report in reports] == [True, False, False, True]
+    assert isinstance(reports[1].error, ValueError)
+    assert reports[1].attempts == 0
+    assert isinstance(reports[2].error, ConnectionResetError)
+    assert reports[2].attempts == 1
+
+
+def test_parse_multiple_keeps_invalid_inputs():
+    inputs = [{"chatId": "1", "text": "hi"}, {"chatId": 1}]
+
+    assert _parse_multiple_input_to_payload(inputs, True) == [
+        {"groupId": "1", "message": "hi"},
+        {"chatId": 1},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sender_applies_per_call_timeout():
+    session = AsyncMock()
+    session.closed = False
+    response = AsyncMock()
+    response.status = 200
+    response.json = AsyncMock(return_value={"ok": True})
+    session.post = AsyncMock(return_value=response)
+    sender = WhatsappSender("example.com", timeout=ClientTimeout(total=5))
+    sender._session = session
+    sender._loop = asyncio.get_running_loop()
+    message = {"chatId": "chatId", "text": "Hello"}
+
+    await sender.send(message)
+    await sender.send(message, timeout=ClientTimeout(total=1))
+
+    assert [
+        call.kwargs["timeout"].total for call in session.post.call_args_list
+    ] == [5, 1]
+
+
+@pytest.mark.asyncio
+async def test_streamed_media_is_buffered_for_retries():
+    received = []
+
+    async def handler(request):
+        received.append(await request.json())
+        if len(received) == 1:
+            return web.Response(status=502)
+        return web.json_response({"ok": True})
+
+    async def chunks():
+        yield b"ima"
+        yield b"ge"
+
+    app = web.Application()
+    app.router.add_post("/sendWhatsapp/image", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    async with WhatsappSender(
+        f"http://127.0.0.1:{port}",
+        retry_policy=RetryPolicy(attempts=2, base_delay=0),
+    ) as sender:
+        result = await sender.send(
+            {"chatId": "1", "text": "Intrusion", "imageBytes": chunks()}
+        )
+    await runner.cleanup()
+
+    assert result == {"ok": True}
+    assert [body["imageBase64"] for body in received] == [
+        _bytes_to_base64(b"image")
+    ] * 2